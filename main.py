@@ -1,59 +1,246 @@
+import argparse
+import csv
+import json
 import logging
-import time
-import random
 import os
+import socket
+import sys
+from datetime import datetime
 
 # Import project modules
 from src.config.config_loader import load_config
-from src.scraping.driver_setup import initialize_driver
-from src.scraping.job_list_scraper import scrape_job_links_from_page
-from src.scraping.job_details_scraper import scrape_job_details # Using the revised one
-# from src.parsing.cv_parser import read_cv_text # Still commented out
+from src.scraping.crawl_pipeline import run_crawl, run_coordinator, run_worker
+from src.scraping.daemon import CrawlDaemon
+from src.scraping.page_profiler import PROFILER, set_page_profiling, page_profiling_enabled
+from src.scraping.recrawl_scheduler import new_scheduler
+from src.scraping.work_queue import WorkQueue
+from src.parsing.cv_parser import read_cv_text
 # from src.ai.azure_analyzer import initialize_azure_client, analyze_text_with_azure # Still commented out
-# from src.matching.matcher import compare_key_phrases # Still commented out
-from src.data.csv_writer import save_to_csv
-from src.data.cosmos_writer import initialize_cosmos_client, get_cosmos_container, write_job_to_cosmos # Added Cosmos imports
-
-# Selenium imports for finding elements
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, ElementClickInterceptedException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from src.matching.matcher import match_cv
+from src.matching.semantic_index import SemanticIndex
+from src.data.cosmos_writer import initialize_cosmos_client, get_cosmos_container # Added Cosmos imports
+from src.data.cosmos_export import run_export
+from src.data.csv_writer import update_csv
+from src.data.sinks import CsvSink, CosmosSink, SqliteStoreSink, SemanticIndexSink, NdjsonStreamSink
+from src.data.sqlite_store import SqliteJobStore, closing_window
+from src.parsing.normalize import normalize_grade, parse_salary
+from src.utils.dedup import new_deduplicator
+from src.utils.helpers import set_delay_scale
+from src.utils.metrics import METRICS, timer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# --- Helper Function for Delay ---
-def random_delay(min_seconds=10, max_seconds=15):
-    """Waits for a random time between min_seconds and max_seconds."""
-    delay = random.uniform(min_seconds, max_seconds)
-    logging.info(f"Waiting for {delay:.2f} seconds...")
-    time.sleep(delay)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Civil Service Jobs into Cosmos DB and CSV.")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('crawl', help="Run a complete crawl in this process (default)")
+    commands.add_parser('daemon', help="Keep running and crawl every DAEMON_INTERVAL_MINUTES with warm browsers")
+    commands.add_parser('coordinate', help="Queue every job link in the shared work queue")
+    work = commands.add_parser('work', help="Fetch and parse queued jobs until the queue is drained")
+    work.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}",
+                      help="Name recorded on leased tasks (default: host-pid)")
+    merge = commands.add_parser('merge', help="Write the results of a sharded crawl to one CSV")
+    merge.add_argument('--output', help="CSV file to write (default: OUTPUT_CSV_FILE)")
+
+    query = commands.add_parser('query', help="Search the local job store (SQLITE_STORE_PATH)")
+    query.add_argument('text', nargs='?', help="Words to find in the title, description, person specification or skills")
+    query.add_argument('--grade', type=_grade_arg, help="Grade name or code, e.g. 'Grade 7', G7, SEO")
+    query.add_argument('--location', help="A location the job is offered in, e.g. Leeds")
+    query.add_argument('--department', help="Exact department name")
+    query.add_argument('--min-salary', type=_salary_arg, help="Salary range reaches at least this, e.g. 50000 or 50k")
+    query.add_argument('--closing-within', type=int, metavar='DAYS', help="Closing in the next DAYS days")
+    query.add_argument('--closing-before', type=datetime.fromisoformat, metavar='YYYY-MM-DD')
+    query.add_argument('--limit', type=int, default=20)
+    query.add_argument('--json', action='store_true', help="Print the matching jobs as JSON")
+    export = commands.add_parser('export', help="Export the Cosmos DB container to a Parquet or NDJSON file")
+    export.add_argument('output', help="File to write (.parquet, .ndjson or .ndjson.gz)")
+    export.add_argument('--format', choices=['parquet', 'ndjson'], help="Default: from the file extension")
+    export.add_argument('--full', action='store_true', help="Export every document, not just those changed since the last export")
+    load = commands.add_parser('import', help="Load a jobs CSV (e.g. matched_jobs.csv) into the local job store")
+    load.add_argument('csv_file')
+    match = commands.add_parser('match', help="Find the jobs most similar to a CV in the semantic job index")
+    match.add_argument('cv_file', nargs='?', help="CV .docx file (default: CV_FILE_PATH)")
+    match.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+    args.command = args.command or 'crawl'
+    return args
+
+def _grade_arg(value: str) -> str:
+    grade = normalize_grade(value)
+    if grade is None:
+        raise argparse.ArgumentTypeError(f"Unknown grade: {value}")
+    return grade
+
+def _salary_arg(value: str) -> int:
+    salary_min, _ = parse_salary(value if value.startswith('£') else f"£{value}")
+    if salary_min is None:
+        raise argparse.ArgumentTypeError(f"Not a salary: {value}")
+    return salary_min
+
+def build_sinks(config: dict, cosmos_container, output_csv: str, stream_prefix: str = 'jobs') -> list:
+    """The sinks every scraped job is fanned out to; the CSV sink comes first."""
+    sinks = [CsvSink(os.path.abspath(output_csv))] # Final CSV (kept as secondary output)
+    if cosmos_container:
+        sinks.append(CosmosSink(cosmos_container, workers=config['COSMOS_WRITE_WORKERS'],
+                                layout=config['COSMOS_LAYOUT'], compress_body=config['COSMOS_COMPRESS_BODY']))
+    if config['SQLITE_STORE_PATH']:
+        sinks.append(SqliteStoreSink(config['SQLITE_STORE_PATH'])) # Local store for `main.py query`
+    if config['NDJSON_STREAM_DIR']:
+        sinks.append(NdjsonStreamSink(config['NDJSON_STREAM_DIR'], config['NDJSON_COMPRESSION'], # Live feed for downstream consumers
+                                      config['NDJSON_ROTATE_MB'], config['NDJSON_ROTATE_SECONDS'], stream_prefix))
+    if config['MATCH_BACKEND'] == 'semantic':
+        sinks.append(SemanticIndexSink(config['SEMANTIC_INDEX_PATH'])) # Job index for `main.py match`
+    return sinks
+
+def open_work_queue(config: dict) -> WorkQueue:
+    return WorkQueue(config['WORK_QUEUE_PATH'], config['WORK_LEASE_SECONDS'], config['WORK_MAX_ATTEMPTS'])
+
+def merge_results(config: dict, output_file: str | None = None) -> list[dict]:
+    """
+    Adds every task completed in the current crawl of the shared work queue to the CSV (one
+    row per vacancy, see update_csv) and records the scraped vacancies in the dedup filter and recrawl schedule
+    for the next crawl.
+    """
+    work_queue = open_work_queue(config)
+    crawl_id = work_queue.current_crawl_id()
+    records = list(work_queue.iter_results(crawl_id))
+    logging.info(f"Merging {len(records)} results of crawl {crawl_id} from {config['WORK_QUEUE_PATH']} "
+                 f"(queue: {work_queue.counts()})")
+    update_csv(records, os.path.abspath(output_file or config['OUTPUT_CSV_FILE']))
+    if config['SQLITE_STORE_PATH']:
+        store = SqliteJobStore(config['SQLITE_STORE_PATH'])
+        store.upsert_many(records)
+        store.close()
+    dedup = new_deduplicator(config)
+    scheduler = new_scheduler(config)
+    for record in records:
+        dedup.remember(record)
+        if scheduler:
+            scheduler.record(record)
+    dedup.save()
+    if scheduler:
+        scheduler.close()
+    return records
+
+def run_store_command(args) -> int:
+    """The `query` and `import` commands, which only touch the local job store. Returns the exit status."""
+    try:
+        config = load_config()
+    except (FileNotFoundError, ValueError) as e:
+        logging.error(f"Configuration Error: {e}")
+        return 1
+    if not config['SQLITE_STORE_PATH']:
+        logging.error("SQLITE_STORE_PATH is empty: the local job store is disabled.")
+        return 1
+    store = SqliteJobStore(config['SQLITE_STORE_PATH'])
+    try:
+        if args.command == 'import':
+            with open(args.csv_file, newline='', encoding='utf-8') as f:
+                rows = [{k: (v or None) for k, v in row.items()} for row in csv.DictReader(f)]
+            stored = store.upsert_many(rows)
+            logging.info(f"Imported {stored} jobs from {args.csv_file}. The store holds {store.count()} jobs.")
+            if config['MATCH_BACKEND'] == 'semantic':
+                index = SemanticIndex(config['SEMANTIC_INDEX_PATH'])
+                indexed = index.add_jobs(rows)
+                logging.info(f"Indexed {indexed} jobs. The semantic index holds {index.count()} jobs.")
+                index.close()
+            return 0
+
+        closing_after, closing_before = closing_window(args.closing_within)
+        if args.closing_before:
+            closing_before = args.closing_before
+            if closing_before.time() == datetime.min.time(): # Date only: include jobs closing that day
+                closing_before = closing_before.replace(hour=23, minute=59)
+        jobs = store.search(args.text, grade=args.grade, location=args.location, department=args.department,
+                            min_salary=args.min_salary, closing_after=closing_after,
+                            closing_before=closing_before, limit=args.limit)
+        if args.json:
+            print(json.dumps(jobs, indent=2, ensure_ascii=False))
+            return 0
+        for job in jobs:
+            print(f"{(job['closing_at'] or '-')[:10]:10}  {job['Job Grade'] or '-':26.26}  {job['Salary'] or '-':22.22}  {job['Job Title']}")
+            print(f"{'':10}  {job['Department'] or '-'} | {job['Location'] or '-'} | {job['Link']}")
+        print(f"{len(jobs)} job(s).")
+        return 0
+    finally:
+        store.close()
+
+def run_match_command(args) -> int:
+    """The `match` command: ranks the jobs of the semantic index against a CV. Returns the exit status."""
+    try:
+        config = load_config()
+    except (FileNotFoundError, ValueError) as e:
+        logging.error(f"Configuration Error: {e}")
+        return 1
+    if config['MATCH_BACKEND'] != 'semantic':
+        logging.error("The match command searches the semantic job index: set MATCH_BACKEND=semantic "
+                      "and crawl or import jobs to build it.")
+        return 1
+    try:
+        cv_text = read_cv_text(args.cv_file or config['CV_FILE_PATH'])
+    except Exception as e: # Missing file, not a .docx or an unreadable document; already logged
+        logging.error(f"Could not read the CV: {e}")
+        return 1
+    with timer('match'):
+        matches = match_cv(config, cv_text, limit=args.limit)
+    jobs = {}
+    if config['SQLITE_STORE_PATH']:
+        store = SqliteJobStore(config['SQLITE_STORE_PATH'])
+        jobs = {key: store.get(key) for key, _ in matches}
+        store.close()
+    for key, score in matches:
+        job = jobs.get(key) or {}
+        print(f"{score:6.3f}  {job.get('Job Title') or key}")
+        if job:
+            print(f"{'':6}  {job.get('Department') or '-'} | {job.get('Location') or '-'} | {job.get('Link')}")
+    print(f"{len(matches)} match(es).")
+    return 0
 
 # --- Main Execution ---
-def main():
+def main(argv=None):
     """Main function: Scrapes job details, writes to Cosmos DB, and saves to CSV."""
-    logging.info("Starting CV Analysis Tool (Scraping, Cosmos DB & CSV Export Mode)...")
-    driver = None
+    args = parse_args(argv)
+    if args.command in ('query', 'import'):
+        return run_store_command(args)
+    if args.command == 'match':
+        return run_match_command(args)
+    logging.info(f"Starting CV Analysis Tool (Scraping, Cosmos DB & CSV Export Mode, command: {args.command})...")
     all_job_details = [] # List to store details for final CSV write
     cosmos_container = None # Initialize Cosmos container client
+    config = None
+    write_report = True
+    METRICS.reset()
+    PROFILER.reset()
 
     try:
         # 1. Load Configuration
         logging.info("Loading configuration...")
         config = load_config()
         logging.info("Configuration loaded.")
+        set_delay_scale(config['CRAWL_DELAY_SCALE'])
+        set_page_profiling(config['PAGE_PROFILING'])
+
+        # Sharded crawl modes that do not write job records
+        if args.command == 'coordinate':
+            run_coordinator(config, open_work_queue(config))
+            return
+        if args.command == 'merge':
+            all_job_details = merge_results(config, args.output)
+            return
 
         # 1.5 Initialize Cosmos DB Client and Container
         if config.get('COSMOS_ENDPOINT') and config.get('COSMOS_DATABASE_NAME') and config.get('COSMOS_CONTAINER_NAME'):
             logging.info("Initializing Cosmos DB connection using Azure Identity...")
-            cosmos_client = initialize_cosmos_client(config['COSMOS_ENDPOINT'])
+            with timer('cosmos_init'):
+                cosmos_client = initialize_cosmos_client(config['COSMOS_ENDPOINT'])
+                if cosmos_client:
+                    cosmos_container = get_cosmos_container(
+                        cosmos_client,
+                        config['COSMOS_DATABASE_NAME'],
+                        config['COSMOS_CONTAINER_NAME']
+                    )
             if cosmos_client:
-                cosmos_container = get_cosmos_container(
-                    cosmos_client,
-                    config['COSMOS_DATABASE_NAME'],
-                    config['COSMOS_CONTAINER_NAME']
-                )
                 if not cosmos_container:
                     logging.error("Failed to get Cosmos DB container. Will proceed without writing to Cosmos DB.")
             else:
@@ -61,155 +248,39 @@ def main():
         else:
             logging.warning("Cosmos DB configuration (ENDPOINT, DATABASE_NAME, CONTAINER_NAME) missing. Skipping Cosmos DB integration.")
 
-        # 2. Initialize WebDriver in Headless Mode
-        logging.info("Initializing WebDriver in headless mode...")
-        driver = initialize_driver(browser_name='chrome', headless=True) # Use headless mode
-        logging.info("WebDriver initialized.")
-
-        # 3. Navigate and Click Search
-        logging.info(f"Navigating to target URL: {config['TARGET_URL']}")
-        driver.get(config['TARGET_URL'])
-        logging.info("Navigation complete.")
-        random_delay(2, 4) # Short delay for page elements
-
-        # Find and click the main search button
-        search_button_id = "submitSearch"
-        try:
-            logging.info(f"Looking for search button with ID: {search_button_id}")
-            search_button = WebDriverWait(driver, 20).until(
-                EC.element_to_be_clickable((By.ID, search_button_id))
-            )
-            logging.info("Search button found and clickable.")
-            # Use JavaScript click for potential robustness in headless mode
-            driver.execute_script("arguments[0].click();", search_button)
-            logging.info("Clicked the 'Search for jobs' button.")
-
-            # Wait 30 seconds after clicking search for results to load
-            wait_after_search = 30
-            logging.info(f"Waiting {wait_after_search} seconds for search results to load...")
-            time.sleep(wait_after_search)
-            logging.info("Wait finished. Starting scraping process.")
-
-        except TimeoutException:
-            logging.error(f"Search button with ID '{search_button_id}' not found or not clickable within timeout. Exiting.")
-            return # Exit if search button fails
-        except Exception as e_search:
-            logging.error(f"Error clicking search button: {e_search}", exc_info=True)
-            return # Exit on other errors during search click
-
-        page_number = 1
-        while True: # Loop for pagination
-            logging.info(f"--- Processing Page {page_number} ---")
-
-            # Store the URL of the current search results page
-            current_search_page_url = driver.current_url
-            logging.info(f"Current search results page URL: {current_search_page_url}")
-
-            # 4. Scrape Job List (Title, Link, Department) from Current Page
-            logging.info("Scraping job list info from current page...")
-            job_list_info = scrape_job_links_from_page(driver)
-
-            if not job_list_info:
-                logging.warning(f"No job links found on page {page_number}. Checking for 'Next' page.")
-                # If no jobs found, still try to navigate back in case we are on a detail page somehow
-                if driver.current_url != current_search_page_url:
-                    logging.info(f"Navigating back to search results page: {current_search_page_url}")
-                    driver.get(current_search_page_url)
-                    random_delay(5, 8) # Wait for page to potentially reload
-            else:
-                logging.info(f"Found {len(job_list_info)} jobs on page {page_number}.")
-
-                # 5. Process Each Job Link on the Current Page
-                for i, job_info in enumerate(job_list_info):
-                    job_url = job_info.get('link')
-                    job_title = job_info.get('title', 'N/A')
-                    job_department = job_info.get('department', 'N/A') # Get department
-
-                    if not job_url:
-                        logging.warning("Skipping job with missing link.")
-                        continue
-
-                    logging.info(f"\nProcessing job {i+1}/{len(job_list_info)}: '{job_title}' (Dept: {job_department})")
-
-                    # Scrape details (pass title and department)
-                    details = scrape_job_details(driver, job_url, job_title, job_department)
-
-                    if details:
-                        # Write to Cosmos DB immediately if container is available
-                        if cosmos_container:
-                            write_job_to_cosmos(cosmos_container, details.copy()) # Pass a copy to avoid modification issues
-
-                        # Append to list for final CSV write
-                        all_job_details.append(details)
-                        logging.info(f"Successfully scraped details for '{job_title}'")
-                    else:
-                        logging.warning(f"Could not scrape details for job: {job_title} ({job_url})")
-
-                # Navigate back ONCE after processing ALL jobs on the page
-                logging.info(f"Finished processing all {len(job_list_info)} jobs on page {page_number}.")
-                logging.info(f"Navigating back to search results page: {current_search_page_url}")
-                driver.get(current_search_page_url)
-                logging.info("Waiting for search results page to reload before checking for 'Next'...")
-                random_delay(8, 12) # Wait for page to reload
-
-            # 6. Find and Click Next Page Link (Now driver should be on the search results page)
-            try:
-                logging.info("Looking for pagination menu...")
-                paging_menu_xpath = "//div[contains(@class, 'search-results-paging-menu')]"
-                paging_menu = WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.XPATH, paging_menu_xpath))
-                )
-                logging.info("Pagination menu found.")
-
-                # Log the HTML of the pagination menu for debugging (optional, can be removed later)
-                try:
-                    paging_html = paging_menu.get_attribute('outerHTML')
-                    logging.debug(f"Pagination Menu HTML:\n{paging_html}")
-                except Exception as e_html:
-                    logging.warning(f"Could not get pagination menu HTML: {e_html}")
-
-                logging.info("Looking for 'Next' page link within menu using title attribute...")
-                # Use title attribute for potentially more robust selection
-                next_link_xpath = ".//a[@title='Go to next search results page']" # Search within the menu element
-                next_page_link = WebDriverWait(paging_menu, 20).until(
-                    EC.presence_of_element_located((By.XPATH, next_link_xpath))
-                )
-                logging.info("Found 'Next' page link element using title.")
-
-                # Add delay before clicking next page
-                logging.info("Preparing to click 'Next' page link using JavaScript.")
-                random_delay(3, 6) # Shorter delay before JS click
-
-                logging.info("Attempting JavaScript click on 'Next' page link...")
-                driver.execute_script("arguments[0].scrollIntoView(true);", next_page_link) # Scroll into view first
-                time.sleep(0.5) # Brief pause after scroll
-                driver.execute_script("arguments[0].click();", next_page_link)
-
-                page_number += 1
-                logging.info(f"Successfully initiated navigation to page {page_number} via JavaScript click.")
-                # Add a wait after click to allow next page load initiation
-                random_delay(5, 8)
-
-            except TimeoutException:
-                logging.info("No 'Next' page link found (or pagination menu timed out). Assuming end of results.")
-                break # Exit the pagination loop
-            except NoSuchElementException:
-                 logging.info("No 'Next' page link element found within menu. Assuming end of results.")
-                 break # Exit the pagination loop
-            except Exception as e:
-                logging.error(f"Error finding or clicking 'Next' page link: {e}", exc_info=True)
-                logging.warning("Stopping pagination due to error.")
-                break # Exit loop on error
-
-        # 7. Save All Collected Data to CSV (Kept as secondary output)
-        logging.info(f"\nFinished scraping all pages. Total jobs processed: {len(all_job_details)}")
-        if all_job_details:
-            output_filename = config['OUTPUT_CSV_FILE']
-            absolute_output_path = os.path.abspath(output_filename)
-            logging.info(f"Attempting to save all scraped job details to CSV: {absolute_output_path}")
-            save_to_csv(all_job_details, absolute_output_path)
+        if args.command == 'export':
+            if not cosmos_container:
+                raise ValueError("The export command needs a Cosmos DB container.")
+            run_export(cosmos_container, args.output, args.format, config['EXPORT_STATE_PATH'] or None,
+                       full=args.full, page_size=config['EXPORT_PAGE_SIZE'], workers=config['EXPORT_WORKERS'],
+                       layout=config['COSMOS_LAYOUT'])
+            return
+
+        if args.command == 'daemon':
+            write_report = False # Each daemon crawl writes its own run report
+            CrawlDaemon(config, lambda: build_sinks(config, cosmos_container, config['OUTPUT_CSV_FILE'])).run()
+            return
+
+        # 2. Set up the sinks each scraped job is fanned out to
+        output_csv = config['OUTPUT_CSV_FILE']
+        if args.command == 'work':
+            root, ext = os.path.splitext(output_csv)
+            output_csv = f"{root}.{args.worker_id}{ext}" # Per-worker CSV; `merge` writes the combined one
+        stream_prefix = f"jobs.{args.worker_id}" if args.command == 'work' else 'jobs' # One stream per sharded worker
+        sinks = build_sinks(config, cosmos_container, output_csv, stream_prefix)
+        csv_sink = sinks[0]
+
+        # 3-6. Run the crawl pipeline: results pages -> job links -> fetched HTML -> parsed records -> sinks
+        logging.info(
+            f"Starting crawl pipeline (fetch workers: {config['FETCH_WORKERS']}, "
+            f"parse workers: {config['PARSE_WORKERS']}, sinks: {', '.join(s.name for s in sinks)})..."
+        )
+        if args.command == 'work':
+            run_worker(config, open_work_queue(config), sinks, args.worker_id)
         else:
-            logging.info("No job details were successfully scraped to save to CSV.")
+            run_crawl(config, sinks)
+        all_job_details = csv_sink.records
+        logging.info(f"\nFinished scraping all pages. Total jobs processed: {len(all_job_details)}")
 
     except FileNotFoundError as e:
         logging.error(f"Configuration Error: {e}")
@@ -220,12 +291,13 @@ def main():
     except Exception as e:
         logging.error(f"An unexpected error occurred in the main process: {e}", exc_info=True)
     finally:
-        # 8. Close WebDriver
-        if driver:
-            logging.info("Closing WebDriver...")
-            driver.quit()
-            logging.info("WebDriver closed.")
+        # 7. Emit the run report (JSON + Prometheus textfile)
+        if config and write_report:
+            extra = {'jobs_collected': len(all_job_details)}
+            if page_profiling_enabled():
+                extra['page_profile'] = PROFILER.summary()
+            METRICS.write_run_report(config['RUN_REPORT_FILE'], config['METRICS_TEXTFILE'], extra=extra)
         logging.info("CV Analysis Tool finished.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -3,6 +3,8 @@ from azure.ai.textanalytics import TextAnalyticsClient
 import logging
 import os
 
+from src.utils.metrics import timer, increment
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def initialize_azure_client(endpoint, key):
@@ -41,14 +43,16 @@ def analyze_text_with_azure(client: TextAnalyticsClient, text: str, mode='key_ph
             logging.info(f"Sending batch of {len(batch)} document(s) to Azure for {mode} analysis...")
             
             if mode == 'key_phrases':
-                response = client.extract_key_phrases(documents=batch)
+                with timer('azure_key_phrases'):
+                    response = client.extract_key_phrases(documents=batch)
                 for doc in response:
                     if not doc.is_error:
                         results.extend(doc.key_phrases)
                     else:
                         logging.error(f"Azure API Error: {doc.id}, Error Code: {doc.error.code}, Message: {doc.error.message}")
             elif mode == 'entities':
-                response = client.recognize_entities(documents=batch)
+                with timer('azure_entities'):
+                    response = client.recognize_entities(documents=batch)
                 for doc in response:
                     if not doc.is_error:
                         # Extract entity text, you might want category/subcategory too
@@ -65,6 +69,7 @@ def analyze_text_with_azure(client: TextAnalyticsClient, text: str, mode='key_ph
 
     except Exception as e:
         logging.error(f"Error during Azure AI analysis ({mode}): {e}")
+        increment('azure_analysis_failures')
         # Depending on the error, you might want to retry or return partial results
         return [] # Return empty list on error for now
 
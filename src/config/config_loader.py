@@ -2,6 +2,8 @@ import os
 from dotenv import load_dotenv
 import logging
 
+from src.data.cosmos_layout import LAYOUTS
+
 def load_config():
     """Loads configuration from a .env file."""
     load_dotenv() # Load environment variables from .env file
@@ -14,9 +16,49 @@ def load_config():
         'OUTPUT_CSV_FILE': os.getenv('OUTPUT_CSV_FILE', 'matched_jobs.csv'),
         'LOGIN_WAIT_TIME': int(os.getenv('LOGIN_WAIT_TIME', '60')), # Default to string '60'
         'MATCH_THRESHOLD': int(os.getenv('MATCH_THRESHOLD', '5')),  # Default to string '5'
+        'MATCH_BACKEND': os.getenv('MATCH_BACKEND', 'exact').lower(), # 'exact' (shared key phrases) or 'semantic' (job index)
+        'SEMANTIC_INDEX_PATH': os.getenv('SEMANTIC_INDEX_PATH', 'jobs_semantic.sqlite3'), # Job index of the semantic backend, updated by every crawl
+        'SEMANTIC_CANDIDATES': int(os.getenv('SEMANTIC_CANDIDATES', '200')), # Index candidates re-ranked exactly per query
+        'SEMANTIC_MIN_SIMILARITY': float(os.getenv('SEMANTIC_MIN_SIMILARITY', '0.1')), # Lowest cosine similarity reported as a match
         'COSMOS_ENDPOINT': os.getenv('COSMOS_ENDPOINT'),
         'COSMOS_DATABASE_NAME': os.getenv('COSMOS_DATABASE_NAME'),
-        'COSMOS_CONTAINER_NAME': os.getenv('COSMOS_CONTAINER_NAME')
+        'COSMOS_CONTAINER_NAME': os.getenv('COSMOS_CONTAINER_NAME'),
+        'DRIVER_MAX_PAGES': int(os.getenv('DRIVER_MAX_PAGES', '200')), # Restart the browser after this many page loads (0 = never)
+        'DRIVER_MAX_MEMORY_MB': int(os.getenv('DRIVER_MAX_MEMORY_MB', '1500')), # Restart the browser above this memory use (0 = never)
+        'RUN_REPORT_FILE': os.getenv('RUN_REPORT_FILE', 'run_report.json'), # JSON run report written at the end of each run
+        'METRICS_TEXTFILE': os.getenv('METRICS_TEXTFILE', 'run_report.prom'), # Prometheus textfile collector output
+        'SEARCH_WAIT_SECONDS': int(os.getenv('SEARCH_WAIT_SECONDS', '30')), # Wait after clicking 'Search for jobs'
+        'CRAWL_DELAY_SCALE': float(os.getenv('CRAWL_DELAY_SCALE', '1.0')), # Multiplier for the random politeness delays
+        'FETCH_WORKERS': int(os.getenv('FETCH_WORKERS', '1')), # Browsers loading job details pages in parallel
+        'FETCH_DELAY_SECONDS': float(os.getenv('FETCH_DELAY_SECONDS', '1')), # Pause of each fetch worker after a job details page (times CRAWL_DELAY_SCALE)
+        'PARSE_WORKERS': int(os.getenv('PARSE_WORKERS', '2')), # Threads parsing fetched HTML
+        'COSMOS_WRITE_WORKERS': int(os.getenv('COSMOS_WRITE_WORKERS', '2')), # Threads upserting to Cosmos DB
+        'COSMOS_LAYOUT': os.getenv('COSMOS_LAYOUT', 'inline').lower(), # 'inline' (one document per job) or 'split' (summary + body)
+        'COSMOS_COMPRESS_BODY': os.getenv('COSMOS_COMPRESS_BODY', 'true').lower() in ('1', 'true', 'yes'), # zlib the split layout's body document
+        'SEARCH_SESSION_MAX_MINUTES': float(os.getenv('SEARCH_SESSION_MAX_MINUTES', '60')), # Daemon: re-run a warm browser's search after this long (0 = only when expired)
+        'DAEMON_INTERVAL_MINUTES': float(os.getenv('DAEMON_INTERVAL_MINUTES', '60')), # Daemon: time between crawl starts
+        'DAEMON_HEALTH_PORT': int(os.getenv('DAEMON_HEALTH_PORT', '8787')), # Daemon: local /health and /status endpoint (0 = disabled)
+        'PAGE_PROFILING': os.getenv('PAGE_PROFILING', 'false').lower() in ('1', 'true', 'yes'), # Record TTFB, bytes and requests per page (Chrome performance log)
+        'PIPELINE_QUEUE_SIZE': int(os.getenv('PIPELINE_QUEUE_SIZE', '50')), # Capacity of each queue between stages
+        'WORK_QUEUE_PATH': os.getenv('WORK_QUEUE_PATH', 'work_queue.sqlite3'), # Shared queue for sharded crawls
+        'WORK_LEASE_SECONDS': int(os.getenv('WORK_LEASE_SECONDS', '300')), # Time a worker holds a task before it is re-offered
+        'WORK_MAX_ATTEMPTS': int(os.getenv('WORK_MAX_ATTEMPTS', '3')), # Attempts per task before it is marked failed
+        'WORK_POLL_SECONDS': int(os.getenv('WORK_POLL_SECONDS', '5')), # Idle worker polling interval
+        'DEDUP_FILTER_PATH': os.getenv('DEDUP_FILTER_PATH', 'seen_jobs.bloom'), # Vacancies scraped by earlier runs ('' = per-run dedup only)
+        'DEDUP_CAPACITY': int(os.getenv('DEDUP_CAPACITY', '100000')), # Vacancies the filter is sized for
+        'DEDUP_ERROR_RATE': float(os.getenv('DEDUP_ERROR_RATE', '0.001')), # Chance a new vacancy is wrongly skipped
+        'RECRAWL_SCHEDULE_PATH': os.getenv('RECRAWL_SCHEDULE_PATH', 'recrawl_schedule.sqlite3'), # Per-vacancy scrape history ('' = skip every vacancy seen before)
+        'RECRAWL_MIN_HOURS': float(os.getenv('RECRAWL_MIN_HOURS', '6')), # Shortest refresh interval (jobs about to close)
+        'RECRAWL_MAX_HOURS': float(os.getenv('RECRAWL_MAX_HOURS', '168')), # Longest refresh interval (jobs closing far ahead)
+        'RECRAWL_FRACTION': float(os.getenv('RECRAWL_FRACTION', '0.25')), # Refresh after this fraction of the time left until closing
+        'SQLITE_STORE_PATH': os.getenv('SQLITE_STORE_PATH', 'jobs.sqlite3'), # Local searchable job store ('' = disabled)
+        'EXPORT_STATE_PATH': os.getenv('EXPORT_STATE_PATH', 'cosmos_export_state.json'), # _ts watermark of the last export ('' = always full)
+        'EXPORT_PAGE_SIZE': int(os.getenv('EXPORT_PAGE_SIZE', '1000')), # Documents per Cosmos DB page during export
+        'EXPORT_WORKERS': int(os.getenv('EXPORT_WORKERS', '4')), # Feed ranges exported in parallel
+        'NDJSON_STREAM_DIR': os.getenv('NDJSON_STREAM_DIR', 'job_stream'), # Rotating NDJSON feed of every scraped job ('' = disabled)
+        'NDJSON_COMPRESSION': os.getenv('NDJSON_COMPRESSION', 'gzip').lower(), # 'gzip', 'zstd' (needs zstandard) or 'none'
+        'NDJSON_ROTATE_MB': float(os.getenv('NDJSON_ROTATE_MB', '64')), # Publish a segment once it reaches this compressed size
+        'NDJSON_ROTATE_SECONDS': float(os.getenv('NDJSON_ROTATE_SECONDS', '300')) # ...or has been open this long (0 = size only)
     }
 
     # Basic validation
@@ -28,6 +70,12 @@ def load_config():
         raise ValueError("AZURE_LANGUAGE_KEY environment variable not set.")
     if not config['COSMOS_ENDPOINT'] or not config['COSMOS_DATABASE_NAME'] or not config['COSMOS_CONTAINER_NAME']:
         logging.warning("One or more Cosmos DB configuration variables (ENDPOINT, DATABASE_NAME, CONTAINER_NAME) are missing.")
+    if config['COSMOS_LAYOUT'] not in LAYOUTS:
+        raise ValueError(f"COSMOS_LAYOUT must be {' or '.join(map(repr, LAYOUTS))}, not '{config['COSMOS_LAYOUT']}'.")
+    if config['MATCH_BACKEND'] not in ('exact', 'semantic'):
+        raise ValueError(f"MATCH_BACKEND must be 'exact' or 'semantic', not '{config['MATCH_BACKEND']}'.")
+    if config['NDJSON_COMPRESSION'] not in ('gzip', 'zstd', 'none'):
+        raise ValueError(f"NDJSON_COMPRESSION must be 'gzip', 'zstd' or 'none', not '{config['NDJSON_COMPRESSION']}'.")
 
     return config
 
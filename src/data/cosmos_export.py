@@ -0,0 +1,252 @@
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from azure.cosmos import exceptions
+
+from src.data.cosmos_layout import SplitDocumentAssembler, SUMMARY_FIELDS
+from src.data.job_record import CSV_FIELDNAMES
+from src.utils.metrics import timer, increment
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Optional dependency: pip install pyarrow
+    pa = None
+    pq = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+EXPORT_FIELDS = ['id'] + CSV_FIELDNAMES + ['_ts'] # Projection: the job columns, not the whole document
+# Projection for the split layout: summary fields plus the (compressed) body, paired up after reading
+SPLIT_LAYOUT_FIELDS = ['id', 'doc_type', 'job_id', 'encoding', 'data', 'fields'] + SUMMARY_FIELDS + ['_ts']
+PARQUET_ROW_GROUP_ROWS = 10000 # Pages are buffered into row groups of this size
+PAGE_RETRIES = 3 # Attempts per page; a retry resumes the feed range from its last continuation token
+WATERMARK_SKEW_SECONDS = 60 # Allowed clock difference between this machine and Cosmos DB's _ts
+
+def export_query(fields: list[str], since: int | None = None) -> tuple[str, list[dict]]:
+    """
+    Builds the projection query. Field names contain spaces, so they are read with c["..."]
+    and returned under the same names with SELECT VALUE {...}.
+    """
+    projection = ', '.join(f'"{field}": c["{field}"]' for field in fields)
+    query = f"SELECT VALUE {{{projection}}} FROM c"
+    parameters = []
+    if since is not None:
+        # >= rather than >: documents written in the same second as the last export are
+        # exported again instead of risking missing one
+        query += " WHERE c._ts >= @since"
+        parameters.append({'name': '@since', 'value': since})
+    return query, parameters
+
+class NdjsonExportWriter:
+    """One JSON document per line, gzip-compressed if the path ends in .gz."""
+
+    def __init__(self, path: str, fields: list[str]):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if path.endswith('.gz'):
+            self._file = gzip.open(self.tmp_path, 'wt', encoding='utf-8', compresslevel=6)
+        else:
+            self._file = open(self.tmp_path, 'w', encoding='utf-8')
+
+    def write(self, documents: list[dict]):
+        self._file.writelines(json.dumps(doc, ensure_ascii=False) + '\n' for doc in documents)
+
+    def close(self, commit: bool = True):
+        self._file.close()
+        if commit:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+class ParquetExportWriter:
+    """Parquet file written row group by row group (job columns as strings, _ts as int64)."""
+
+    def __init__(self, path: str, fields: list[str]):
+        if pa is None:
+            raise ImportError("pyarrow is not installed. Install it with 'pip install pyarrow' to export Parquet files.")
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.fields = fields
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.schema = pa.schema([(name, pa.int64() if name == '_ts' else pa.string()) for name in fields])
+        self._writer = pq.ParquetWriter(self.tmp_path, self.schema, compression='zstd')
+        self._rows = []
+
+    def write(self, documents: list[dict]):
+        self._rows.extend(documents)
+        if len(self._rows) >= PARQUET_ROW_GROUP_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        columns = {
+            name: [row.get(name) if name == '_ts' or row.get(name) is None else str(row.get(name)) for row in self._rows]
+            for name in self.fields
+        }
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self._rows = []
+
+    def close(self, commit: bool = True):
+        if commit:
+            self._flush()
+        self._writer.close()
+        if commit:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+def open_export_writer(path: str, fields: list[str], export_format: str | None = None):
+    """Picks the writer from `export_format` ('parquet' / 'ndjson') or the file extension."""
+    export_format = export_format or ('parquet' if path.endswith('.parquet') else 'ndjson')
+    if export_format == 'parquet':
+        return ParquetExportWriter(path, fields)
+    if export_format == 'ndjson':
+        return NdjsonExportWriter(path, fields)
+    raise ValueError(f"Unknown export format: {export_format}")
+
+def _export_feed_range(container, feed_range, query: str, parameters: list, page_size: int, write,
+                       fields: list[str], split_layout: bool = False) -> tuple[int, int | None]:
+    """Streams one feed range page by page. Returns (documents, highest _ts)."""
+    count, max_ts = 0, None
+    # Both halves of a split job share its partition key, so they are always in the same feed range
+    assembler = SplitDocumentAssembler() if split_layout else None
+
+    def emit(documents):
+        nonlocal count, max_ts
+        if assembler:
+            documents = [{field: job.get(field) for field in fields} for job in documents]
+        write(documents)
+        count += len(documents)
+        increment('export_documents', len(documents))
+        timestamps = [doc['_ts'] for doc in documents if doc.get('_ts') is not None]
+        if timestamps:
+            max_ts = max(max_ts or 0, max(timestamps))
+
+    token, failures = None, 0
+    while True:
+        try:
+            pages = container.query_items(query, parameters=parameters, feed_range=feed_range,
+                                          max_item_count=page_size).by_page(token)
+            for page in pages:
+                with timer('export_page'):
+                    documents = list(page)
+                emit(assembler.add(documents) if assembler else documents)
+                token, failures = pages.continuation_token, 0
+            if assembler:
+                emit(assembler.finish())
+            return count, max_ts
+        except exceptions.CosmosHttpResponseError as e:
+            failures += 1
+            increment('export_page_retries')
+            if failures >= PAGE_RETRIES:
+                raise
+            logging.warning(f"Export page failed ({e.status_code}); resuming feed range from its continuation token.")
+            time.sleep(2 ** failures)
+
+def export_container(container, writer, fields: list[str] | None = None, since: int | None = None,
+                     page_size: int = 1000, workers: int = 4, layout: str = 'inline') -> tuple[int, int | None]:
+    """
+    Streams a container into `writer`, reading its feed ranges (physical partition ranges) in
+    parallel instead of fanning one cross-partition query out over every partition.
+
+    Args:
+        container: The Cosmos DB container (ContainerProxy).
+        writer: An export writer (open_export_writer); pages are written as they arrive.
+        fields: Projected fields (default EXPORT_FIELDS).
+        since: Only export documents changed at or after this _ts (Unix seconds).
+        page_size: Documents per page (max_item_count).
+        workers: Feed ranges read at the same time.
+        layout: The container's COSMOS_LAYOUT. Split jobs are exported assembled, one row per job.
+
+    Returns:
+        (documents exported, highest _ts seen or None).
+    """
+    fields = fields or EXPORT_FIELDS
+    split_layout = layout == 'split'
+    query, parameters = export_query(SPLIT_LAYOUT_FIELDS if split_layout else fields, since)
+    feed_ranges = list(container.read_feed_ranges())
+    lock = threading.Lock()
+
+    def write(documents):
+        with lock:
+            writer.write(documents)
+
+    logging.info(f"Exporting {len(feed_ranges)} feed ranges with {workers} workers"
+                 f"{f' (changes since _ts {since})' if since is not None else ''}...")
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(feed_ranges)))) as pool:
+        results = list(pool.map(
+            lambda feed_range: _export_feed_range(container, feed_range, query, parameters, page_size, write,
+                                                  fields, split_layout),
+            feed_ranges
+        ))
+    count = sum(n for n, _ in results)
+    timestamps = [ts for _, ts in results if ts is not None]
+    return count, (max(timestamps) if timestamps else None)
+
+def load_watermark(state_path: str, container_id: str) -> int | None:
+    """The _ts watermark of the last successful export of this container, if any."""
+    if not state_path or not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f).get(container_id, {}).get('watermark')
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not read export state {state_path}: {e}. Running a full export.")
+        return None
+
+def save_watermark(state_path: str, container_id: str, watermark: int, output: str, documents: int):
+    state = {}
+    if os.path.exists(state_path):
+        try:
+            with open(state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+    state[container_id] = {
+        'watermark': watermark, 'exported_at': datetime.now().isoformat(timespec='seconds'),
+        'output': os.path.abspath(output), 'documents': documents,
+    }
+    directory = os.path.dirname(os.path.abspath(state_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+def run_export(container, output: str, export_format: str | None = None, state_path: str | None = None,
+               full: bool = False, page_size: int = 1000, workers: int = 4, layout: str = 'inline') -> int:
+    """
+    Exports the container to `output` (Parquet or NDJSON). With a `state_path`, only documents
+    changed since the previous successful export are read (unless `full`), and the watermark
+    moves forward once the file is complete. Returns the number of documents exported.
+
+    The watermark is the time the export started (less WATERMARK_SKEW_SECONDS), not the
+    highest _ts read: feed ranges are read in parallel, so a document changed during the
+    export in a range that was already read can have a lower _ts than one read later.
+    """
+    since = None if full else load_watermark(state_path, container.id)
+    started = int(time.time()) - WATERMARK_SKEW_SECONDS
+    writer = open_export_writer(output, EXPORT_FIELDS, export_format)
+    try:
+        with timer('export'):
+            count, _ = export_container(container, writer, since=since, page_size=page_size,
+                                        workers=workers, layout=layout)
+    except Exception:
+        writer.close(commit=False)
+        raise
+    writer.close()
+    logging.info(f"Exported {count} documents to {os.path.abspath(output)}.")
+    if state_path:
+        save_watermark(state_path, container.id, started, output, count)
+    return count
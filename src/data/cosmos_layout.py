@@ -0,0 +1,134 @@
+import base64
+import json
+import logging
+import re
+import zlib
+
+from src.data.job_record import CSV_FIELDNAMES
+from src.utils.helpers import job_key
+from src.utils.metrics import timer, increment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+LAYOUTS = ('inline', 'split')
+PARTITION_KEY_FIELD = 'Job Title' # Both halves of a split job share it, so they live in one partition
+
+# Fields list and filter queries need; everything else (the long text and the SID link) goes
+# into the body document
+SUMMARY_FIELDS = [
+    'Scrape Date', 'Job Title', 'Reference Number', 'Department', 'Location', 'Salary', 'Job Grade',
+    'Contract Type', 'Role Type', 'Working Pattern', 'Number Available', 'Closing Date', 'Match Score',
+]
+BODY_SUFFIX = '.body'
+_INVALID_ID_CHARS = re.compile(r'[/\\?#]') # Not allowed in Cosmos DB ids
+
+def split_item_id(job: dict) -> str | None:
+    """Id of a split job's summary document: the vacancy key, made safe for Cosmos DB ids."""
+    key = job_key(job)
+    return _INVALID_ID_CHARS.sub('_', key) if key else None
+
+def _encode_body(fields: dict, compress: bool) -> dict:
+    if not compress:
+        return {'encoding': 'json', 'fields': fields}
+    data = zlib.compress(json.dumps(fields, ensure_ascii=False).encode('utf-8'), 6)
+    return {'encoding': 'zlib+base64', 'data': base64.b64encode(data).decode('ascii')}
+
+def _decode_body(body: dict) -> dict:
+    if body.get('encoding') == 'zlib+base64':
+        return json.loads(zlib.decompress(base64.b64decode(body['data'])).decode('utf-8'))
+    return body.get('fields') or {}
+
+def split_job_document(job: dict, compress: bool = True) -> tuple[dict, dict] | None:
+    """
+    Splits a job (details dict) into a compact summary document and a body document.
+
+    The summary holds SUMMARY_FIELDS plus 'doc_type' and 'job_id'. The body holds the job's
+    remaining fields, zlib-compressed and base64-encoded if `compress`, plus the partition key.
+    Returns None if the job has no identity.
+    """
+    item_id = split_item_id(job)
+    if not item_id:
+        return None
+    summary = {'id': item_id, 'doc_type': 'summary', 'job_id': item_id}
+    summary.update((field, job.get(field)) for field in SUMMARY_FIELDS)
+    rest = {k: v for k, v in job.items() if k not in summary and k != 'id' and not k.startswith('_')}
+    body = {'id': f"{item_id}{BODY_SUFFIX}", 'doc_type': 'body', 'job_id': item_id,
+            PARTITION_KEY_FIELD: job.get(PARTITION_KEY_FIELD)}
+    body.update(_encode_body(rest, compress))
+    return summary, body
+
+def assemble_job_document(summary: dict, body: dict | None = None) -> dict:
+    """
+    Rebuilds the job from its summary and body documents, in the CSV column order, with the
+    summary's 'id' and the newest '_ts' of the two. Without a body, the body fields are None.
+    """
+    fields = _decode_body(body) if body else {}
+    job = {column: summary[column] if column in summary else fields.get(column) for column in CSV_FIELDNAMES}
+    job.update((k, v) for k, v in fields.items() if k not in job)
+    job['id'] = summary['id']
+    timestamps = [doc['_ts'] for doc in (summary, body) if doc and doc.get('_ts') is not None]
+    if timestamps:
+        job['_ts'] = max(timestamps)
+    return job
+
+class SplitDocumentAssembler:
+    """
+    Pairs summary and body documents arriving in any order (e.g. pages of one feed range) and
+    yields assembled jobs. Documents without a 'doc_type' (inline layout) pass straight through.
+    """
+
+    def __init__(self):
+        self._pending = {} # job_id -> the half seen first
+
+    def add(self, documents) -> list[dict]:
+        jobs = []
+        for doc in documents:
+            doc_type = doc.get('doc_type')
+            if doc_type not in ('summary', 'body'):
+                jobs.append(doc)
+                continue
+            other = self._pending.pop(doc['job_id'], None)
+            if other is None:
+                self._pending[doc['job_id']] = doc
+            elif doc_type == 'summary':
+                jobs.append(assemble_job_document(doc, other))
+            else:
+                jobs.append(assemble_job_document(other, doc))
+        return jobs
+
+    def finish(self) -> list[dict]:
+        """Summaries whose body never arrived, assembled without it. Orphaned bodies are dropped."""
+        jobs = [assemble_job_document(doc) for doc in self._pending.values() if doc['doc_type'] == 'summary']
+        orphans = len(self._pending) - len(jobs)
+        if jobs or orphans:
+            logging.warning(f"Split layout: {len(jobs)} summaries without a body, {orphans} bodies without a summary.")
+        self._pending = {}
+        return jobs
+
+def read_job_from_cosmos(container, job_id: str, partition_key: str, include_body: bool = True) -> dict:
+    """
+    Reads one split-layout job with point reads (the cheapest Cosmos DB read). Pass
+    include_body=False when the summary fields are enough.
+
+    Raises:
+        azure.cosmos.exceptions.CosmosResourceNotFoundError: If the summary does not exist.
+    """
+    with timer('cosmos_read'):
+        summary = container.read_item(item=job_id, partition_key=partition_key)
+        body = container.read_item(item=f"{job_id}{BODY_SUFFIX}", partition_key=partition_key) if include_body else None
+    increment('cosmos_reads')
+    return assemble_job_document(summary, body)
+
+def query_jobs_from_cosmos(container, where: str = '', parameters: list | None = None, include_body: bool = False):
+    """
+    Yields split-layout jobs matching a filter on the summary fields, e.g.
+    where='c["Job Grade"] = @grade'. Only summary documents are scanned; with include_body the
+    matching bodies are fetched by point read and assembled.
+    """
+    query = "SELECT * FROM c WHERE c.doc_type = 'summary'" + (f" AND ({where})" if where else '')
+    for summary in container.query_items(query, parameters=parameters or [], enable_cross_partition_query=True):
+        if include_body:
+            body = container.read_item(item=f"{summary['id']}{BODY_SUFFIX}", partition_key=summary.get(PARTITION_KEY_FIELD))
+            yield assemble_job_document(summary, body)
+        else:
+            yield assemble_job_document(summary)
@@ -2,6 +2,9 @@ import logging
 from azure.cosmos import CosmosClient, PartitionKey, exceptions
 from azure.identity import DefaultAzureCredential # Import DefaultAzureCredential
 
+from src.data.cosmos_layout import split_job_document, PARTITION_KEY_FIELD
+from src.utils.metrics import timer, increment
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def initialize_cosmos_client(endpoint: str) -> CosmosClient | None: # Removed key parameter
@@ -38,11 +41,19 @@ def get_cosmos_container(client: CosmosClient, db_name: str, container_name: str
         logging.error(f"An unexpected error occurred with Cosmos DB container: {e}")
         return None
 
-def write_job_to_cosmos(container, job_data: dict):
-    """Writes (upserts) a single job dictionary to the Cosmos DB container."""
+def write_job_to_cosmos(container, job_data: dict, layout: str = 'inline', compress_body: bool = True):
+    """
+    Writes (upserts) a single job dictionary to the Cosmos DB container.
+
+    With layout='split' the job is stored as a compact summary document plus a body document
+    (see cosmos_layout.py), upserted together in one transactional batch.
+    """
     if not container or not job_data:
         logging.warning("Cosmos container or job data is missing, cannot write.")
         return
+    if layout == 'split':
+        _write_split_job(container, job_data, compress_body)
+        return
 
     try:
         # Add an 'id' field if it doesn't exist, using 'Link' or 'Reference Number' if available
@@ -58,12 +69,38 @@ def write_job_to_cosmos(container, job_data: dict):
                  return
 
         logging.debug(f"Upserting job with id: {job_data['id']}")
-        container.upsert_item(body=job_data)
+        with timer('cosmos_write'):
+            container.upsert_item(body=job_data)
+        increment('cosmos_writes')
         logging.info(f"Successfully upserted job '{job_data.get('Job Title', job_data['id'])}' to Cosmos DB.")
     except exceptions.CosmosHttpResponseError as e:
         logging.error(f"Cosmos DB HTTP error writing job id {job_data.get('id', 'N/A')}: {e.message}")
+        increment('cosmos_write_failures')
     except Exception as e:
         logging.error(f"Unexpected error writing job id {job_data.get('id', 'N/A')} to Cosmos DB: {e}")
+        increment('cosmos_write_failures')
+
+def _write_split_job(container, job_data: dict, compress_body: bool):
+    documents = split_job_document(job_data, compress_body)
+    if not documents:
+        logging.error(f"Cannot determine unique ID for job: {job_data.get('Job Title')}. Skipping Cosmos write.")
+        return
+    summary, body = documents
+    try:
+        with timer('cosmos_write'):
+            # Same partition key, so both halves are written atomically and never disagree
+            container.execute_item_batch(
+                [('upsert', (body,)), ('upsert', (summary,))],
+                partition_key=summary[PARTITION_KEY_FIELD]
+            )
+        increment('cosmos_writes')
+        logging.info(f"Successfully upserted job '{summary.get('Job Title', summary['id'])}' to Cosmos DB (split layout).")
+    except exceptions.CosmosHttpResponseError as e:
+        logging.error(f"Cosmos DB HTTP error writing job id {summary['id']}: {e.message}")
+        increment('cosmos_write_failures')
+    except Exception as e:
+        logging.error(f"Unexpected error writing job id {summary['id']} to Cosmos DB: {e}")
+        increment('cosmos_write_failures')
 
 if __name__ == '__main__':
     # Example Usage (requires .env file with Cosmos details, except key)
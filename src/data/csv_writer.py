@@ -2,19 +2,25 @@ import csv
 import logging
 import os
 
+from src.data.job_record import JobRecord
+from src.utils.helpers import job_key
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def save_to_csv(data: list[dict], filename: str):
-    """Writes a list of dictionaries to a CSV file.
+def save_to_csv(data: list[dict] | list[JobRecord], filename: str) -> bool:
+    """Writes a list of dictionaries (or JobRecords) to a CSV file.
 
     Args:
-        data: A list of dictionaries, where each dictionary represents a row.
-              All dictionaries should ideally have the same keys.
+        data: A list of dictionaries or JobRecords, where each item represents a row.
+              Rows may have different keys; missing values are left empty.
         filename: The name (including path) of the CSV file to write.
+
+    Returns:
+        True if the file was written.
     """
     if not data:
         logging.warning("No data provided to write to CSV.")
-        return
+        return False
 
     # Ensure the directory exists if filename includes a path
     directory = os.path.dirname(filename)
@@ -24,25 +30,53 @@ def save_to_csv(data: list[dict], filename: str):
             logging.info(f"Created directory: {directory}")
         except OSError as e:
             logging.error(f"Error creating directory {directory}: {e}")
-            return # Cannot proceed if directory creation fails
+            return False # Cannot proceed if directory creation fails
 
     try:
-        # Use the keys from the first dictionary as header
-        fieldnames = data[0].keys()
-        
+        # Header: the keys of every row, in first-seen order (JobRecord extras differ between rows)
+        fieldnames = list(dict.fromkeys(key for row in data for key in row.keys()))
+
         logging.info(f"Writing {len(data)} rows to CSV file: {filename}")
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             
             writer.writeheader()
-            writer.writerows(data)
+            # JobRecords are expanded one row at a time, never all at once
+            writer.writerows(row.to_dict() if isinstance(row, JobRecord) else row for row in data)
             
         logging.info(f"Successfully wrote data to {filename}")
+        return True
 
     except (IOError, csv.Error) as e:
         logging.error(f"Error writing to CSV file {filename}: {e}")
     except Exception as e:
         logging.error(f"An unexpected error occurred during CSV writing: {e}")
+    return False
+
+def update_csv(data: list[dict] | list[JobRecord], filename: str) -> bool:
+    """
+    Adds rows to a CSV file written by earlier runs instead of overwriting it. A row of the same
+    vacancy (job_key) is replaced by the new one, and every other existing row is kept. With
+    cross-run dedup a run only scrapes new and refreshed jobs, so this keeps the full history.
+    The file is replaced atomically. Returns True if it was written.
+    """
+    if not data:
+        logging.warning("No data provided to write to CSV.")
+        return False
+    rows = []
+    if os.path.exists(filename):
+        new_keys = {job_key(row) for row in data}
+        with open(filename, newline='', encoding='utf-8') as f:
+            rows = [{k: (v or None) for k, v in row.items()} for row in csv.DictReader(f)
+                    if job_key(row) not in new_keys]
+        logging.info(f"Keeping {len(rows)} rows of {filename} from earlier runs.")
+    tmp_path = f"{filename}.tmp"
+    if not save_to_csv(rows + list(data), tmp_path):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, filename)
+    return True
 
 if __name__ == '__main__':
     # Example Usage
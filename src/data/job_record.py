@@ -0,0 +1,154 @@
+import logging
+import sys
+import zlib
+from dataclasses import dataclass
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Record attribute -> column name used in the CSV, Cosmos DB items and the details dicts
+FIELD_NAMES = {
+    'scrape_date': 'Scrape Date',
+    'job_title': 'Job Title',
+    'reference_number': 'Reference Number',
+    'department': 'Department',
+    'link': 'Link',
+    'location': 'Location',
+    'salary': 'Salary',
+    'job_grade': 'Job Grade',
+    'contract_type': 'Contract Type',
+    'role_type': 'Role Type',
+    'working_pattern': 'Working Pattern',
+    'number_available': 'Number Available',
+    'closing_date': 'Closing Date',
+    'job_summary': 'Job Summary',
+    'job_description': 'Job Description',
+    'person_specification': 'Person Specification',
+    'qualifications': 'Qualifications',
+    'behaviours': 'Behaviours',
+    'technical_skills': 'Technical Skills',
+    'benefits': 'Benefits',
+    'selection_process': 'Selection Process',
+    'contact_name': 'Contact Name',
+    'contact_email': 'Contact Email',
+    'match_score': 'Match Score',
+}
+ATTRIBUTES = {column: attr for attr, column in FIELD_NAMES.items()}
+CSV_FIELDNAMES = list(FIELD_NAMES.values())
+
+# Fields with a small set of values shared by many jobs (plus per-department boilerplate):
+# every record points at one interned copy instead of holding its own
+CATEGORICAL_FIELDS = (
+    'scrape_date', 'department', 'location', 'job_grade', 'contract_type', 'role_type',
+    'working_pattern', 'number_available', 'closing_date', 'benefits', 'selection_process',
+    'contact_name', 'contact_email',
+)
+# Long free-text fields, kept zlib-compressed: prose shrinks 2-3x and is mostly read once (CSV,
+# Cosmos, matching), so the decompression on access is cheaper than holding it all as str
+TEXT_FIELDS = ('job_summary', 'job_description', 'person_specification', 'qualifications',
+               'behaviours', 'technical_skills')
+COMPRESS_MIN_CHARS = 256 # Shorter values are not worth a zlib stream
+
+def _text(value):
+    return zlib.decompress(value).decode('utf-8') if type(value) is bytes else value
+
+@dataclass(slots=True)
+class JobRecord:
+    """
+    One scraped job. Stores the 24 job fields in slots (no per-record dict), interns the
+    categorical ones and keeps long free text compressed, which makes a large corpus several
+    times smaller than the same jobs as dicts. Read fields by column name (`record['Job Title']`,
+    `record.get(...)`) or through the conversions: the attributes of TEXT_FIELDS may hold
+    compressed bytes. Column access means code written for the details dicts keeps working.
+    """
+    scrape_date: str | None = None
+    job_title: str | None = None
+    reference_number: str | None = None
+    department: str | None = None
+    link: str | None = None
+    location: str | None = None
+    salary: str | None = None
+    job_grade: str | None = None
+    contract_type: str | None = None
+    role_type: str | None = None
+    working_pattern: str | None = None
+    number_available: str | None = None
+    closing_date: str | None = None
+    job_summary: str | bytes | None = None
+    job_description: str | bytes | None = None
+    person_specification: str | bytes | None = None
+    qualifications: str | bytes | None = None
+    behaviours: str | bytes | None = None
+    technical_skills: str | bytes | None = None
+    benefits: str | None = None
+    selection_process: str | None = None
+    contact_name: str | None = None
+    contact_email: str | None = None
+    match_score: str | float | None = None
+    extra: dict | None = None # Columns outside the standard 24 (e.g. Cosmos 'id'), if any
+
+    def __post_init__(self):
+        for attr in CATEGORICAL_FIELDS:
+            value = getattr(self, attr)
+            if type(value) is str:
+                setattr(self, attr, sys.intern(value))
+        for attr in TEXT_FIELDS:
+            value = getattr(self, attr)
+            if type(value) is str and len(value) >= COMPRESS_MIN_CHARS:
+                setattr(self, attr, zlib.compress(value.encode('utf-8'), 1))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'JobRecord':
+        """Builds a record from a details dict (as returned by the scrapers, CSV or Cosmos)."""
+        values, extra = {}, None
+        for column, value in data.items():
+            attr = ATTRIBUTES.get(column)
+            if attr:
+                values[attr] = value
+            elif not column.startswith('_'): # Skip Cosmos system properties (_rid, _etag, _ts, ...)
+                extra = extra or {}
+                extra[column] = value
+        return cls(**values, extra=extra)
+
+    # --- Read access by column name ---
+    def __getitem__(self, column: str):
+        attr = ATTRIBUTES.get(column)
+        if attr:
+            return _text(getattr(self, attr))
+        if self.extra and column in self.extra:
+            return self.extra[column]
+        raise KeyError(column)
+
+    def get(self, column: str, default=None):
+        try:
+            value = self[column]
+        except KeyError:
+            return default
+        return value
+
+    def keys(self) -> list[str]:
+        return CSV_FIELDNAMES + list(self.extra or ())
+
+    # --- Conversions ---
+    def to_dict(self) -> dict:
+        """The details dict shape: the 24 columns in their usual order (plus any extras)."""
+        data = {column: _text(getattr(self, attr)) for attr, column in FIELD_NAMES.items()}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_row(self) -> list:
+        """Values in CSV_FIELDNAMES order, for csv.writer."""
+        return [_text(getattr(self, attr)) for attr in FIELD_NAMES]
+
+    def to_cosmos(self) -> dict | None:
+        """
+        The Cosmos DB item: the details dict with an 'id' (Link, falling back to the
+        Reference Number). Returns None if the job has neither.
+        """
+        item = self.to_dict()
+        if 'id' not in item:
+            item_id = self.link or self.reference_number
+            if not item_id:
+                return None
+            item['id'] = item_id
+        return item
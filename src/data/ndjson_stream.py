@@ -0,0 +1,205 @@
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from src.utils.metrics import increment
+
+try:
+    import zstandard
+except ImportError: # Optional dependency: pip install zstandard
+    zstandard = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MANIFEST_SUFFIX = '.manifest.json' # <prefix>.manifest.json lists the finished segments of one stream
+PART_SUFFIX = '.part' # The segment being written; tailers never read it
+EXTENSIONS = {'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst', 'none': '.ndjson'}
+# Errors of a truncated compressed stream
+_TRUNCATED_ERRORS = (EOFError, OSError, ValueError) + ((zstandard.ZstdError,) if zstandard else ())
+_SEGMENT_PATTERN = re.compile(r'^(?P<prefix>.+)-(?P<sequence>\d{6})-\d{8}T\d{6}\.ndjson(\.gz|\.zst)?$')
+
+def resolve_compression(compression: str) -> str:
+    """'gzip', 'zstd' or 'none'; zstd falls back to gzip when zstandard is not installed."""
+    compression = (compression or 'none').lower()
+    if compression not in EXTENSIONS:
+        raise ValueError(f"Unknown NDJSON compression: {compression}")
+    if compression == 'zstd' and zstandard is None:
+        logging.warning("zstandard is not installed (pip install zstandard); NDJSON segments fall back to gzip.")
+        return 'gzip'
+    return compression
+
+def _open_compressed(raw, compression: str):
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=3) # Level 3: ~85% of level 6's ratio at a third of its CPU
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
+    return raw
+
+def open_segment(path: str):
+    """Opens a segment (any compression, finished or .part) for reading lines as text."""
+    name = path[:-len(PART_SUFFIX)] if path.endswith(PART_SUFFIX) else path
+    if name.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if name.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("zstandard is not installed. Install it with 'pip install zstandard' to read .zst segments.")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True), encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+def manifest_path(directory: str, prefix: str = 'jobs') -> str:
+    return os.path.join(directory, f"{prefix}{MANIFEST_SUFFIX}")
+
+def read_manifest(directory: str, prefix: str = 'jobs') -> dict:
+    """A stream's manifest: its finished segments, oldest first. Empty if nothing was published yet."""
+    path = manifest_path(directory, prefix)
+    if not os.path.exists(path):
+        return {'segments': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def _fsync_directory(directory: str):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError: # Not possible on Windows; os.replace is still atomic there
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class NdjsonSegmentWriter:
+    """
+    Append-only NDJSON stream split into compressed segments.
+
+    Records are compressed as they are written into `<prefix>-<sequence>-<opened>.ndjson.gz.part`.
+    A segment is rotated once it reaches `rotate_bytes` (compressed) or has been open for
+    `rotate_seconds` (checked on every write and by a background ticker, so a quiet stream
+    still publishes), and on close. Rotating finishes the compressor, fsyncs the file, renames
+    it without the .part suffix and appends it to `<prefix>.manifest.json`, which is itself
+    replaced atomically. Consumers read the manifest and only ever see
+    complete segments, so tailing the stream needs no locking and no database reads.
+    """
+
+    def __init__(self, directory: str, prefix: str = 'jobs', compression: str = 'gzip',
+                 rotate_bytes: int = 64 * 1024 * 1024, rotate_seconds: float = 300):
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = resolve_compression(compression)
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._manifest = read_manifest(directory, prefix)
+        self._sequence = max((s['sequence'] for s in self._manifest['segments']), default=0)
+        self._raw = self._stream = None
+        self._recover_parts()
+        self._closed = threading.Event()
+        if rotate_seconds:
+            threading.Thread(target=self._rotate_when_due, name='ndjson-rotate', daemon=True).start()
+
+    # --- Segments ---
+    def _open_segment(self):
+        self._sequence += 1
+        self._opened = time.monotonic()
+        self._first_at = datetime.now().isoformat(timespec='seconds')
+        name = f"{self.prefix}-{self._sequence:06d}-{datetime.now():%Y%m%dT%H%M%S}{EXTENSIONS[self.compression]}"
+        self._path = os.path.join(self.directory, name)
+        self._raw = open(self._path + PART_SUFFIX, 'wb')
+        self._stream = _open_compressed(self._raw, self.compression)
+        self._records = 0
+
+    def _publish(self, path: str, records: int, first_at: str):
+        """Renames a finished .part file and appends it to the manifest, atomically."""
+        os.replace(path + PART_SUFFIX, path)
+        _fsync_directory(self.directory)
+        self._manifest['segments'].append({
+            'file': os.path.basename(path), 'sequence': int(_SEGMENT_PATTERN.match(os.path.basename(path))['sequence']),
+            'records': records, 'bytes': os.path.getsize(path), 'compression': self.compression,
+            'first_written_at': first_at, 'closed_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        self._manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        path = manifest_path(self.directory, self.prefix)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        increment('ndjson_segments')
+
+    def _close_segment(self):
+        if self._stream is None:
+            return
+        if self._stream is not self._raw:
+            self._stream.close() # Writes the gzip trailer / zstd frame end; leaves the raw file open
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        if self._records:
+            self._publish(self._path, self._records, self._first_at)
+        else:
+            os.remove(self._path + PART_SUFFIX)
+        self._raw = self._stream = None
+
+    def _recover_parts(self):
+        """
+        Publishes what a crashed run left in .part files: the complete lines of the readable
+        prefix are rewritten as a normal segment.
+        """
+        for name in sorted(os.listdir(self.directory)):
+            match = _SEGMENT_PATTERN.match(name[:-len(PART_SUFFIX)]) if name.endswith(PART_SUFFIX) else None
+            if not match or match['prefix'] != self.prefix:
+                continue
+            part_path = os.path.join(self.directory, name)
+            lines = []
+            try:
+                with open_segment(part_path) as f:
+                    for line in f:
+                        lines.append(line)
+            except _TRUNCATED_ERRORS: # UnicodeDecodeError is a ValueError
+                pass # Truncated stream: keep what could be read
+            os.remove(part_path)
+            if lines and not lines[-1].endswith('\n'):
+                lines.pop() # Torn last record
+            if lines:
+                self._open_segment()
+                self._stream.write(''.join(lines).encode('utf-8'))
+                self._records = len(lines)
+                self._close_segment()
+            logging.warning(f"Recovered {len(lines)} records from unfinished NDJSON segment {name}.")
+
+    def _due(self) -> bool:
+        return (self._raw.tell() >= self.rotate_bytes or
+                bool(self.rotate_seconds) and time.monotonic() - self._opened >= self.rotate_seconds)
+
+    def _rotate_when_due(self):
+        while not self._closed.wait(min(self.rotate_seconds, 5)):
+            with self._lock:
+                if self._stream is not None and self._due():
+                    self._close_segment()
+
+    # --- Records ---
+    def write(self, document: dict):
+        line = (json.dumps(document, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        with self._lock:
+            if self._stream is None:
+                self._open_segment()
+            self._stream.write(line)
+            self._records += 1
+            if self._due():
+                self._close_segment()
+
+    def rotate(self):
+        """Publishes the open segment now (e.g. at the end of a crawl)."""
+        with self._lock:
+            self._close_segment()
+
+    def close(self):
+        self._closed.set()
+        self.rotate()
@@ -0,0 +1,67 @@
+import logging
+import os
+
+from src.parsing.batch_normalize import normalize_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Optional dependency: pip install pyarrow
+    pa = None
+    pq = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def _normalized_schema() -> list:
+    return [
+        ('salary_min', pa.int64()), ('salary_max', pa.int64()), ('grade_code', pa.dictionary(pa.int8(), pa.string())),
+        ('grade_codes', pa.list_(pa.string())), ('closing_at', pa.timestamp('s')), ('locations', pa.list_(pa.string())),
+    ]
+
+def save_to_parquet(data: list[dict], filename: str, normalized: bool = False):
+    """Writes a list of dictionaries to a Parquet file (all columns stored as strings).
+
+    Args:
+        data: A list of dictionaries, where each dictionary represents a row.
+              All dictionaries should ideally have the same keys.
+        filename: The name (including path) of the Parquet file to write.
+        normalized: Also write the typed columns of normalize_columns (salary range as
+              integers, grade codes, closing timestamp, location lists).
+    """
+    if pa is None:
+        logging.error("pyarrow is not installed. Install it with 'pip install pyarrow' to write Parquet files.")
+        return
+    if not data:
+        logging.warning("No data provided to write to Parquet.")
+        return
+
+    directory = os.path.dirname(filename)
+    if directory and not os.path.exists(directory):
+        try:
+            os.makedirs(directory)
+            logging.info(f"Created directory: {directory}")
+        except OSError as e:
+            logging.error(f"Error creating directory {directory}: {e}")
+            return
+
+    try:
+        # Schema: the keys of every row, in first-seen order, like save_to_csv
+        fieldnames = list(dict.fromkeys(key for row in data for key in row.keys()))
+        columns = {
+            name: [None if row.get(name) is None else str(row.get(name)) for row in data]
+            for name in fieldnames
+        }
+        fields = [(name, pa.string()) for name in fieldnames]
+        if normalized:
+            columns.update(normalize_columns(data))
+            fields += _normalized_schema()
+        schema = pa.schema(fields)
+        table = pa.Table.from_pydict(columns, schema=schema)
+
+        logging.info(f"Writing {len(data)} rows to Parquet file: {filename}")
+        pq.write_table(table, filename, compression='zstd')
+        logging.info(f"Successfully wrote data to {filename}")
+    except (IOError, pa.ArrowException) as e:
+        logging.error(f"Error writing to Parquet file {filename}: {e}")
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during Parquet writing: {e}")
@@ -0,0 +1,136 @@
+import logging
+import threading
+
+from src.data.csv_writer import update_csv
+from src.data.cosmos_writer import write_job_to_cosmos
+from src.data.job_record import JobRecord
+from src.data.ndjson_stream import NdjsonSegmentWriter
+from src.data.sqlite_store import SqliteJobStore
+from src.matching.semantic_index import SemanticIndex, job_text
+from src.utils.helpers import job_key
+from src.utils.metrics import increment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class Sink:
+    """
+    Destination for scraped job records (JobRecords from the crawl pipeline).
+
+    `write` is called once per record (possibly from several worker threads if the sink's
+    `workers` is above 1), and `close` once at the end of the run.
+    """
+    name = 'sink'
+    workers = 1
+
+    def write(self, record: JobRecord):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class CosmosSink(Sink):
+    """Upserts each record into a Cosmos DB container as soon as it arrives."""
+    name = 'cosmos'
+
+    def __init__(self, container, workers: int = 2, layout: str = 'inline', compress_body: bool = True):
+        self.container = container
+        self.workers = workers # The container client is safe to share between threads
+        self.layout = layout
+        self.compress_body = compress_body
+
+    def write(self, record: JobRecord | dict):
+        if isinstance(record, JobRecord):
+            item = record.to_cosmos() or record.to_dict() # Fresh dict; without an id the writer logs and skips it
+        else:
+            item = record.copy() # Pass a copy to avoid modification issues
+        write_job_to_cosmos(self.container, item, self.layout, self.compress_body)
+
+class CsvSink(Sink):
+    """
+    Collects records in memory (as compact JobRecords) and adds them to one CSV file when
+    closed: rows of earlier runs are kept, and rows of re-scraped vacancies are replaced.
+    """
+    name = 'csv'
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.records = []
+        self._lock = threading.Lock()
+
+    def write(self, record: JobRecord):
+        with self._lock:
+            self.records.append(record)
+
+    def close(self):
+        if self.records:
+            logging.info(f"Attempting to save {len(self.records)} scraped job details to CSV: {self.filename}")
+            update_csv(self.records, self.filename)
+        else:
+            logging.info("No job details were successfully scraped to save to CSV.")
+
+class NdjsonStreamSink(Sink):
+    """
+    Appends each record, as soon as it is parsed, to a compressed, rotating NDJSON stream
+    (see ndjson_stream.py) that downstream consumers tail through its manifest.
+    """
+    name = 'ndjson'
+
+    def __init__(self, directory: str, compression: str = 'gzip', rotate_mb: float = 64, rotate_seconds: float = 300,
+                 prefix: str = 'jobs'):
+        self.writer = NdjsonSegmentWriter(directory, prefix, compression,
+                                          rotate_bytes=int(rotate_mb * 1024 * 1024), rotate_seconds=rotate_seconds)
+
+    def write(self, record: JobRecord | dict):
+        document = record.to_dict() if isinstance(record, JobRecord) else dict(record)
+        document['job_key'] = job_key(record)
+        self.writer.write(document)
+        increment('ndjson_records')
+
+    def close(self):
+        self.writer.close()
+        logging.info(f"NDJSON job stream {self.writer.directory} published.")
+
+class SqliteStoreSink(Sink):
+    """Writes every record into the local SQLite job store (see sqlite_store.py), committing in batches."""
+    name = 'sqlite'
+
+    def __init__(self, path: str, batch_size: int = 100):
+        self.store = SqliteJobStore(path)
+        self.batch_size = batch_size
+        self._pending = 0
+
+    def write(self, record: JobRecord):
+        if self.store.upsert(record, commit=False):
+            increment('store_writes')
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self.store.commit()
+                self._pending = 0
+
+    def close(self):
+        self.store.close()
+        logging.info(f"Local job store {self.store.path} updated.")
+
+class SemanticIndexSink(Sink):
+    """Adds every record to the semantic match index (see semantic_index.py), committing in batches."""
+    name = 'semantic_index'
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self.index = SemanticIndex(path)
+        self.batch_size = batch_size
+        self._pending = 0
+
+    def write(self, record: JobRecord):
+        key = job_key(record)
+        if not key:
+            return
+        self.index.add(key, job_text(record), title=record.get('Job Title'), commit=False)
+        increment('semantic_index_writes')
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.index.commit()
+            self._pending = 0
+
+    def close(self):
+        self.index.close()
+        logging.info(f"Semantic job index {self.index.path} updated ({self.index.count()} jobs).")
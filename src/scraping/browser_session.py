@@ -0,0 +1,270 @@
+import logging
+import time
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from src.scraping.driver_setup import initialize_driver
+from src.scraping.navigation import run_search, go_to_next_page
+from src.scraping.job_list_scraper import JOB_LIST_CONTAINER_SELECTOR
+from src.scraping.page_profiler import capture_page, discard_page_log
+from src.utils.metrics import timer, increment
+
+try:
+    import psutil # Optional: gives the real resident memory of the browser process tree
+except ImportError:
+    psutil = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class BrowserSession:
+    """
+    Owns the WebDriver for a crawl and recycles it before Chrome's memory grows unbounded.
+
+    The browser is restarted after `max_pages` navigations, when its memory use exceeds
+    `max_memory_mb`, or when it stops responding (renderer crash, dead session). After a
+    restart the search is re-run and the last recorded results page is restored, so callers
+    can keep using `session.driver` as if nothing happened.
+    """
+
+    def __init__(self, target_url: str, browser_name: str = 'chrome', headless: bool = True,
+                 max_pages: int = 200, max_memory_mb: int = 1500, wait_after_search: int = 30,
+                 needs_search: bool = True, search_max_age_minutes: float = 60):
+        self.target_url = target_url
+        self.needs_search = needs_search # False for sessions that only open job detail links
+        self.browser_name = browser_name
+        self.headless = headless
+        self.max_pages = max_pages # 0 disables page-count recycling
+        self.max_memory_mb = max_memory_mb # 0 disables memory-based recycling
+        self.wait_after_search = wait_after_search
+        self.search_max_age = search_max_age_minutes * 60 # rewind() re-runs older searches (0 = never)
+        self.searched_at = None
+        self.first_results_url = None
+        self.driver = None
+        self.pages_since_start = 0
+        self.restarts = 0
+        self.results_url = None
+        self.results_page_number = 1
+
+    # --- Lifecycle ---
+    def start(self) -> bool:
+        """Launches the browser and runs the initial search. Returns False if the search fails."""
+        self._launch()
+        if not self.needs_search:
+            return True
+        if not self._search():
+            return False
+        self.mark_results_page(1)
+        return True
+
+    def quit(self):
+        """Closes the browser, ignoring errors from an already-dead session."""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logging.warning(f"Error while quitting WebDriver (ignored): {e}")
+            self.driver = None
+
+    def restart(self, reason: str) -> bool:
+        """
+        Replaces the browser with a fresh one and restores the current results page.
+        Returns False if the browser could not be launched or the results page restored.
+        """
+        logging.warning(f"Restarting browser session ({reason}) after {self.pages_since_start} page loads.")
+        self.restarts += 1
+        increment('browser_restarts')
+        self.quit()
+        try:
+            self._launch()
+        except Exception as e:
+            logging.error(f"Could not launch a new browser: {e}")
+            increment('browser_restart_failures')
+            return False
+        if not self.needs_search:
+            return True
+        if not self._search():
+            logging.error("Could not re-run the search after restarting the browser.")
+            return False
+        return self._restore_results_page()
+
+    def _launch(self):
+        with timer('driver_startup'):
+            self.driver = initialize_driver(browser_name=self.browser_name, headless=self.headless)
+        self.pages_since_start = 0
+
+    def _search(self) -> bool:
+        discard_page_log(self.driver)
+        with timer('search'):
+            searched = run_search(self.driver, self.target_url, self.wait_after_search)
+        capture_page(self.driver, 'search')
+        self.searched_at = time.monotonic()
+        return searched
+
+    def rewind(self) -> bool:
+        """
+        Brings a warm session back to results page 1 for another crawl (daemon mode).
+
+        Reloads the page-1 URL recorded by the last search, which skips the landing page, the
+        search click and the results wait. The search is only re-run when that URL no longer
+        shows results (the site session expired) or the search is older than its max age.
+        Returns False if the search could not be re-run.
+        """
+        age = time.monotonic() - self.searched_at if self.searched_at is not None else None
+        if self.first_results_url and age is not None and not (self.search_max_age and age >= self.search_max_age):
+            self.results_url, self.results_page_number = self.first_results_url, 1
+            if not self.before_navigation():
+                return False
+            try:
+                with timer('search_reuse'):
+                    self.driver.get(self.first_results_url)
+                    loaded = self._results_page_loaded()
+                if loaded:
+                    increment('search_sessions_reused')
+                    self.mark_results_page(1)
+                    return True
+                logging.info("Saved search results no longer load (site session expired).")
+            except WebDriverException as e:
+                logging.warning(f"Could not reload the saved search results: {e}")
+        increment('search_sessions_refreshed')
+        self.pages_since_start += 1
+        if not self._search():
+            return False
+        self.mark_results_page(1)
+        return True
+
+    # --- Health ---
+    def is_alive(self) -> bool:
+        """Returns True if the browser still answers a trivial script call."""
+        if not self.driver:
+            return False
+        try:
+            self.driver.execute_script("return 1;")
+            return True
+        except WebDriverException as e:
+            logging.error(f"Browser session is not responding: {e.msg if hasattr(e, 'msg') else e}")
+            return False
+
+    def memory_mb(self) -> float | None:
+        """Returns the browser's memory use in MB, or None if it cannot be measured."""
+        if self.driver is None:
+            return None
+        if psutil:
+            try:
+                service_process = getattr(getattr(self.driver, 'service', None), 'process', None)
+                if service_process:
+                    root = psutil.Process(service_process.pid)
+                    processes = [root] + root.children(recursive=True)
+                    return sum(p.memory_info().rss for p in processes if p.is_running()) / (1024 * 1024)
+            except psutil.Error as e:
+                logging.debug(f"Could not read browser process memory: {e}")
+        # Fallback (Chrome only): JS heap of the current page
+        try:
+            heap = self.driver.execute_script(
+                "return (window.performance && performance.memory) ? performance.memory.totalJSHeapSize : null;"
+            )
+            return heap / (1024 * 1024) if heap else None
+        except WebDriverException:
+            return None
+
+    def _recycle_reason(self) -> str | None:
+        if self.max_pages and self.pages_since_start >= self.max_pages:
+            return f"page limit {self.max_pages} reached"
+        if self.max_memory_mb:
+            memory = self.memory_mb()
+            if memory is not None and memory >= self.max_memory_mb:
+                return f"memory {memory:.0f} MB >= {self.max_memory_mb} MB"
+        return None
+
+    # --- Navigation helpers used by the crawl loop ---
+    def before_navigation(self) -> bool:
+        """
+        Call before each driver.get(); recycles the browser if a limit has been reached.
+        Returns False if the browser had to be replaced and the restart failed, in which case
+        the session has no usable driver and the navigation must not go ahead.
+        """
+        reason = self._recycle_reason()
+        if (reason or not self.is_alive()) and not self.restart(reason or "browser not responding"):
+            return False
+        self.pages_since_start += 1
+        discard_page_log(self.driver) # Profile only the coming navigation
+        return True
+
+    def recover(self) -> bool:
+        """Restarts the browser if it has died. Returns True if a restart happened and succeeded."""
+        if self.is_alive():
+            return False
+        return self.restart("WebDriver exception / renderer crash")
+
+    def mark_results_page(self, page_number: int):
+        """Records the current URL as the results page to come back to after a restart."""
+        self.results_url = self.driver.current_url
+        self.results_page_number = page_number
+        if page_number == 1:
+            self.first_results_url = self.results_url
+        logging.info(f"Current search results page URL: {self.results_url}")
+
+    def return_to_results(self) -> bool:
+        """Navigates back to the recorded results page, restarting the browser if needed."""
+        if not self.before_navigation():
+            return False
+        try:
+            logging.info(f"Navigating back to search results page: {self.results_url}")
+            self.driver.get(self.results_url)
+            capture_page(self.driver, 'results')
+            return True
+        except WebDriverException as e:
+            logging.error(f"Failed to return to search results page: {e}")
+            return self.restart("WebDriver exception while returning to results")
+
+    def next_page(self) -> bool:
+        """Clicks through to the next results page, recovering once from a dead browser."""
+        if not self.before_navigation():
+            return False
+        moved = go_to_next_page(self.driver)
+        if not moved and self.recover():
+            moved = go_to_next_page(self.driver)
+        if moved:
+            capture_page(self.driver, 'results')
+            self.mark_results_page(self.results_page_number + 1)
+        return moved
+
+    def _results_page_loaded(self) -> bool:
+        try:
+            WebDriverWait(self.driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, JOB_LIST_CONTAINER_SELECTOR))
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def _restore_results_page(self) -> bool:
+        """Brings a freshly searched browser back to the recorded results page."""
+        if self.results_page_number <= 1 or not self.results_url:
+            self.mark_results_page(1)
+            return True
+
+        # Results URLs carry a signed SID, so try a direct load first
+        try:
+            self.driver.get(self.results_url)
+            self.pages_since_start += 1
+            if self._results_page_loaded():
+                logging.info(f"Restored results page {self.results_page_number} directly.")
+                return True
+        except WebDriverException as e:
+            logging.warning(f"Direct load of saved results page failed: {e}")
+
+        # Otherwise replay the pagination from page 1
+        target_page = self.results_page_number
+        logging.info(f"Replaying pagination to restore results page {target_page}...")
+        if not self._search():
+            return False
+        for _ in range(target_page - 1):
+            self.pages_since_start += 1
+            if not go_to_next_page(self.driver):
+                logging.error(f"Could not replay pagination to page {target_page}.")
+                return False
+        self.results_url = self.driver.current_url
+        logging.info(f"Restored results page {target_page} by replaying pagination.")
+        return True
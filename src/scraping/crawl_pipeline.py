@@ -0,0 +1,345 @@
+import logging
+import threading
+
+from src.data.job_record import JobRecord
+from src.data.sinks import Sink
+from src.scraping.browser_session import BrowserSession
+from src.scraping.job_list_scraper import scrape_results_page
+from src.scraping.job_details_scraper import fetch_job_details_html, parse_job_details_html
+from src.scraping.recrawl_scheduler import RecrawlScheduler, new_scheduler
+from src.scraping.work_queue import WorkQueue
+from src.utils.dedup import JobDeduplicator, new_deduplicator
+from src.utils.helpers import job_key, random_delay
+from src.utils.metrics import timer, increment
+from src.utils.pipeline import Pipeline, Stage
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+PRIORITY_QUEUE_SIZE = 20000 # Prioritized fetch queue: holds a whole results listing to order it, still bounded
+
+def _new_session(config: dict, needs_search: bool) -> BrowserSession:
+    return BrowserSession(
+        config['TARGET_URL'],
+        browser_name='chrome',
+        headless=True,
+        max_pages=config['DRIVER_MAX_PAGES'],
+        max_memory_mb=config['DRIVER_MAX_MEMORY_MB'],
+        wait_after_search=config['SEARCH_WAIT_SECONDS'],
+        needs_search=needs_search,
+        search_max_age_minutes=config['SEARCH_SESSION_MAX_MINUTES']
+    )
+
+def _start_session(config: dict, needs_search: bool) -> BrowserSession:
+    session = _new_session(config, needs_search)
+    if not session.start():
+        session.quit()
+        raise RuntimeError("Could not start the job search.")
+    return session
+
+def _quit_session(session: BrowserSession):
+    logging.info(f"Closing WebDriver (browser restarts during run: {session.restarts})...")
+    session.quit()
+
+class SessionPool:
+    """
+    Keeps browser sessions alive between crawls (daemon mode). A crawl's list and fetch workers
+    acquire sessions instead of launching browsers, and release them instead of quitting, so
+    the next crawl skips the driver resolution, Chrome launch and (while the site session
+    lasts) the search.
+    """
+
+    def __init__(self, config: dict, start=None):
+        self.config = config
+        self._start = start or _start_session
+        self._idle = {True: [], False: []} # needs_search -> idle sessions
+        self._lock = threading.Lock()
+
+    def acquire(self, needs_search: bool) -> BrowserSession:
+        with self._lock:
+            session = self._idle[needs_search].pop() if self._idle[needs_search] else None
+        if session is not None:
+            if session.is_alive() and (not needs_search or session.rewind()):
+                increment('warm_sessions_reused')
+                return session
+            session.quit()
+        return self._start(self.config, needs_search)
+
+    def release(self, session: BrowserSession):
+        if session.is_alive():
+            with self._lock:
+                self._idle[session.needs_search].append(session)
+        else:
+            session.quit()
+
+    def idle_sessions(self) -> int:
+        with self._lock:
+            return sum(len(sessions) for sessions in self._idle.values())
+
+    def close(self):
+        with self._lock:
+            sessions = self._idle[True] + self._idle[False]
+            self._idle = {True: [], False: []}
+        for session in sessions:
+            _quit_session(session)
+
+def _session_stage_hooks(config: dict, needs_search: bool, session_pool: SessionPool | None) -> dict:
+    if session_pool:
+        return {'setup': lambda: session_pool.acquire(needs_search), 'teardown': session_pool.release}
+    return {'setup': lambda: _start_session(config, needs_search), 'teardown': _quit_session}
+
+def iter_job_links(session: BrowserSession, stop_event: threading.Event):
+    """Walks the search results pages of a started session and yields each job_info dict."""
+    while not stop_event.is_set():
+        page_number = session.results_page_number
+        logging.info(f"--- Processing Page {page_number} ---")
+        increment('results_pages')
+
+        results_page = scrape_results_page(session.driver)
+        if not results_page['jobs'] and session.recover():
+            results_page = scrape_results_page(session.driver)
+        paging = results_page['paging']
+        if paging and paging.get('total_pages'):
+            logging.info(f"Results page {page_number} of at least {paging['total_pages']}.")
+        if not results_page['jobs']:
+            logging.warning(f"No job links found on page {page_number}. Checking for 'Next' page.")
+
+        for job_info in results_page['jobs']:
+            if not job_info.get('link'):
+                logging.warning("Skipping job with missing link.")
+                continue
+            yield job_info
+
+        if paging and not paging.get('next_link'):
+            logging.info("Paging menu has no 'Next' link. Reached the last results page.")
+            return # Skip the 'Next' lookup timeouts on the last page
+        if not session.next_page():
+            return
+
+def _plan_fetch(job_info: dict, dedup: JobDeduplicator | None, scheduler: RecrawlScheduler | None) -> float | None:
+    """
+    The fetch priority of a listed job, or None to skip it. Repeats within the run are dropped.
+    The dedup filter answers whether the vacancy was scraped before; without a scheduler such
+    vacancies are skipped, with one the scheduler decides whether they are due again.
+    """
+    if dedup and not dedup.claim(job_info, skip_seen=scheduler is None):
+        return None
+    if scheduler is None:
+        return 0
+    return scheduler.plan(job_info, seen=dedup.seen_before(job_info) if dedup else True)
+
+def fetch_job_html(session: BrowserSession, job_url: str) -> str | None:
+    """Loads a job details page in the session's browser, retrying once on a fresh browser if it died."""
+    if not session.before_navigation():
+        return None # The browser died and could not be restarted
+    html = fetch_job_details_html(session.driver, job_url)
+    if html is None and session.recover() and session.before_navigation():
+        html = fetch_job_details_html(session.driver, job_url)
+    return html
+
+def _detail_stages(config: dict, on_failed=None, on_parsed=None, prioritized: bool = False,
+                   session_pool: SessionPool | None = None, on_fetch=None,
+                   fetch_queue_size: int | None = None) -> list[Stage]:
+    """
+    The fetch and parse stages shared by the single-node crawl and the distributed workers.
+
+    Parsed jobs are passed on as compact JobRecords. `on_fetch(job_info)` is called when a
+    fetch worker takes a job and `on_parsed(job_info, record)` before a record is passed to
+    the sinks; returning False from either drops the job. `on_failed(job_info, reason)` is
+    called when a job cannot be fetched or parsed. `fetch_queue_size` overrides the fetch
+    queue's PIPELINE_QUEUE_SIZE bound. With `prioritized`, queued jobs are fetched in order of their
+    'priority' (soonest closing first); the fetch queue then holds up to PRIORITY_QUEUE_SIZE
+    jobs so a whole results listing can be ordered, which only costs a small dict per job. Browsers come from
+    `session_pool` when given.
+    """
+    queue_size = config['PIPELINE_QUEUE_SIZE']
+    fetch_delay = config['FETCH_DELAY_SECONDS']
+
+    def failed(job_info, reason):
+        increment('jobs_failed')
+        logging.warning(f"Could not {reason} details for job: {job_info.get('title')} ({job_info['link']})")
+        if on_failed:
+            on_failed(job_info, reason)
+
+    def fetch_handler(job_info, emit, session):
+        if on_fetch and on_fetch(job_info) is False:
+            return
+        html = fetch_job_html(session, job_info['link'])
+        if fetch_delay:
+            random_delay(fetch_delay, fetch_delay * 1.5) # Per-worker throttle: N workers load at most N pages per delay
+        if html is None:
+            failed(job_info, 'fetch')
+            return
+        emit((job_info, html))
+
+    def parse_handler(fetched, emit, _context):
+        job_info, html = fetched
+        with timer('detail_extraction'):
+            details = parse_job_details_html(html, job_info['link'], job_info.get('title', 'N/A'), job_info.get('department', 'N/A'))
+        if not details:
+            failed(job_info, 'parse')
+            return
+        record = JobRecord.from_dict(details)
+        if on_parsed and on_parsed(job_info, record) is False:
+            return
+        increment('jobs_scraped')
+        logging.info(f"Successfully scraped details for '{record.job_title}'")
+        emit(record)
+
+    return [
+        Stage('fetch', handler=fetch_handler, workers=config['FETCH_WORKERS'],
+              queue_size=PRIORITY_QUEUE_SIZE if prioritized else fetch_queue_size or queue_size,
+              priority=(lambda job_info: job_info.get('priority', 0)) if prioritized else None,
+              **_session_stage_hooks(config, False, session_pool)),
+        Stage('parse', handler=parse_handler, workers=config['PARSE_WORKERS'], queue_size=queue_size),
+    ]
+
+def _sink_stages(config: dict, sinks: list[Sink]) -> list[Stage]:
+    return [
+        Stage(f"sink_{sink.name}", handler=lambda record, emit, ctx, sink=sink: sink.write(record),
+              workers=sink.workers, queue_size=config['PIPELINE_QUEUE_SIZE'])
+        for sink in sinks
+    ]
+
+def _close_sinks(sinks: list[Sink]):
+    for sink in sinks:
+        try:
+            with timer(f"sink_{sink.name}_close"):
+                sink.close()
+        except Exception as e:
+            logging.error(f"Error closing sink '{sink.name}': {e}", exc_info=True)
+
+def build_crawl_pipeline(config: dict, sinks: list[Sink], stop_event: threading.Event | None = None,
+                         dedup: JobDeduplicator | None = None, scheduler: RecrawlScheduler | None = None,
+                         session_pool: SessionPool | None = None) -> Pipeline:
+    """
+    Builds the crawl as a staged pipeline:
+
+        results pages -> job links -> fetched HTML -> parsed records -> sinks (fan-out)
+
+    The list and fetch stages each own their browser sessions (one per worker), parsing runs
+    on plain HTML, and every sink gets its own queue and workers, so a slow Cosmos write no
+    longer stalls page loads. Queue sizes bound memory and apply backpressure upstream.
+    Duplicate vacancies are dropped by `dedup` in the list stage, before any details fetch, and
+    `scheduler` skips closed or recently scraped vacancies and orders the rest by closing date.
+    With a `session_pool`, browsers are borrowed from it and returned warm.
+    """
+    stop_event = stop_event or threading.Event()
+
+    def list_source(emit, session):
+        for job_info in iter_job_links(session, stop_event):
+            increment('jobs_listed')
+            priority = _plan_fetch(job_info, dedup, scheduler)
+            if priority is None:
+                continue
+            if scheduler:
+                job_info['priority'] = priority
+            emit(job_info)
+
+    def on_parsed(job_info, record):
+        if dedup:
+            dedup.remember(record)
+        if scheduler:
+            scheduler.record(record)
+
+    stages = [
+        Stage('list', source=list_source, **_session_stage_hooks(config, True, session_pool)),
+    ] + _detail_stages(config, on_parsed=on_parsed, prioritized=scheduler is not None, session_pool=session_pool)
+    return Pipeline(stages, _sink_stages(config, sinks), stop_event=stop_event)
+
+def run_crawl(config: dict, sinks: list[Sink], stop_event: threading.Event | None = None,
+              session_pool: SessionPool | None = None):
+    """Runs one full crawl through the pipeline, then closes every sink and saves the dedup state."""
+    dedup = new_deduplicator(config)
+    scheduler = new_scheduler(config)
+    pipeline = build_crawl_pipeline(config, sinks, stop_event, dedup, scheduler, session_pool)
+    try:
+        pipeline.run()
+    finally:
+        _close_sinks(sinks)
+        dedup.save()
+        if scheduler:
+            scheduler.close()
+
+# --- Sharded crawl: one coordinator enumerates, any number of workers fetch ---
+def run_coordinator(config: dict, work_queue: WorkQueue, stop_event: threading.Event | None = None) -> int:
+    """
+    Walks every results page and queues each vacancy in the shared work queue.
+
+    Returns:
+        The number of newly queued tasks.
+    """
+    stop_event = stop_event or threading.Event()
+    dedup = new_deduplicator(config) # Read-only here: `merge` records the scraped vacancies
+    scheduler = new_scheduler(config)
+    crawl_id = work_queue.begin_crawl()
+    queued = seen = 0
+    session = _start_session(config, needs_search=True)
+    try:
+        for job_info in iter_job_links(session, stop_event):
+            seen += 1
+            priority = _plan_fetch(job_info, dedup, scheduler)
+            if priority is None:
+                continue
+            if work_queue.enqueue(job_key(job_info), job_info, crawl_id, priority):
+                queued += 1
+        if not stop_event.is_set():
+            work_queue.set_enumeration_complete(True)
+    finally:
+        _quit_session(session)
+        if scheduler:
+            scheduler.close()
+    increment('tasks_queued', queued)
+    logging.info(f"Coordinator finished: {seen} job links seen, {queued} tasks queued. Queue: {work_queue.counts()}")
+    return queued
+
+def run_worker(config: dict, work_queue: WorkQueue, sinks: list[Sink], worker_id: str,
+               stop_event: threading.Event | None = None):
+    """
+    Leases tasks from the shared work queue and runs them through the fetch/parse stages.
+
+    Results are stored in the queue (for `merge`) before being written to the sinks, and a
+    result whose lease was lost to another worker is dropped, so every vacancy reaches the
+    sinks once per crawl. Only one lease's worth of tasks waits in the fetch queue, and a
+    task's lease is renewed when a fetch worker takes it, so queued tasks do not expire and
+    get fetched twice. Exits when the coordinator has finished and no task is open.
+    """
+    stop_event = stop_event or threading.Event()
+    poll_seconds = config['WORK_POLL_SECONDS']
+
+    def lease_source(emit, _context):
+        while not stop_event.is_set():
+            tasks = work_queue.lease(worker_id, limit=config['FETCH_WORKERS'])
+            if not tasks:
+                if work_queue.enumeration_complete() and not work_queue.has_open_tasks():
+                    logging.info("Work queue drained. Worker exiting.")
+                    return
+                stop_event.wait(poll_seconds)
+                continue
+            for task in tasks:
+                emit(dict(task.payload, task_key=task.key))
+
+    def on_fetch(job_info):
+        if not work_queue.renew(job_info['task_key'], worker_id):
+            logging.warning(f"Lease on task {job_info['task_key']} expired while it was queued; skipping it.")
+            increment('tasks_lease_lost')
+            return False
+        return True
+
+    def on_failed(job_info, reason):
+        work_queue.fail(job_info['task_key'], worker_id, f"{reason} failed")
+
+    def on_parsed(job_info, record):
+        if not work_queue.complete(job_info['task_key'], worker_id, record.to_dict()):
+            logging.warning(f"Lease on task {job_info['task_key']} was lost; dropping duplicate result.")
+            increment('tasks_lease_lost')
+            return False
+        return True
+
+    stages = [Stage('lease', source=lease_source)] + _detail_stages(
+        config, on_failed, on_parsed, on_fetch=on_fetch, fetch_queue_size=config['FETCH_WORKERS'])
+    pipeline = Pipeline(stages, _sink_stages(config, sinks), stop_event=stop_event)
+    try:
+        pipeline.run()
+    finally:
+        _close_sinks(sinks)
+    logging.info(f"Worker {worker_id} finished. Queue: {work_queue.counts()}")
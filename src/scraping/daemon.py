@@ -0,0 +1,180 @@
+import json
+import logging
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.scraping.crawl_pipeline import SessionPool, run_crawl
+from src.scraping.page_profiler import PROFILER, page_profiling_enabled
+from src.utils.metrics import METRICS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def crawl_failure(counters: dict) -> str | None:
+    """
+    Why a crawl failed, judged from its metric counters, or None if it did not. The pipeline
+    logs and counts stage failures instead of raising them, so a crawl has failed when its
+    list stage failed (browser or search), when it listed no job at all, when every job it
+    tried failed to fetch or parse, or when another stage failed without handling a single item.
+    """
+    if counters.get('pipeline_list_errors'):
+        return "The list stage failed (browser or search)."
+    if not counters.get('jobs_listed'):
+        return "No job links were listed."
+    if counters.get('jobs_failed') and not counters.get('jobs_scraped'):
+        return f"No job was scraped: {counters['jobs_failed']} failed to fetch or parse."
+    failed_stages = sorted(
+        name[len('pipeline_'):-len('_errors')] for name, count in counters.items()
+        if name.startswith('pipeline_') and name.endswith('_errors') and count
+        and not counters.get(f"{name[:-len('_errors')]}_items")
+    )
+    if failed_stages:
+        return f"Every item failed in stage(s): {', '.join(failed_stages)}."
+    return None
+
+class CrawlDaemon:
+    """
+    Long-running crawl scheduler: runs a crawl every `DAEMON_INTERVAL_MINUTES` in one process
+    that keeps its configuration, Cosmos DB client and browsers between crawls.
+
+    Browsers live in a SessionPool, so a crawl after the first one only reloads the saved
+    results page (`BrowserSession.rewind`) instead of launching Chrome and re-running the
+    search. Each crawl gets fresh sinks from `make_sinks()` and writes its own run report.
+    A local HTTP endpoint (`DAEMON_HEALTH_PORT`) serves /health and /status.
+    """
+
+    def __init__(self, config: dict, make_sinks, crawl=run_crawl, stop_event: threading.Event | None = None):
+        self.config = config
+        self.make_sinks = make_sinks
+        self.crawl = crawl
+        self.interval = config['DAEMON_INTERVAL_MINUTES'] * 60
+        self.stop_event = stop_event or threading.Event()
+        self.session_pool = SessionPool(config)
+        self.health_server = None
+        self._lock = threading.Lock()
+        self._status = {
+            'state': 'starting', 'started_at': datetime.now().isoformat(timespec='seconds'),
+            'crawls': 0, 'failed_crawls': 0, 'consecutive_failures': 0,
+            'last_crawl': None, 'next_crawl_at': None,
+        }
+
+    # --- Status ---
+    def _update_status(self, **changes):
+        with self._lock:
+            self._status.update(changes)
+
+    def status(self) -> dict:
+        with self._lock:
+            status = dict(self._status)
+        status['idle_browser_sessions'] = self.session_pool.idle_sessions()
+        status['counters'] = METRICS.snapshot()['counters'] # Of the current (or last) crawl
+        return status
+
+    def healthy(self) -> bool:
+        """Unhealthy after three failed crawls in a row (see crawl_failure)."""
+        with self._lock:
+            return self._status['consecutive_failures'] < 3 and self._status['state'] != 'stopped'
+
+    def start_health_server(self, port: int, host: str = '127.0.0.1'):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/health':
+                    healthy = daemon.healthy()
+                    self._send(200 if healthy else 503, {'status': 'ok' if healthy else 'unhealthy'})
+                elif self.path == '/status':
+                    self._send(200, daemon.status())
+                else:
+                    self._send(404, {'error': 'not found'})
+
+            def _send(self, code, payload):
+                body = json.dumps(payload, default=str).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Health probes would flood the crawl log
+
+        self.health_server = ThreadingHTTPServer((host, port), Handler)
+        self.health_server.daemon_threads = True
+        threading.Thread(target=self.health_server.serve_forever, name='daemon-health', daemon=True).start()
+        logging.info(f"Daemon health endpoint on http://{host}:{self.health_server.server_address[1]}/health")
+
+    # --- Crawls ---
+    def run_once(self) -> int:
+        """Runs one crawl with fresh sinks and the warm browsers. Returns the jobs collected."""
+        METRICS.reset()
+        PROFILER.reset()
+        started = time.monotonic()
+        started_at = datetime.now().isoformat(timespec='seconds')
+        self._update_status(state='crawling', crawl_started_at=started_at)
+        sinks = self.make_sinks()
+        error = None
+        try:
+            self.crawl(self.config, sinks, self.stop_event, session_pool=self.session_pool)
+        except Exception as e:
+            error = str(e)
+            logging.error(f"Daemon crawl failed: {e}", exc_info=True)
+        else:
+            error = crawl_failure(METRICS.snapshot()['counters'])
+            if error:
+                logging.error(f"Daemon crawl failed: {error}")
+        jobs = len(getattr(sinks[0], 'records', [])) if sinks else 0
+        extra = {'jobs_collected': jobs, 'daemon_crawl': self._status['crawls'] + 1}
+        if page_profiling_enabled():
+            extra['page_profile'] = PROFILER.summary()
+        METRICS.write_run_report(self.config['RUN_REPORT_FILE'], self.config['METRICS_TEXTFILE'], extra=extra)
+
+        with self._lock:
+            self._status['crawls'] += 1
+            if error:
+                self._status['failed_crawls'] += 1
+                self._status['consecutive_failures'] += 1
+            else:
+                self._status['consecutive_failures'] = 0
+            self._status['last_crawl'] = {
+                'started_at': started_at, 'duration_seconds': round(time.monotonic() - started, 1),
+                'jobs_collected': jobs, 'error': error,
+            }
+            self._status['state'] = 'idle'
+        logging.info(f"Daemon crawl finished in {time.monotonic() - started:.0f}s: {jobs} jobs collected.")
+        return jobs
+
+    def run(self, max_crawls: int | None = None):
+        """Runs crawls on the schedule until stopped (SIGINT/SIGTERM or stop()) or `max_crawls` is reached."""
+        if self.config['DAEMON_HEALTH_PORT'] and self.health_server is None:
+            self.start_health_server(self.config['DAEMON_HEALTH_PORT'])
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous_handlers[signum] = signal.signal(signum, lambda *_: self.stop())
+        try:
+            while not self.stop_event.is_set():
+                next_start = time.monotonic() + self.interval
+                self.run_once()
+                if max_crawls is not None and self._status['crawls'] >= max_crawls:
+                    break
+                wait = max(0.0, next_start - time.monotonic())
+                self._update_status(next_crawl_at=(datetime.now() + timedelta(seconds=wait)).isoformat(timespec='seconds'))
+                logging.info(f"Next crawl in {wait / 60:.1f} minutes.")
+                self.stop_event.wait(wait)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            self.session_pool.close()
+            self._update_status(state='stopped', next_crawl_at=None)
+            if self.health_server:
+                self.health_server.shutdown()
+                self.health_server.server_close()
+            logging.info("Daemon stopped.")
+
+    def stop(self):
+        """Stops the current crawl (in-flight jobs are drained) and the schedule."""
+        logging.info("Daemon stopping...")
+        self.stop_event.set()
@@ -5,11 +5,20 @@ from selenium.webdriver.firefox.service import Service as FirefoxService
 from webdriver_manager.firefox import GeckoDriverManager
 import logging
 
+from src.scraping.page_profiler import page_profiling_enabled, enable_performance_log
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def initialize_driver(browser_name='chrome', headless=False):
-    """Initializes and returns a Selenium WebDriver instance."""
+def initialize_driver(browser_name='chrome', headless=False, performance_logging=None):
+    """
+    Initializes and returns a Selenium WebDriver instance.
+
+    With `performance_logging` (default: whether PAGE_PROFILING is on), Chrome records CDP
+    Network and Page events for the page profiler.
+    """
+    if performance_logging is None:
+        performance_logging = page_profiling_enabled()
     try:
         if browser_name.lower() == 'chrome':
             logging.info("Initializing Chrome WebDriver...")
@@ -20,6 +29,9 @@ def initialize_driver(browser_name='chrome', headless=False):
                 options.add_argument('--headless')
                 options.add_argument('--disable-gpu') # Often needed for headless
                 options.add_argument("--window-size=1920,1080") # Specify window size
+            if performance_logging:
+                logging.info("Performance logging enabled (page profiling).")
+                enable_performance_log(options)
             service = ChromeService(ChromeDriverManager().install())
             driver = webdriver.Chrome(service=service, options=options)
             logging.info("Chrome WebDriver initialized successfully.")
@@ -30,6 +42,8 @@ def initialize_driver(browser_name='chrome', headless=False):
             if headless:
                 logging.info("Headless mode enabled.")
                 options.add_argument('--headless')
+            if performance_logging:
+                logging.warning("Page profiling needs Chrome's performance log; Firefox pages will not be profiled.")
             service = FirefoxService(GeckoDriverManager().install())
             driver = webdriver.Firefox(service=service, options=options)
             logging.info("Firefox WebDriver initialized successfully.")
@@ -1,14 +1,54 @@
 import logging
 import time
 from datetime import date # Import date
+import lxml.html
+from lxml import etree
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from src.scraping.page_profiler import capture_page
+from src.utils.metrics import timer, increment
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+SIDE_PANEL_BASE = "//div[@class='vac_display_panel_side_inner']"
+
+# Field -> XPath on the job details page (REVISED XPaths from README). Shared by the
+# Selenium scraper and the offline HTML parser so both read exactly the same elements.
+DETAIL_FIELD_XPATHS = {
+    # Main panel
+    'Location': "//h2[@id='section_link_location']/following-sibling::div[@class='vac_display_field'][1]//div[@class='vac_display_field_value']",
+    'Job Summary': "//h3[normalize-space()='Job summary']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Job Description': "//h3[normalize-space()='Job description']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Person Specification': "//h3[normalize-space()='Person specification']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Qualifications': "//h3[normalize-space()='Qualifications']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Behaviours': "//h3[normalize-space()='Behaviours']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Technical Skills': "//h3[normalize-space()='Technical skills']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Benefits': "//h2[@id='section_link_benefits']/following-sibling::div[contains(@class, 'vac_display_field')]//div[contains(@class, 'vac_display_field_value')]",
+    'Selection Process': "//h3[normalize-space()='Selection process details']/following-sibling::div//div[@class='vac_display_field_value']",
+    'Contact Name': "//h4[normalize-space()='Job contact :']/following-sibling::ul[@class='contact_details']/li[span[normalize-space()='Name :']]/span[@class='contact_details_value']",
+    'Contact Email': "//h4[normalize-space()='Job contact :']/following-sibling::ul[@class='contact_details']/li[span[normalize-space()='Email :']]/span[@class='contact_details_value']",
+    # Closing Date uses its specific class (XPath form of the '.vac_display_closing_date' CSS selector)
+    'Closing Date': "//*[contains(concat(' ', normalize-space(@class), ' '), ' vac_display_closing_date ')]",
+    # Side panel
+    'Reference Number': f"{SIDE_PANEL_BASE}//h3[normalize-space()='Reference number']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Salary': f"{SIDE_PANEL_BASE}//h3[normalize-space()='Salary']/following-sibling::div[contains(@class,'vac_display_field_value')][1]",
+    'Job Grade': f"{SIDE_PANEL_BASE}//h3[normalize-space()='Job grade']/following-sibling::div//div[@class='vac_display_field_value'][1]",
+    'Contract Type': f"{SIDE_PANEL_BASE}//h3[normalize-space()='Contract type']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Role Type': f"{SIDE_PANEL_BASE}//h3[normalize-space()='Type of role']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Working Pattern': f"{SIDE_PANEL_BASE}//h3[normalize-space()='Working pattern']/following-sibling::div[@class='vac_display_field_value'][1]",
+    'Number Available': f"{SIDE_PANEL_BASE}//h3[normalize-space()='Number of jobs available']/following-sibling::div[@class='vac_display_field_value'][1]",
+}
+DEPARTMENT_FALLBACK_XPATH = f"{SIDE_PANEL_BASE}//h3[normalize-space()='Department']/following-sibling::div[@class='vac_display_field_value'][1]"
+DETAILS_LOADED_XPATH = "//div[contains(@class, 'vac_display_panel_main_inner')]"
+
+# Block-level tags that Selenium's rendered .text separates with whitespace
+_BLOCK_TAGS = {'address', 'article', 'br', 'dd', 'div', 'dl', 'dt', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+               'header', 'hr', 'li', 'ol', 'p', 'section', 'table', 'td', 'th', 'tr', 'ul'}
+
 def safe_get_text(driver: WebDriver, by: By, value: str, attribute: str = None):
     """Safely finds an element and returns its text or attribute, handling NoSuchElementException."""
     try:
@@ -38,23 +78,65 @@ def scrape_job_details(driver: WebDriver, job_url: str, job_title: str, departme
     """
     try:
         logging.info(f"Navigating to job details page: {job_url}")
-        driver.get(job_url)
+        with timer('detail_navigation'):
+            driver.get(job_url)
         # Wait for a key element in the main panel to ensure page is loaded
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'vac_display_panel_main_inner')]"))
-        )
+        with timer('detail_wait'):
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.XPATH, DETAILS_LOADED_XPATH))
+            )
         logging.info("Job details page loaded.")
+        capture_page(driver, 'details')
         # Add a small static delay just in case dynamic content needs more time
-        time.sleep(1)
+        with timer('detail_sleep'):
+            time.sleep(1)
+    except Exception as e:
+        logging.error(f"Failed to navigate to or load {job_url}: {e}")
+        increment('detail_pages_failed')
+        return None
+
+    with timer('detail_extraction'):
+        details = _extract_job_details(driver, job_url, job_title, department)
+    increment('detail_pages_scraped')
+    return details
+
+def _details_rendered(driver: WebDriver) -> bool:
+    """Wait condition: the main details panel is present and has rendered its text."""
+    panels = driver.find_elements(By.XPATH, DETAILS_LOADED_XPATH)
+    return bool(panels) and bool(panels[0].text.strip())
+
+def fetch_job_details_html(driver: WebDriver, job_url: str) -> str | None:
+    """
+    Loads a job details page and returns its HTML source for offline parsing.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+        job_url: The URL of the job details page.
+
+    Returns:
+        The page source once the main panel has rendered, or None if navigation/loading fails.
+    """
+    try:
+        logging.info(f"Fetching job details page: {job_url}")
+        with timer('detail_navigation'):
+            driver.get(job_url)
+        with timer('detail_wait'):
+            WebDriverWait(driver, 15).until(_details_rendered) # Replaces the fixed 1 s settle sleep
+        increment('detail_pages_fetched')
+        capture_page(driver, 'details')
+        return driver.page_source
     except Exception as e:
         logging.error(f"Failed to navigate to or load {job_url}: {e}")
+        increment('detail_pages_failed')
         return None
 
+def new_job_details(job_url: str, job_title: str, department: str) -> dict:
+    """Returns a details dictionary with all expected fields, pre-filled from the list page."""
     # Get current date for Scrape Date
     scrape_date_str = date.today().strftime('%Y-%m-%d')
 
     # Initialize details dictionary with all expected fields (REVISED)
-    details = {
+    return {
         'Scrape Date': scrape_date_str, # Added
         'Job Title': job_title, # From list page
         'Reference Number': None,
@@ -81,37 +163,17 @@ def scrape_job_details(driver: WebDriver, job_url: str, job_title: str, departme
         'Match Score': None # Optional, remains None for now
     }
 
-    logging.info("Scraping details from main panel...")
-    # Main Panel Selectors (Using REVISED XPaths from README)
-    details['Location'] = safe_get_text(driver, By.XPATH, "//h2[@id='section_link_location']/following-sibling::div[@class='vac_display_field'][1]//div[@class='vac_display_field_value']")
-    details['Job Summary'] = safe_get_text(driver, By.XPATH, "//h3[normalize-space()='Job summary']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Job Description'] = safe_get_text(driver, By.XPATH, "//h3[normalize-space()='Job description']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Person Specification'] = safe_get_text(driver, By.XPATH, "//h3[normalize-space()='Person specification']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Qualifications'] = safe_get_text(driver, By.XPATH, "//h3[normalize-space()='Qualifications']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Behaviours'] = safe_get_text(driver, By.XPATH, "//h3[normalize-space()='Behaviours']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Technical Skills'] = safe_get_text(driver, By.XPATH, "//h3[normalize-space()='Technical skills']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Benefits'] = safe_get_text(driver, By.XPATH, "//h2[@id='section_link_benefits']/following-sibling::div[contains(@class, 'vac_display_field')]//div[contains(@class, 'vac_display_field_value')]")
-    details['Selection Process'] = safe_get_text(driver, By.XPATH, "//h3[normalize-space()='Selection process details']/following-sibling::div//div[@class='vac_display_field_value']")
-    details['Contact Name'] = safe_get_text(driver, By.XPATH, "//h4[normalize-space()='Job contact :']/following-sibling::ul[@class='contact_details']/li[span[normalize-space()='Name :']]/span[@class='contact_details_value']")
-    details['Contact Email'] = safe_get_text(driver, By.XPATH, "//h4[normalize-space()='Job contact :']/following-sibling::ul[@class='contact_details']/li[span[normalize-space()='Email :']]/span[@class='contact_details_value']")
-
-    # Scrape Closing Date using its specific class
-    details['Closing Date'] = safe_get_text(driver, By.CSS_SELECTOR, ".vac_display_closing_date")
-
-    logging.info("Scraping details from side panel...")
-    # Side Panel Selectors (Using REVISED XPaths from README)
-    side_panel_base = "//div[@class='vac_display_panel_side_inner']"
-    details['Reference Number'] = safe_get_text(driver, By.XPATH, f"{side_panel_base}//h3[normalize-space()='Reference number']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Salary'] = safe_get_text(driver, By.XPATH, f"{side_panel_base}//h3[normalize-space()='Salary']/following-sibling::div[contains(@class,'vac_display_field_value')][1]")
-    details['Job Grade'] = safe_get_text(driver, By.XPATH, f"{side_panel_base}//h3[normalize-space()='Job grade']/following-sibling::div//div[@class='vac_display_field_value'][1]")
-    details['Contract Type'] = safe_get_text(driver, By.XPATH, f"{side_panel_base}//h3[normalize-space()='Contract type']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Role Type'] = safe_get_text(driver, By.XPATH, f"{side_panel_base}//h3[normalize-space()='Type of role']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Working Pattern'] = safe_get_text(driver, By.XPATH, f"{side_panel_base}//h3[normalize-space()='Working pattern']/following-sibling::div[@class='vac_display_field_value'][1]")
-    details['Number Available'] = safe_get_text(driver, By.XPATH, f"{side_panel_base}//h3[normalize-space()='Number of jobs available']/following-sibling::div[@class='vac_display_field_value'][1]")
+def _extract_job_details(driver: WebDriver, job_url: str, job_title: str, department: str) -> dict:
+    """Reads every field from an already-loaded job details page."""
+    details = new_job_details(job_url, job_title, department)
+
+    logging.info("Scraping details from main and side panels...")
+    for field, xpath in DETAIL_FIELD_XPATHS.items():
+        details[field] = safe_get_text(driver, By.XPATH, xpath)
 
     # If Department wasn't found on list page OR was "Not specified", try side panel as fallback
     if not details['Department'] or details['Department'] == "Not specified":
-        dept_fallback = safe_get_text(driver, By.XPATH, f"{side_panel_base}//h3[normalize-space()='Department']/following-sibling::div[@class='vac_display_field_value'][1]")
+        dept_fallback = safe_get_text(driver, By.XPATH, DEPARTMENT_FALLBACK_XPATH)
         if dept_fallback:
             details['Department'] = dept_fallback
             logging.info("Updated Department from details page side panel.")
@@ -119,6 +181,68 @@ def scrape_job_details(driver: WebDriver, job_url: str, job_title: str, departme
     logging.info(f"Finished scraping details for: {job_title}")
     return details
 
+def _element_text(element) -> str | None:
+    """Approximates Selenium's rendered .text for an lxml element, collapsed to single spaces."""
+    parts = []
+
+    def walk(el):
+        if not isinstance(el.tag, str) or el.tag in ('script', 'style'):
+            return # Comments, processing instructions and non-rendered content
+        block = el.tag in _BLOCK_TAGS
+        if block:
+            parts.append(' ')
+        if el.text:
+            parts.append(el.text)
+        for child in el:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append(' ')
+
+    walk(element)
+    text_content = ''.join(parts).split()
+    return ' '.join(text_content) if text_content else None
+
+def parse_job_details_html(html: str, job_url: str, job_title: str, department: str) -> dict | None:
+    """
+    Parses a job details page from its HTML source, without a browser.
+
+    Uses the same XPaths as `scrape_job_details`, so it can be applied to `driver.page_source`
+    or to saved fixture pages.
+
+    Args:
+        html: The HTML source of the job details page.
+        job_url: The URL of the job details page.
+        job_title: The title of the job (passed from the list page).
+        department: The department of the job (passed from the list page).
+
+    Returns:
+        A dictionary containing the job details, or None if the page is not a job details page.
+    """
+    try:
+        tree = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError) as e:
+        logging.error(f"Could not parse job details HTML for {job_url}: {e}")
+        return None
+    if not tree.xpath(DETAILS_LOADED_XPATH):
+        logging.error(f"Job details panel not found in HTML for {job_url}")
+        return None
+
+    details = new_job_details(job_url, job_title, department)
+    for field, xpath in DETAIL_FIELD_XPATHS.items():
+        found = tree.xpath(xpath)
+        details[field] = _element_text(found[0]) if found else None
+        if not found:
+            logging.debug(f"Element not found using xpath: {xpath}")
+
+    if not details['Department'] or details['Department'] == "Not specified":
+        found = tree.xpath(DEPARTMENT_FALLBACK_XPATH)
+        dept_fallback = _element_text(found[0]) if found else None
+        if dept_fallback:
+            details['Department'] = dept_fallback
+    return details
+
 # Example usage (requires a running WebDriver instance)
 if __name__ == '__main__':
     # Add src directory to path to allow importing driver_setup
@@ -1,10 +1,15 @@
 import logging
+import re
+import lxml.html
+from lxml import etree
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from src.utils.metrics import timed, increment
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Selectors based on README.md (might need adjustment)
@@ -12,19 +17,126 @@ JOB_LIST_CONTAINER_SELECTOR = 'ul[title="Job list"]' # Adjust if needed based on
 JOB_ITEM_SELECTOR = 'li.search-results-job-box' # Adjust if needed
 JOB_LINK_SELECTOR = 'h3.search-results-job-box-title > a' # Adjust if needed
 DEPARTMENT_SELECTOR = 'div.search-results-job-box-department' # Adjust if needed
+CLOSING_DATE_SELECTOR = 'div.search-results-job-box-closingdate' # 'Closes : 11:55 pm on Friday 2nd May 2025'
 
-def scrape_job_links_from_page(driver: WebDriver) -> list[dict]:
+PAGING_MENU_SELECTOR = 'div.search-results-paging-menu'
+NEXT_PAGE_TITLE = 'Go to next search results page'
+
+# Collects every job item and the paging menu in one chromedriver round trip.
+# Arguments: item selector, link selector, department selector, closing date selector,
+# paging menu selector, next link title.
+RESULTS_PAGE_SCRIPT = """
+const [itemSel, linkSel, deptSel, closingSel, menuSel, nextTitle] = arguments;
+const clean = (el) => el ? (el.innerText || el.textContent || '').trim() : null;
+const jobs = Array.from(document.querySelectorAll(itemSel)).map((item) => {
+    const link = item.querySelector(linkSel);
+    return {
+        title: clean(link),
+        link: link ? link.href : null,
+        department: clean(item.querySelector(deptSel)),
+        closing_date: clean(item.querySelector(closingSel))
+    };
+});
+const menu = document.querySelector(menuSel);
+let paging = null;
+if (menu) {
+    const links = Array.from(menu.querySelectorAll('a[href]'));
+    const next = links.find((a) => a.getAttribute('title') === nextTitle);
+    const numbered = links
+        .map((a) => ({text: clean(a), href: a.href}))
+        .filter((a) => /^\\d+$/.test(a.text));
+    const pageNumbers = numbered.map((a) => parseInt(a.text, 10));
+    const current = menu.querySelector('.current, [aria-current], strong, span.active');
+    if (current && /^\\d+$/.test(clean(current))) { pageNumbers.push(parseInt(clean(current), 10)); }
+    paging = {
+        next_link: next ? next.href : null,
+        page_links: numbered,
+        total_pages: pageNumbers.length ? Math.max(...pageNumbers) : null
+    };
+}
+return {jobs: jobs, paging: paging};
+"""
+
+def _clean_closing_date(text: str | None) -> str | None:
+    """Strips the 'Closes :' label from a results page closing date."""
+    text = ' '.join((text or '').split())
+    return re.sub(r'^Clos(?:es|ing date)\s*:\s*', '', text, flags=re.IGNORECASE) or None
+
+def _build_job_links(raw_jobs: list[dict]) -> list[dict]:
+    """Applies the per-item rules (missing department, missing title/link) to raw extracted items."""
+    job_links = []
+    for raw in raw_jobs:
+        job_title = (raw.get('title') or '').strip()
+        job_link = raw.get('link')
+        job_department = (raw.get('department') or '').strip()
+        if not job_department:
+            logging.warning(f"Department not found for job: {job_title}")
+            job_department = "Not specified"
+        if job_title and job_link:
+            job_links.append({
+                'title': job_title, 'link': job_link, 'department': job_department,
+                'closing_date': _clean_closing_date(raw.get('closing_date')),
+            })
+        else:
+            logging.warning("Found job item but could not extract title or link.")
+    return job_links
+
+def _scrape_job_links_per_element(driver: WebDriver) -> list[dict]:
+    """Fallback extraction: one WebDriver call per element (slow, but does not rely on JavaScript)."""
+    job_links = []
+    job_items = driver.find_elements(By.CSS_SELECTOR, JOB_ITEM_SELECTOR)
+    logging.info(f"Found {len(job_items)} potential job items on the page.")
+
+    if not job_items:
+        logging.warning("No job items found on the current page.")
+        return []
+
+    for item in job_items:
+        try:
+            # Find the link element within the item
+            link_element = item.find_element(By.CSS_SELECTOR, JOB_LINK_SELECTOR)
+            job_title = link_element.text.strip()
+            job_link = link_element.get_attribute('href')
+
+            # Find the department element within the item
+            try:
+                department_element = item.find_element(By.CSS_SELECTOR, DEPARTMENT_SELECTOR)
+                job_department = department_element.text.strip()
+            except NoSuchElementException:
+                logging.warning(f"Department not found for job: {job_title}")
+                job_department = "Not specified"
+
+            closing_dates = item.find_elements(By.CSS_SELECTOR, CLOSING_DATE_SELECTOR)
+            closing_date = _clean_closing_date(closing_dates[0].text) if closing_dates else None
+
+            if job_title and job_link:
+                job_links.append({'title': job_title, 'link': job_link, 'department': job_department, 'closing_date': closing_date})
+            else:
+                logging.warning("Found job item but could not extract title or link.")
+
+        except NoSuchElementException:
+            logging.warning(f"Could not find link element ({JOB_LINK_SELECTOR}) within a job item. Skipping item.")
+        except Exception as e:
+            logging.error(f"Error processing a job item: {e}")
+    return job_links
+
+@timed('list_page')
+def scrape_results_page(driver: WebDriver) -> dict:
     """
-    Scrapes job titles, links, and departments from the current job search results page.
+    Scrapes the jobs and the paging menu from the current search results page.
+
+    The whole page is read with a single `execute_script` call; if that fails the
+    per-element Selenium path is used instead (in which case 'paging' is None).
 
     Args:
         driver: The Selenium WebDriver instance.
 
     Returns:
-        A list of dictionaries, where each dictionary contains 'title', 'link', and 'department'.
-        Returns an empty list if scraping fails or no jobs are found.
+        A dictionary with 'jobs' (a list of dicts with 'title', 'link', 'department' and
+        'closing_date', the raw text or None)
+        and 'paging' (a dict with 'next_link', 'page_links' and 'total_pages', or None if
+        the paging menu was not found). 'jobs' is empty if scraping fails or no jobs are found.
     """
-    job_links = []
     try:
         # Wait for the job list container to be present
         logging.info(f"Waiting for job list container: {JOB_LIST_CONTAINER_SELECTOR}")
@@ -32,52 +144,120 @@ def scrape_job_links_from_page(driver: WebDriver) -> list[dict]:
             EC.presence_of_element_located((By.CSS_SELECTOR, JOB_LIST_CONTAINER_SELECTOR))
         )
         logging.info("Job list container found.")
+    except TimeoutException:
+        logging.error(f"Timeout waiting for job list container ({JOB_LIST_CONTAINER_SELECTOR}).")
+        increment('list_page_timeouts')
+        return {'jobs': [], 'paging': None}
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during job list scraping: {e}")
+        return {'jobs': [], 'paging': None}
 
-        # Find all job list items
-        job_items = driver.find_elements(By.CSS_SELECTOR, JOB_ITEM_SELECTOR)
-        logging.info(f"Found {len(job_items)} potential job items on the page.")
+    try:
+        result = driver.execute_script(
+            RESULTS_PAGE_SCRIPT, JOB_ITEM_SELECTOR, JOB_LINK_SELECTOR, DEPARTMENT_SELECTOR,
+            CLOSING_DATE_SELECTOR, PAGING_MENU_SELECTOR, NEXT_PAGE_TITLE
+        )
+        if not isinstance(result, dict) or not isinstance(result.get('jobs'), list):
+            raise ValueError(f"Unexpected script result: {type(result).__name__}")
+        logging.info(f"Found {len(result['jobs'])} potential job items on the page (single script call).")
+        job_links = _build_job_links(result['jobs'])
+        paging = result.get('paging')
+    except Exception as e:
+        logging.warning(f"In-browser extraction failed ({e}). Falling back to per-element scraping.")
+        increment('list_page_script_fallbacks')
+        try:
+            job_links = _scrape_job_links_per_element(driver)
+        except Exception as e_fallback:
+            logging.error(f"An unexpected error occurred during job list scraping: {e_fallback}")
+            job_links = []
+        paging = None
 
-        if not job_items:
-            logging.warning("No job items found on the current page.")
-            return []
+    logging.info(f"Successfully extracted {len(job_links)} job links from the page.")
+    increment('job_links_found', len(job_links))
+    return {'jobs': job_links, 'paging': paging}
 
-        for item in job_items:
-            try:
-                # Find the link element within the item
-                link_element = item.find_element(By.CSS_SELECTOR, JOB_LINK_SELECTOR)
-                job_title = link_element.text.strip()
-                job_link = link_element.get_attribute('href')
-
-                # Find the department element within the item
-                try:
-                    department_element = item.find_element(By.CSS_SELECTOR, DEPARTMENT_SELECTOR)
-                    job_department = department_element.text.strip()
-                except NoSuchElementException:
-                    logging.warning(f"Department not found for job: {job_title}")
-                    job_department = "Not specified"
-
-                if job_title and job_link:
-                    job_links.append({'title': job_title, 'link': job_link, 'department': job_department})
-                else:
-                    logging.warning("Found job item but could not extract title or link.")
+def _has_class(tag: str, class_name: str) -> str:
+    """XPath step matching `tag` elements carrying `class_name` (the CSS `tag.class_name` selector)."""
+    return f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
 
-            except NoSuchElementException:
-                logging.warning(f"Could not find link element ({JOB_LINK_SELECTOR}) within a job item. Skipping item.")
-            except Exception as e:
-                logging.error(f"Error processing a job item: {e}")
+# XPath equivalents of the CSS selectors above, for parsing saved HTML without a browser
+JOB_ITEM_XPATH = f"//{_has_class('li', 'search-results-job-box')}"
+JOB_LINK_XPATH = f"./{_has_class('h3', 'search-results-job-box-title')}/a"
+DEPARTMENT_XPATH = f".//{_has_class('div', 'search-results-job-box-department')}"
+CLOSING_DATE_XPATH = f".//{_has_class('div', 'search-results-job-box-closingdate')}"
+PAGING_MENU_XPATH = "//div[contains(@class, 'search-results-paging-menu')]"
+# The current page's number is not a link (the CSS '.current, [aria-current], strong, span.active')
+CURRENT_PAGE_XPATH = (".//*[contains(concat(' ', normalize-space(@class), ' '), ' current ') or @aria-current]"
+                      f" | .//strong | .//{_has_class('span', 'active')}") # First match in document order, like querySelector
+# Compiled once: parse_results_page_html evaluates the per-item expressions 25 times a page
+_JOB_ITEMS = etree.XPath(JOB_ITEM_XPATH)
+_JOB_LINKS = etree.XPath(JOB_LINK_XPATH)
+_DEPARTMENTS = etree.XPath(DEPARTMENT_XPATH)
+_CLOSING_DATES = etree.XPath(CLOSING_DATE_XPATH)
 
-        logging.info(f"Successfully extracted {len(job_links)} job links from the page.")
-        return job_links
+def parse_results_page_html(html: str, base_url: str | None = None) -> dict:
+    """
+    Parses a search results page from its HTML source, without a browser.
 
-    except TimeoutException:
-        logging.error(f"Timeout waiting for job list container ({JOB_LIST_CONTAINER_SELECTOR}).")
-        return []
-    except NoSuchElementException:
-        logging.error(f"Could not find the main job list container ({JOB_LIST_CONTAINER_SELECTOR}).")
-        return []
-    except Exception as e:
-        logging.error(f"An unexpected error occurred during job list scraping: {e}")
-        return []
+    Args:
+        html: The HTML source of the search results page.
+        base_url: URL the page was loaded from, used to make relative links absolute.
+
+    Returns:
+        The same structure as `scrape_results_page`: {'jobs': [...], 'paging': {...} or None}.
+    """
+    try:
+        tree = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError) as e:
+        logging.error(f"Could not parse search results HTML: {e}")
+        return {'jobs': [], 'paging': None}
+    if base_url:
+        tree.make_links_absolute(base_url)
+
+    def text_of(element):
+        return ' '.join(element.text_content().split()) if element is not None else None
+
+    raw_jobs = []
+    for item in _JOB_ITEMS(tree):
+        links = _JOB_LINKS(item)
+        departments = _DEPARTMENTS(item)
+        closing_dates = _CLOSING_DATES(item)
+        link = links[0] if links else None
+        raw_jobs.append({
+            'title': text_of(link),
+            'link': link.get('href') if link is not None else None,
+            'department': text_of(departments[0]) if departments else None,
+            'closing_date': text_of(closing_dates[0]) if closing_dates else None,
+        })
+
+    paging = None
+    menus = tree.xpath(PAGING_MENU_XPATH)
+    if menus:
+        anchors = menus[0].xpath('.//a[@href]')
+        next_links = [a.get('href') for a in anchors if a.get('title') == NEXT_PAGE_TITLE]
+        numbered = [{'text': text_of(a), 'href': a.get('href')} for a in anchors if re.fullmatch(r'\d+', text_of(a) or '')]
+        page_numbers = [int(a['text']) for a in numbered]
+        current = [text_of(el) for el in menus[0].xpath(CURRENT_PAGE_XPATH)]
+        page_numbers += [int(text) for text in current[:1] if re.fullmatch(r'\d+', text or '')]
+        paging = {
+            'next_link': next_links[0] if next_links else None,
+            'page_links': numbered,
+            'total_pages': max(page_numbers) if page_numbers else None,
+        }
+    return {'jobs': _build_job_links(raw_jobs), 'paging': paging}
+
+def scrape_job_links_from_page(driver: WebDriver) -> list[dict]:
+    """
+    Scrapes job titles, links, and departments from the current job search results page.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+
+    Returns:
+        A list of dictionaries, where each dictionary contains 'title', 'link', 'department' and 'closing_date'.
+        Returns an empty list if scraping fails or no jobs are found.
+    """
+    return scrape_results_page(driver)['jobs']
 
 if __name__ == '__main__':
     # Example Usage (requires a running WebDriver instance navigated to a sample page)
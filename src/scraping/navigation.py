@@ -0,0 +1,107 @@
+import logging
+import time
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from src.utils.helpers import random_delay
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SEARCH_BUTTON_ID = "submitSearch"
+PAGING_MENU_XPATH = "//div[contains(@class, 'search-results-paging-menu')]"
+NEXT_LINK_XPATH = ".//a[@title='Go to next search results page']" # Relative to the paging menu
+
+def run_search(driver: WebDriver, target_url: str, wait_after_search: int = 30) -> bool:
+    """
+    Opens the landing page and clicks the main 'Search for jobs' button.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+        target_url: The Civil Service Jobs landing page URL.
+        wait_after_search: Seconds to wait after clicking search for the results to load.
+
+    Returns:
+        True if the search was started, False if the search button could not be clicked.
+    """
+    logging.info(f"Navigating to target URL: {target_url}")
+    driver.get(target_url)
+    logging.info("Navigation complete.")
+    random_delay(2, 4) # Short delay for page elements
+
+    try:
+        logging.info(f"Looking for search button with ID: {SEARCH_BUTTON_ID}")
+        search_button = WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.ID, SEARCH_BUTTON_ID))
+        )
+        logging.info("Search button found and clickable.")
+        # Use JavaScript click for potential robustness in headless mode
+        driver.execute_script("arguments[0].click();", search_button)
+        logging.info("Clicked the 'Search for jobs' button.")
+
+        logging.info(f"Waiting {wait_after_search} seconds for search results to load...")
+        time.sleep(wait_after_search)
+        logging.info("Wait finished.")
+        return True
+    except TimeoutException:
+        logging.error(f"Search button with ID '{SEARCH_BUTTON_ID}' not found or not clickable within timeout.")
+        return False
+    except Exception as e:
+        logging.error(f"Error clicking search button: {e}", exc_info=True)
+        return False
+
+def go_to_next_page(driver: WebDriver) -> bool:
+    """
+    Finds the 'Next' link in the results paging menu and clicks it.
+
+    Args:
+        driver: The Selenium WebDriver instance, currently on a search results page.
+
+    Returns:
+        True if navigation to the next page was initiated, False at the end of the
+        results or if the link could not be clicked.
+    """
+    try:
+        logging.info("Looking for pagination menu...")
+        paging_menu = WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.XPATH, PAGING_MENU_XPATH))
+        )
+        logging.info("Pagination menu found.")
+
+        # Log the HTML of the pagination menu for debugging
+        try:
+            paging_html = paging_menu.get_attribute('outerHTML')
+            logging.debug(f"Pagination Menu HTML:\n{paging_html}")
+        except Exception as e_html:
+            logging.warning(f"Could not get pagination menu HTML: {e_html}")
+
+        logging.info("Looking for 'Next' page link within menu using title attribute...")
+        next_page_link = WebDriverWait(paging_menu, 20).until(
+            EC.presence_of_element_located((By.XPATH, NEXT_LINK_XPATH))
+        )
+        logging.info("Found 'Next' page link element using title.")
+
+        logging.info("Preparing to click 'Next' page link using JavaScript.")
+        random_delay(3, 6) # Shorter delay before JS click
+
+        logging.info("Attempting JavaScript click on 'Next' page link...")
+        driver.execute_script("arguments[0].scrollIntoView(true);", next_page_link) # Scroll into view first
+        time.sleep(0.5) # Brief pause after scroll
+        driver.execute_script("arguments[0].click();", next_page_link)
+        logging.info("Successfully initiated navigation to the next page via JavaScript click.")
+        # Add a wait after click to allow next page load initiation
+        random_delay(5, 8)
+        return True
+
+    except TimeoutException:
+        logging.info("No 'Next' page link found (or pagination menu timed out). Assuming end of results.")
+        return False
+    except NoSuchElementException:
+        logging.info("No 'Next' page link element found within menu. Assuming end of results.")
+        return False
+    except Exception as e:
+        logging.error(f"Error finding or clicking 'Next' page link: {e}", exc_info=True)
+        logging.warning("Stopping pagination due to error.")
+        return False
@@ -0,0 +1,247 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, asdict
+from urllib.parse import urlparse
+
+from src.utils.metrics import METRICS, increment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_profiling = False # Set from PAGE_PROFILING by set_page_profiling()
+LOAD_WAIT_SECONDS = 10 # Longest wait for a page's load event before it is profiled anyway
+
+def set_page_profiling(enabled: bool):
+    """Turns page profiling on or off for browsers started from now on."""
+    global _profiling
+    _profiling = bool(enabled)
+
+def page_profiling_enabled() -> bool:
+    return _profiling
+
+def enable_performance_log(options):
+    """
+    Makes Chrome record CDP Network and Page events in its 'performance' log, which
+    capture_page() reads back with driver.get_log('performance').
+    """
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': True})
+
+@dataclass(slots=True)
+class PageProfile:
+    """Network-level profile of one page load, built from its CDP events."""
+    kind: str # 'search', 'results' or 'details'
+    url: str | None
+    status: int | None
+    ttfb: float | None # Seconds from sending the document request to its first response byte (server time + network)
+    dom_content_loaded: float | None # Seconds from the document request to DOMContentLoaded
+    load: float | None # Seconds from the document request to the load event
+    requests: int # Every request made by the page, including the document and redirects
+    failed_requests: int
+    cached_requests: int # Answered from the browser cache (no bytes transferred)
+    third_party_requests: int # To another host than the document's
+    bytes: int # Encoded bytes transferred, all requests
+    third_party_bytes: int
+
+def _cdp_events(entries):
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+            yield message['method'], message.get('params', {})
+        except (KeyError, TypeError, ValueError):
+            continue
+
+def _host(url: str | None) -> str | None:
+    return urlparse(url).hostname if url and url.startswith('http') else None
+
+def build_page_profile(entries: list[dict], kind: str) -> PageProfile | None:
+    """
+    Builds the profile of the page whose load produced `entries`.
+
+    Args:
+        entries: Chrome performance log entries since the navigation started, as returned by
+            driver.get_log('performance') (each has a JSON 'message' holding a CDP event).
+        kind: Label of the page type, used to aggregate profiles.
+
+    Returns:
+        The profile, or None if the entries hold no document request.
+    """
+    requests = {} # requestId -> URL, for the requests of this page
+    document_id = document_host = None
+    start = None
+    profile = PageProfile(kind, None, None, None, None, None, 0, 0, 0, 0, 0, 0)
+
+    for method, params in _cdp_events(entries):
+        if method == 'Network.requestWillBeSent':
+            if document_id is None:
+                if params.get('type') != 'Document':
+                    continue # Late requests of the previous page
+                document_id, start = params['requestId'], params.get('timestamp')
+                profile.url = params['request']['url']
+                document_host = _host(profile.url)
+            url = requests[params['requestId']] = params['request']['url']
+            profile.requests += 1 # Redirects reuse the requestId but are separate requests
+            if document_host and _host(url) not in (None, document_host):
+                profile.third_party_requests += 1
+        elif params.get('requestId') not in requests: # Page events, or requests of the previous page
+            if method == 'Page.domContentEventFired' and start is not None and profile.dom_content_loaded is None:
+                profile.dom_content_loaded = round(params['timestamp'] - start, 6)
+            elif method == 'Page.loadEventFired' and start is not None and profile.load is None:
+                profile.load = round(params['timestamp'] - start, 6)
+        elif method == 'Network.responseReceived':
+            response = params.get('response', {})
+            if response.get('fromDiskCache') or response.get('fromServiceWorker') or response.get('fromPrefetchCache'):
+                profile.cached_requests += 1
+            if params['requestId'] == document_id:
+                profile.url = response.get('url', profile.url)
+                profile.status = response.get('status')
+                timing = response.get('timing') or {}
+                if 'receiveHeadersEnd' in timing and timing.get('sendStart', -1) >= 0:
+                    profile.ttfb = round((timing['receiveHeadersEnd'] - timing['sendStart']) / 1000, 6)
+        elif method == 'Network.loadingFinished':
+            size = int(params.get('encodedDataLength') or 0)
+            profile.bytes += size
+            if document_host and _host(requests[params['requestId']]) not in (None, document_host):
+                profile.third_party_bytes += size
+        elif method == 'Network.loadingFailed':
+            profile.failed_requests += 1
+
+    return profile if document_id is not None else None
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class PageProfiler:
+    """
+    Aggregates page profiles per kind. Timings go into the metrics registry as stage histograms
+    ('page_ttfb_details', 'page_load_results', ...) and sizes as counters, so they appear in
+    the run report and the Prometheus textfile; summary() adds percentiles and the slowest pages.
+    """
+
+    def __init__(self, keep_slowest: int = 10):
+        self.keep_slowest = keep_slowest
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._timings = {} # kind -> {'ttfb': [...], 'dom_content_loaded': [...], 'load': [...]}
+        self._totals = {} # kind -> summed counts
+        self._slowest = [] # (ttfb, profile dict), slowest first
+
+    def record(self, profile: PageProfile):
+        kind = profile.kind
+        for name in ('ttfb', 'dom_content_loaded', 'load'):
+            value = getattr(profile, name)
+            if value is not None:
+                METRICS.observe(f"page_{name}_{kind}", value)
+        increment(f"profiled_pages_{kind}")
+        increment(f"page_bytes_{kind}", profile.bytes)
+        increment(f"page_requests_{kind}", profile.requests)
+        increment(f"page_third_party_requests_{kind}", profile.third_party_requests)
+        with self._lock:
+            timings = self._timings.setdefault(kind, {'ttfb': [], 'dom_content_loaded': [], 'load': []})
+            for name, values in timings.items():
+                if getattr(profile, name) is not None:
+                    values.append(getattr(profile, name))
+            totals = self._totals.setdefault(kind, dict.fromkeys(
+                ('pages', 'requests', 'failed_requests', 'cached_requests', 'third_party_requests', 'bytes', 'third_party_bytes'), 0))
+            totals['pages'] += 1
+            for name in list(totals)[1:]:
+                totals[name] += getattr(profile, name)
+            if profile.ttfb is not None:
+                self._slowest.append((profile.ttfb, asdict(profile)))
+                self._slowest.sort(key=lambda item: item[0], reverse=True)
+                del self._slowest[self.keep_slowest:]
+
+    def summary(self) -> dict:
+        """Per page kind: page count, TTFB / DOMContentLoaded / load percentiles, mean requests and bytes."""
+        with self._lock:
+            summary = {}
+            for kind, totals in self._totals.items():
+                pages = totals['pages']
+                entry = {
+                    'pages': pages,
+                    'mean_requests': round(totals['requests'] / pages, 2),
+                    'mean_bytes': round(totals['bytes'] / pages),
+                    'third_party_request_share': round(totals['third_party_requests'] / totals['requests'], 3) if totals['requests'] else None,
+                    'third_party_bytes_share': round(totals['third_party_bytes'] / totals['bytes'], 3) if totals['bytes'] else None,
+                    'failed_requests': totals['failed_requests'],
+                    'cached_requests': totals['cached_requests'],
+                }
+                for name, values in self._timings[kind].items():
+                    entry[f"{name}_p50_seconds"] = _percentile(values, 0.5)
+                    entry[f"{name}_p95_seconds"] = _percentile(values, 0.95)
+                summary[kind] = entry
+            if self._slowest:
+                summary['slowest_pages'] = [profile for _, profile in self._slowest]
+            return summary
+
+PROFILER = PageProfiler()
+
+def discard_page_log(driver):
+    """Drops buffered performance events, so the next capture only sees the next navigation."""
+    if _profiling and driver is not None:
+        try:
+            driver.get_log('performance')
+        except Exception as e:
+            logging.debug(f"Could not read the performance log: {e}")
+
+def wait_for_load(driver, timeout: float = LOAD_WAIT_SECONDS) -> bool:
+    """Waits until document.readyState is 'complete'. Returns False on timeout or a dead browser."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if driver.execute_script("return document.readyState") == 'complete':
+                return True
+        except Exception as e:
+            logging.debug(f"Could not read document.readyState: {e}")
+            return False
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.1)
+
+def capture_page(driver, kind: str) -> PageProfile | None:
+    """
+    Profiles the page just loaded in `driver` from the performance log and records it in
+    PROFILER. Does nothing (and costs nothing) unless page profiling is enabled.
+
+    Scrapers call this as soon as the element they need is present, usually before the load
+    event, so it first waits (up to LOAD_WAIT_SECONDS) for the page to finish loading;
+    otherwise `load` and the late third-party requests would be missing from the profile.
+    """
+    if not _profiling:
+        return None
+    if not wait_for_load(driver):
+        increment('page_load_wait_timeouts')
+    try:
+        entries = driver.get_log('performance')
+    except Exception as e: # Firefox, or a browser started without the performance log
+        logging.debug(f"Could not read the performance log: {e}")
+        return None
+    profile = build_page_profile(entries, kind)
+    if profile:
+        PROFILER.record(profile)
+    return profile
+
+if __name__ == '__main__':
+    # Profiles pages in a headless Chrome, e.g. against the mock site:
+    #   python -m tests.fixtures.mock_server --port 8000 --latency-ms 200
+    #   python -m src.scraping.page_profiler http://127.0.0.1:8000/csr/index.cgi
+    import sys
+    from src.scraping.driver_setup import initialize_driver
+
+    set_page_profiling(True)
+    driver = initialize_driver(browser_name='chrome', headless=True)
+    try:
+        for url in sys.argv[1:]:
+            discard_page_log(driver)
+            driver.get(url)
+            profile = capture_page(driver, 'page')
+            print(json.dumps(asdict(profile) if profile else {'url': url, 'error': 'no document request seen'}, indent=2))
+        print(json.dumps(PROFILER.summary(), indent=2))
+    finally:
+        driver.quit()
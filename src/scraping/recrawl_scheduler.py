@@ -0,0 +1,160 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.parsing.normalize import parse_closing_date
+from src.utils.helpers import job_key
+from src.utils.metrics import increment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vacancies (
+    vacancy_key TEXT PRIMARY KEY,
+    closing_date TEXT,                  -- ISO datetime, UK local time as shown on the site
+    last_scraped REAL NOT NULL,         -- Unix time of the last successful details scrape
+    scrape_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_vacancies_closing ON vacancies (closing_date);
+"""
+
+# Priority of jobs without a readable closing date: after every job that has one
+UNKNOWN_CLOSING_PRIORITY = 365 * 24 * 3600.0
+# Closed vacancies are kept this long, in case the closing date is extended
+EXPIRED_RETENTION = timedelta(days=7)
+
+class RecrawlScheduler:
+    """
+    Decides per vacancy, from its results page entry, whether the details page is worth fetching.
+
+    * Vacancies past their closing date are skipped.
+    * Vacancies never scraped before are fetched.
+    * Vacancies scraped before are refreshed once their refresh interval has passed. The interval
+      is `refresh_fraction` of the time left until closing, clamped between `min_refresh_hours`
+      and `max_refresh_hours`: a job closing in a month is refreshed weekly, one closing in two
+      days every 12 hours. Jobs without a closing date use `max_refresh_hours`.
+
+    `plan()` returns the job's priority (seconds until it closes, so soon-closing jobs are scraped
+    first). The per-vacancy state lives in a SQLite file at `path` and is read and written one
+    vacancy at a time (a primary key lookup in `plan()`, an upsert in `record()`), so memory and
+    I/O follow the vacancies listed and scraped, not the size of the schedule.
+    """
+
+    def __init__(self, path: str, min_refresh_hours: float = 6, max_refresh_hours: float = 168,
+                 refresh_fraction: float = 0.25):
+        self.path = path
+        self.min_refresh = min_refresh_hours * 3600
+        self.max_refresh = max(max_refresh_hours * 3600, self.min_refresh)
+        self.refresh_fraction = refresh_fraction
+        self._lock = threading.Lock()
+        self._recorded = 0
+        self.conn = self._connect()
+        logging.info(f"Recrawl schedule: {path}")
+
+    def _connect(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Autocommit; planned from the list stage and recorded from the parse workers
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _state(self, key: str) -> tuple[datetime | None, float] | None:
+        """(closing date, last scraped) of a vacancy scraped before, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT closing_date, last_scraped FROM vacancies WHERE vacancy_key = ?", (key,)
+            ).fetchone()
+        return (datetime.fromisoformat(row[0]) if row[0] else None, row[1]) if row else None
+
+    def refresh_interval(self, closing: datetime | None, now: datetime) -> float:
+        """Seconds after which a scraped vacancy closing at `closing` is due again."""
+        if closing is None:
+            return self.max_refresh
+        remaining = (closing - now).total_seconds()
+        return min(self.max_refresh, max(self.min_refresh, remaining * self.refresh_fraction))
+
+    def plan(self, job: dict, now: datetime | None = None, seen: bool = True) -> float | None:
+        """
+        Decides whether a job from a results page should be fetched.
+
+        Args:
+            job: A job_info dict ('link', 'closing_date') or a details dict.
+            now: Current UK local time (defaults to datetime.now()).
+            seen: False if the dedup filter says the vacancy was never scraped: it is then
+                treated as new without looking up its scrape history.
+
+        Returns:
+            The job's priority (lower is scraped sooner), or None to skip it.
+        """
+        now = now or datetime.now()
+        key = job_key(job)
+        closing = parse_closing_date(job.get('closing_date') or job.get('Closing Date'))
+        state = self._state(key) if key and seen else None
+        if closing is None and state:
+            closing = state[0] # Fall back to the date seen on the details page last time
+
+        if closing is not None and closing < now:
+            increment('recrawl_skipped_expired')
+            return None
+        if state:
+            age = now.timestamp() - state[1]
+            if age < self.refresh_interval(closing, now):
+                increment('recrawl_skipped_fresh')
+                return None
+            increment('recrawl_refreshed')
+        else:
+            increment('recrawl_new')
+        return (closing - now).total_seconds() if closing is not None else UNKNOWN_CLOSING_PRIORITY
+
+    def record(self, job: dict, scraped_at: float | None = None):
+        """Records a successful details scrape (details dict or job_info)."""
+        key = job_key(job)
+        if not key:
+            return
+        closing = parse_closing_date(job.get('Closing Date') or job.get('closing_date'))
+        try:
+            with self._lock:
+                # Without a closing date on the page, keep the one seen last time
+                self.conn.execute(
+                    "INSERT INTO vacancies (vacancy_key, closing_date, last_scraped) VALUES (?, ?, ?) "
+                    "ON CONFLICT (vacancy_key) DO UPDATE SET "
+                    "closing_date = COALESCE(excluded.closing_date, vacancies.closing_date), "
+                    "last_scraped = excluded.last_scraped, scrape_count = scrape_count + 1",
+                    (key, closing.isoformat() if closing else None, scraped_at or time.time())
+                )
+                self._recorded += 1
+        except sqlite3.Error as e:
+            logging.error(f"Error recording {key} in recrawl schedule {self.path}: {e}")
+
+    def save(self, now: datetime | None = None):
+        """Forgets vacancies that closed over a week ago (scrapes are written as they are recorded)."""
+        cutoff = ((now or datetime.now()) - EXPIRED_RETENTION).isoformat()
+        try:
+            with self._lock:
+                pruned = self.conn.execute("DELETE FROM vacancies WHERE closing_date < ?", (cutoff,)).rowcount
+                recorded, self._recorded = self._recorded, 0
+            logging.info(f"Recrawl schedule saved: {recorded} vacancies scraped, {pruned} expired vacancies pruned.")
+        except sqlite3.Error as e:
+            logging.error(f"Error pruning recrawl schedule {self.path}: {e}")
+
+    def close(self):
+        self.save()
+        with self._lock:
+            self.conn.close()
+
+def new_scheduler(config: dict) -> RecrawlScheduler | None:
+    """Builds the scheduler configured by RECRAWL_SCHEDULE_PATH, or None if it is disabled."""
+    if not config.get('RECRAWL_SCHEDULE_PATH'):
+        return None
+    return RecrawlScheduler(
+        config['RECRAWL_SCHEDULE_PATH'],
+        config['RECRAWL_MIN_HOURS'],
+        config['RECRAWL_MAX_HOURS'],
+        config['RECRAWL_FRACTION']
+    )
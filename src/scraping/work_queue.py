@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_key TEXT PRIMARY KEY,          -- Stable vacancy id, so the same job is only queued once
+    payload TEXT NOT NULL,              -- JSON job_info from the results page
+    status TEXT NOT NULL DEFAULT 'pending', -- pending | leased | done | failed
+    crawl_id TEXT,                      -- Crawl that last queued this task
+    priority REAL NOT NULL DEFAULT 0,   -- Lower is leased first (seconds until the job closes)
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,                        -- JSON job details once done
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+@dataclass
+class Task:
+    key: str
+    payload: dict
+    attempts: int
+
+class WorkQueue:
+    """
+    Durable crawl work queue in a SQLite file shared by a coordinator and any number of workers.
+
+    Workers lease tasks for a limited time; a task whose lease expires (crashed or stalled
+    worker) becomes available again, and failed tasks are retried up to `max_attempts`.
+    Task keys are unique per crawl: enqueueing a vacancy twice in one crawl is a no-op, while
+    a new crawl (`begin_crawl`) re-queues vacancies finished in earlier crawls.
+
+    The file must be on storage every worker can lock (a local disk or a shared volume with
+    working POSIX locks); SQLite is not safe on most network file shares.
+    """
+
+    def __init__(self, path: str, lease_seconds: int = 300, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            if 'priority' not in columns: # Queue files created before tasks had a priority
+                conn.execute("ALTER TABLE tasks ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (status, priority, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_crawl ON tasks (crawl_id, status, task_key)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so two workers cannot lease the same task
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    # --- Coordinator side ---
+    def begin_crawl(self) -> str:
+        """Starts a new crawl: workers keep running until set_enumeration_complete(True)."""
+        crawl_id = str(int(time.time() * 1000))
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('crawl_id', ?)", (crawl_id,))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('enumeration_complete', '0')")
+        return crawl_id
+
+    def current_crawl_id(self) -> str | None:
+        """The crawl started by the last begin_crawl, or None before the first one."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'crawl_id'").fetchone()
+        return row[0] if row else None
+
+    def enqueue(self, key: str, payload: dict, crawl_id: str | None = None, priority: float = 0) -> bool:
+        """
+        Adds a task; tasks with a lower priority are leased first. Returns False if this vacancy
+        is already queued (or done) in this crawl.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO tasks (task_key, payload, crawl_id, priority, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (task_key) DO UPDATE SET payload = excluded.payload, crawl_id = excluded.crawl_id, "
+                "priority = excluded.priority, status = 'pending', attempts = 0, last_error = NULL, "
+                "updated_at = excluded.updated_at "
+                "WHERE tasks.status IN ('done', 'failed') AND tasks.crawl_id IS NOT excluded.crawl_id",
+                (key, json.dumps(payload), crawl_id, priority, now, now)
+            )
+            return cursor.rowcount == 1
+
+    def set_enumeration_complete(self, complete: bool):
+        """Tells workers whether the coordinator has finished adding tasks for this crawl."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('enumeration_complete', ?)",
+                ('1' if complete else '0',)
+            )
+
+    def enumeration_complete(self) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'enumeration_complete'").fetchone()
+        return bool(row and row[0] == '1')
+
+    # --- Worker side ---
+    def lease(self, worker_id: str, limit: int = 1) -> list[Task]:
+        """Leases up to `limit` pending (or lease-expired) tasks for `worker_id`."""
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases on their last attempt will never be retried: give up on them
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', lease_owner = NULL, last_error = 'lease expired', "
+                "updated_at = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            rows = conn.execute(
+                "SELECT task_key, payload, attempts FROM tasks "
+                "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) AND attempts < ? "
+                "ORDER BY priority, created_at LIMIT ?",
+                (now, self.max_attempts, limit)
+            ).fetchall()
+            for key, _, _ in rows:
+                conn.execute(
+                    "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE task_key = ?",
+                    (worker_id, now + self.lease_seconds, now, key)
+                )
+        return [Task(key, json.loads(payload), attempts + 1) for key, payload, attempts in rows]
+
+    def renew(self, key: str, worker_id: str) -> bool:
+        """Extends a task's lease by lease_seconds from now. Returns False if the lease was lost."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? "
+                "WHERE task_key = ? AND lease_owner = ? AND status = 'leased'",
+                (now + self.lease_seconds, now, key, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, key: str, worker_id: str, result: dict) -> bool:
+        """Stores a task's result. Returns False if the lease was lost to another worker."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, lease_owner = NULL, lease_expires = NULL, "
+                "last_error = NULL, updated_at = ? WHERE task_key = ? AND lease_owner = ? AND status = 'leased'",
+                (json.dumps(result), time.time(), key, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, key: str, worker_id: str, error: str):
+        """Releases a task after a failed attempt; it is retried until max_attempts is reached."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+                "WHERE task_key = ? AND lease_owner = ? AND status = 'leased'",
+                (self.max_attempts, error, time.time(), key, worker_id)
+            )
+
+    def has_open_tasks(self) -> bool:
+        """True while any task is pending or leased."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM tasks WHERE status IN ('pending', 'leased') LIMIT 1"
+            ).fetchone()
+        return row is not None
+
+    # --- Reporting / merge ---
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+    def iter_results(self, crawl_id: str | None = None, batch_size: int = 500):
+        """
+        Yields the stored result of every task completed in `crawl_id` (default: the current
+        crawl), one per vacancy. Results of earlier crawls are left out: their vacancies may
+        have closed since.
+        """
+        crawl_id = crawl_id or self.current_crawl_id()
+        last_key = ''
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT task_key, result FROM tasks WHERE crawl_id = ? AND status = 'done' AND task_key > ? "
+                    "ORDER BY task_key LIMIT ?",
+                    (crawl_id, last_key, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for key, result in rows:
+                yield json.loads(result)
+            last_key = rows[-1][0]
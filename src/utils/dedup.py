@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+
+from src.utils.helpers import job_key
+from src.utils.metrics import increment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_FILTER_MAGIC = b'CVBF'
+_FILTER_HEADER = struct.Struct('<4sBQIQQ') # magic, version, bits, hashes, items added, capacity
+_FILTER_VERSION = 1
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter: `key in filter` is never wrong for keys that were added, and
+    wrong for other keys with a probability of about `error_rate` while the filter holds at
+    most `capacity` keys. 100,000 vacancies at 0.1% take about 180 KB.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing (Kirsch-Mitzenmacher): k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> bool:
+        """Adds a key. Returns False if it was (probably) already present."""
+        added = False
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path: str):
+        """Writes the filter atomically, so an interrupted run never leaves a corrupt file."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_FILTER_HEADER.pack(_FILTER_MAGIC, _FILTER_VERSION, self.num_bits, self.num_hashes, self.count, self.capacity))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'BloomFilter':
+        """Reads a filter written by save(). Raises ValueError if the file is not one."""
+        with open(path, 'rb') as f:
+            header = f.read(_FILTER_HEADER.size)
+            bits = f.read()
+        if len(header) != _FILTER_HEADER.size:
+            raise ValueError(f"{path} is not a Bloom filter file.")
+        magic, version, num_bits, num_hashes, count, capacity = _FILTER_HEADER.unpack(header)
+        if magic != _FILTER_MAGIC or version != _FILTER_VERSION or len(bits) != (num_bits + 7) // 8:
+            raise ValueError(f"{path} is not a Bloom filter file (or is from an incompatible version).")
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.num_bits, bloom.num_hashes, bloom.count = capacity, num_bits, num_hashes, count
+        bloom.bits = bytearray(bits)
+        return bloom
+
+class JobDeduplicator:
+    """
+    Decides, from the results page alone, whether a vacancy's details page still needs fetching.
+
+    Jobs are identified by `job_key` (the vacancy id inside the link's SID), so the same vacancy
+    seen on two results pages, or under a different search's link, counts as one. An in-run set
+    catches repeats within a crawl (results shifting while we paginate); an optional Bloom filter
+    persisted at `filter_path` remembers vacancies scraped by earlier runs. Vacancies are only
+    added to the filter once their details were scraped, so a failed fetch is retried next run.
+    """
+
+    def __init__(self, filter_path: str | None = None, capacity: int = 100000, error_rate: float = 0.001):
+        self.filter_path = filter_path
+        self._seen = set() # Keys claimed in this run
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.bloom = None
+        if filter_path:
+            self.bloom = self._load_filter(filter_path, capacity, error_rate)
+
+    @staticmethod
+    def _load_filter(path: str, capacity: int, error_rate: float) -> BloomFilter:
+        if os.path.exists(path):
+            try:
+                bloom = BloomFilter.load(path)
+                logging.info(f"Loaded dedup filter {path} ({bloom.count} vacancies seen in earlier runs).")
+                return bloom
+            except (OSError, ValueError) as e:
+                logging.error(f"Could not read dedup filter {path}: {e}. Starting a new one.")
+        return BloomFilter(capacity, error_rate)
+
+    def claim(self, job: dict, skip_seen: bool = True) -> bool:
+        """
+        Returns True if the job should be fetched, i.e. it was neither claimed earlier in this
+        run nor (with `skip_seen`) scraped in an earlier run. Jobs without any identity are
+        always fetched.
+        """
+        key = job_key(job)
+        if not key:
+            return True
+        with self._lock:
+            if key in self._seen:
+                increment('dedup_skipped_in_run')
+                return False
+            self._seen.add(key)
+            if skip_seen and self.bloom is not None and key in self.bloom:
+                increment('dedup_skipped_seen_before')
+                return False
+        return True
+
+    def seen_before(self, job: dict) -> bool:
+        """True if the persistent filter says the job was scraped by an earlier run (rarely a false positive)."""
+        key = job_key(job)
+        if not key or self.bloom is None:
+            return False
+        with self._lock:
+            return key in self.bloom
+
+    def remember(self, job: dict):
+        """Records a successfully scraped job in the persistent filter."""
+        key = job_key(job)
+        if not key or self.bloom is None:
+            return
+        with self._lock:
+            self._dirty = self.bloom.add(key) or self._dirty
+
+    def save(self):
+        if self.bloom is None or not self._dirty:
+            return
+        with self._lock:
+            if self.bloom.count > self.bloom.capacity:
+                logging.warning(
+                    f"Dedup filter holds {self.bloom.count} vacancies (capacity {self.bloom.capacity}); "
+                    f"new jobs are increasingly likely to be skipped. Raise DEDUP_CAPACITY and delete {self.filter_path}."
+                )
+            try:
+                self.bloom.save(self.filter_path)
+                self._dirty = False
+                logging.info(f"Dedup filter saved to {self.filter_path} ({self.bloom.count} vacancies).")
+            except OSError as e:
+                logging.error(f"Error saving dedup filter {self.filter_path}: {e}")
+
+def new_deduplicator(config: dict) -> JobDeduplicator:
+    """
+    Builds the deduplicator configured by DEDUP_FILTER_PATH / DEDUP_CAPACITY / DEDUP_ERROR_RATE.
+
+    With the recrawl scheduler enabled (RECRAWL_SCHEDULE_PATH), the filter still answers
+    "scraped before?" (`seen_before`), and the scheduler only decides whether those vacancies
+    are due for a refresh.
+    """
+    return JobDeduplicator(config['DEDUP_FILTER_PATH'] or None, config['DEDUP_CAPACITY'], config['DEDUP_ERROR_RATE'])
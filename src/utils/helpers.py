@@ -0,0 +1,52 @@
+import base64
+import binascii
+import logging
+import random
+import time
+from urllib.parse import urlparse, parse_qs
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Multiplier applied to every random_delay; 0 removes the politeness delays (e.g. against the mock site)
+_delay_scale = 1.0
+
+def set_delay_scale(scale: float):
+    """Scales all subsequent random_delay calls (1.0 = normal, 0 = no delay)."""
+    global _delay_scale
+    _delay_scale = max(0.0, scale)
+
+def random_delay(min_seconds=10, max_seconds=15):
+    """Waits for a random time between min_seconds and max_seconds (times the delay scale)."""
+    delay = random.uniform(min_seconds, max_seconds) * _delay_scale
+    if not delay:
+        return
+    logging.info(f"Waiting for {delay:.2f} seconds...")
+    time.sleep(delay)
+
+def vacancy_id_from_link(link: str) -> str | None:
+    """
+    Returns the stable vacancy id behind a Civil Service Jobs link.
+
+    Job links carry a base64 `SID` whose decoded query includes `joblist_view_vac=<id>`.
+    The rest of the SID (search context, request signature) changes between searches, so
+    the same vacancy appears under different links; the vacancy id does not.
+
+    Returns:
+        The vacancy id as a string, or None if the link has no decodable SID.
+    """
+    if not link:
+        return None
+    sid = parse_qs(urlparse(link).query).get('SID', [None])[0]
+    if not sid:
+        return None
+    try:
+        decoded = base64.b64decode(sid + '=' * (-len(sid) % 4)).decode('ascii', errors='ignore')
+    except (binascii.Error, ValueError):
+        return None
+    vacancy = parse_qs(decoded).get('joblist_view_vac', [None])[0]
+    return vacancy.strip() if vacancy else None
+
+def job_key(job: dict) -> str | None:
+    """Stable identity for a job from either a list-page job_info or a details dict."""
+    link = job.get('link') or job.get('Link')
+    return vacancy_id_from_link(link) or job.get('Reference Number') or link
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Latency histogram buckets (seconds), covering fast DOM reads up to slow page loads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROMETHEUS_PREFIX = 'cv_tool'
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum_seconds': round(self.sum, 6),
+            'mean_seconds': round(self.sum / self.count, 6) if self.count else None,
+            'min_seconds': self.min,
+            'max_seconds': self.max,
+            'buckets': {str(bound): n for bound, n in zip(self.buckets, self.bucket_counts)},
+        }
+
+class MetricsRegistry:
+    """Thread-safe store of per-stage counters and latency histograms for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.started_at = datetime.now(timezone.utc)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started_at = datetime.now(timezone.utc)
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Times a block as `stage`; exceptions are counted as errors (or timeouts) and re-raised."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            kind = 'timeouts' if 'Timeout' in type(e).__name__ else 'errors'
+            self.increment(f"{stage}_{kind}")
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage: str):
+        """Decorator form of `timer`."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            finished_at = datetime.now(timezone.utc)
+            return {
+                'started_at': self.started_at.isoformat(),
+                'finished_at': finished_at.isoformat(),
+                'duration_seconds': round((finished_at - self.started_at).total_seconds(), 3),
+                'counters': dict(self.counters),
+                'stages': {stage: h.to_dict() for stage, h in self.histograms.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """Renders the registry in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted(self.counters):
+                metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {self.counters[name]}")
+            if self.histograms:
+                metric = f"{PROMETHEUS_PREFIX}_stage_duration_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for stage in sorted(self.histograms):
+                    histogram = self.histograms[stage]
+                    for bound, n in zip(histogram.buckets, histogram.bucket_counts):
+                        lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {n}')
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_last_run_timestamp_seconds gauge")
+            lines.append(f"{PROMETHEUS_PREFIX}_last_run_timestamp_seconds {time.time():.0f}")
+        return '\n'.join(lines) + '\n'
+
+    def write_run_report(self, json_path: str | None, prom_path: str | None, extra: dict | None = None):
+        """Writes the JSON run report and/or the Prometheus textfile. Errors are logged, not raised."""
+        if json_path:
+            report = self.snapshot()
+            if extra:
+                report.update(extra)
+            try:
+                _atomic_write(json_path, json.dumps(report, indent=2, default=str))
+                logging.info(f"Run report written to {os.path.abspath(json_path)}")
+            except OSError as e:
+                logging.error(f"Error writing run report {json_path}: {e}")
+        if prom_path:
+            try:
+                _atomic_write(prom_path, self.to_prometheus())
+                logging.info(f"Prometheus metrics written to {os.path.abspath(prom_path)}")
+            except OSError as e:
+                logging.error(f"Error writing Prometheus textfile {prom_path}: {e}")
+
+def _metric_name(name: str) -> str:
+    return ''.join(c if c.isalnum() else '_' for c in name).lower()
+
+def _atomic_write(path: str, content: str):
+    # The node_exporter textfile collector may read at any time, so never expose a half-written file
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+# Process-wide registry used by the scraping, data and AI modules
+METRICS = MetricsRegistry()
+timer = METRICS.timer
+timed = METRICS.timed
+increment = METRICS.increment
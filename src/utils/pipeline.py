@@ -0,0 +1,171 @@
+import itertools
+import logging
+import math
+import queue
+import threading
+
+from src.utils.metrics import timer, increment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_STOP = object() # End-of-stream marker passed down the queues
+
+class _PriorityQueue(queue.PriorityQueue):
+    """Bounded queue handing out the item with the lowest `key(item)` first (FIFO among equals)."""
+
+    def __init__(self, maxsize: int, key):
+        super().__init__(maxsize)
+        self._key = key
+        self._sequence = itertools.count()
+
+    def put(self, item, block=True, timeout=None):
+        rank = math.inf if item is _STOP else self._key(item) # End-of-stream markers sort last
+        super().put((rank, next(self._sequence), item), block, timeout)
+
+    def get(self, block=True, timeout=None):
+        return super().get(block, timeout)[2]
+
+class Stage:
+    """
+    One step of a Pipeline, run by `workers` threads.
+
+    A stage is either a source (`source(emit, context)` produces items until exhausted) or a
+    processor (`handler(item, emit, context)` is called for every input item). `emit(item)`
+    passes a result downstream and blocks while the next queue is full (backpressure).
+    `setup()` creates per-worker state (e.g. a browser) handed to every call as `context`,
+    and `teardown(context)` releases it when the worker finishes. With `priority`, the
+    stage's input queue hands out the queued item with the lowest `priority(item)` first.
+    """
+
+    def __init__(self, name: str, handler=None, source=None, workers: int = 1,
+                 queue_size: int = 100, setup=None, teardown=None, priority=None):
+        if (handler is None) == (source is None):
+            raise ValueError(f"Stage '{name}' needs exactly one of handler or source.")
+        self.name = name
+        self.handler = handler
+        self.source = source
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.setup = setup
+        self.teardown = teardown
+        self.priority = priority
+        self.input = None
+        self.outputs = []
+        self._active = 0
+        self._lock = threading.Lock()
+
+class Pipeline:
+    """
+    Runs stages connected by bounded queues: source -> stage -> ... -> fan-out to sink stages.
+
+    Every item emitted by the last stage is delivered to each sink stage's queue. When a stage's
+    workers have all finished, end-of-stream markers are sent downstream so the whole pipeline
+    drains and shuts down cleanly. `stop()` asks sources to stop producing; items already queued
+    are still processed.
+    """
+
+    def __init__(self, stages: list[Stage], sinks: list[Stage] | None = None, stop_event: threading.Event | None = None):
+        if not stages or stages[0].source is None:
+            raise ValueError("The first pipeline stage must be a source.")
+        self.stages = stages
+        self.sinks = sinks or []
+        self.stop_event = stop_event or threading.Event() # Sources should check this between items
+        self._threads = []
+        for upstream, downstream in zip(stages, stages[1:]):
+            downstream.input = self._new_queue(downstream)
+            upstream.outputs = [downstream]
+        for sink in self.sinks:
+            sink.input = self._new_queue(sink)
+        stages[-1].outputs = list(self.sinks)
+
+    @staticmethod
+    def _new_queue(stage: Stage) -> queue.Queue:
+        if stage.priority:
+            return _PriorityQueue(stage.queue_size, stage.priority)
+        return queue.Queue(maxsize=stage.queue_size)
+
+    @property
+    def stopping(self) -> bool:
+        return self.stop_event.is_set()
+
+    def stop(self):
+        """Stops the sources; queued items are still drained through the remaining stages."""
+        if not self.stop_event.is_set():
+            logging.warning("Pipeline stop requested. Draining queued items...")
+            self.stop_event.set()
+
+    def run(self):
+        """Starts every worker thread and blocks until the pipeline has fully drained."""
+        for stage in self.stages + self.sinks:
+            stage._active = stage.workers
+            for i in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(stage,), name=f"{stage.name}-{i + 1}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        try:
+            for thread in self._threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in self._threads:
+                thread.join()
+
+    def _emit_to(self, stage: Stage):
+        def emit(item):
+            for downstream in stage.outputs:
+                downstream.input.put(item)
+        return emit
+
+    def _worker(self, stage: Stage):
+        context = None
+        try:
+            if stage.setup:
+                context = stage.setup()
+            emit = self._emit_to(stage)
+            if stage.source:
+                try:
+                    with timer(f"pipeline_{stage.name}"):
+                        stage.source(emit, context)
+                except Exception as e:
+                    logging.error(f"Source stage '{stage.name}' failed: {e}", exc_info=True)
+                    increment(f"pipeline_{stage.name}_errors")
+            else:
+                self._consume(stage, emit, context)
+        except Exception as e:
+            logging.error(f"Worker for stage '{stage.name}' failed to start: {e}", exc_info=True)
+            increment(f"pipeline_{stage.name}_errors")
+            if not stage.source:
+                self._consume(stage, None, None, discard=True) # Keep upstream from blocking forever
+        finally:
+            if stage.teardown and context is not None:
+                try:
+                    stage.teardown(context)
+                except Exception as e:
+                    logging.warning(f"Teardown for stage '{stage.name}' failed: {e}")
+            self._finish(stage)
+
+    def _consume(self, stage: Stage, emit, context, discard: bool = False):
+        while True:
+            item = stage.input.get()
+            if item is _STOP:
+                return
+            if discard:
+                increment(f"pipeline_{stage.name}_dropped")
+                continue
+            try:
+                with timer(f"pipeline_{stage.name}"):
+                    stage.handler(item, emit, context)
+                increment(f"pipeline_{stage.name}_items")
+            except Exception as e:
+                logging.error(f"Stage '{stage.name}' failed on an item: {e}", exc_info=True)
+
+    def _finish(self, stage: Stage):
+        with stage._lock:
+            stage._active -= 1
+            last_worker = stage._active == 0
+        if last_worker:
+            logging.info(f"Pipeline stage '{stage.name}' finished.")
+            for downstream in stage.outputs:
+                for _ in range(downstream.workers):
+                    downstream.input.put(_STOP)
@@ -0,0 +1,69 @@
+"""Timing helper for the offline benchmarks, with stored per-machine baselines.
+
+Benchmarks are opt-in: the baselines are wall-clock timings from one machine, so a plain
+`pytest` run skips them and only runs the correctness tests.
+
+Environment variables:
+    BENCH_SIZES             Comma-separated corpus sizes to run (e.g. '1000' or '1000,10000,100000'); unset = skip benchmarks.
+    BENCH_TOLERANCE         Allowed slowdown factor against the stored baseline (default 2.0).
+    BENCH_UPDATE_BASELINES  Set to 1 to record the measured timings as the new baselines.
+"""
+import json
+import os
+import threading
+import time
+
+import pytest
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+_lock = threading.Lock()
+
+def bench_sizes() -> list[int]:
+    """Corpus sizes to benchmark; empty (so the parametrized benchmarks are skipped) unless BENCH_SIZES is set."""
+    return [int(n) for n in os.getenv('BENCH_SIZES', '').split(',') if n.strip()]
+
+# For benchmarks that do not take a corpus size
+requires_benchmarks = pytest.mark.skipif(not bench_sizes(), reason="benchmarks run only when BENCH_SIZES is set")
+
+def _load_baselines() -> dict:
+    if not os.path.exists(BASELINES_PATH):
+        return {}
+    with open(BASELINES_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+def run_benchmark(name: str, size: int, func, repeat: int | None = None) -> float:
+    """
+    Runs `func` (best of `repeat`) and fails if it is slower than the stored baseline allows.
+
+    Returns:
+        The best measured time in seconds.
+    """
+    if repeat is None:
+        repeat = 3 if size <= 1000 else 1
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    key = f"{name}[{size}]"
+    if os.getenv('BENCH_UPDATE_BASELINES') == '1':
+        with _lock:
+            baselines = _load_baselines()
+            baselines[key] = round(best, 4)
+            with open(BASELINES_PATH, 'w', encoding='utf-8') as f:
+                json.dump(dict(sorted(baselines.items())), f, indent=2)
+                f.write('\n')
+        return best
+
+    baseline = _load_baselines().get(key)
+    if baseline is not None:
+        tolerance = float(os.getenv('BENCH_TOLERANCE', '2.0'))
+        # Allow a small absolute floor so sub-millisecond benchmarks are not flaky
+        limit = max(baseline * tolerance, baseline + 0.05)
+        assert best <= limit, (
+            f"Performance regression in {key}: {best:.4f}s vs baseline {baseline:.4f}s "
+            f"(limit {limit:.4f}s at tolerance x{tolerance})"
+        )
+    return best
@@ -0,0 +1,118 @@
+"""Synthetic Civil Service Jobs pages built from the rows in matched_jobs.csv."""
+import base64
+import csv
+import html
+import os
+import random
+from datetime import date, timedelta
+from functools import lru_cache
+from string import Template
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_CSV = os.path.join(FIXTURES_DIR, '..', '..', 'matched_jobs.csv')
+BASE_URL = 'https://www.civilservicejobs.service.gov.uk/csr/index.cgi'
+JOBS_PER_PAGE = 25
+NEXT_PAGE_TITLE = 'Go to next search results page'
+
+# matched_jobs.csv has no Location / Closing Date values, so these are synthesized
+LOCATIONS = [
+    'London', 'Leeds', 'Manchester', 'Birmingham, Bristol, Cardiff', 'Glasgow', 'Edinburgh',
+    'Newcastle upon Tyne', 'Sheffield, York', 'Darlington', 'Belfast', 'National',
+]
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Template placeholder -> job field
+DETAIL_PLACEHOLDERS = {
+    'title': 'Job Title', 'closing_date': 'Closing Date', 'location': 'Location',
+    'job_summary': 'Job Summary', 'job_description': 'Job Description',
+    'person_specification': 'Person Specification', 'qualifications': 'Qualifications',
+    'behaviours': 'Behaviours', 'technical_skills': 'Technical Skills', 'benefits': 'Benefits',
+    'selection_process': 'Selection Process', 'contact_name': 'Contact Name',
+    'contact_email': 'Contact Email', 'reference_number': 'Reference Number', 'salary': 'Salary',
+    'job_grade': 'Job Grade', 'contract_type': 'Contract Type', 'role_type': 'Role Type',
+    'working_pattern': 'Working Pattern', 'number_available': 'Number Available',
+    'department': 'Department',
+}
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> Template:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return Template(f.read())
+
+@lru_cache(maxsize=1)
+def _sample_rows() -> tuple:
+    with open(SAMPLE_CSV, newline='', encoding='utf-8') as f:
+        return tuple(csv.DictReader(f))
+
+def load_sample_jobs() -> list[dict]:
+    """Returns the rows of matched_jobs.csv, with empty strings turned into None."""
+    return [{k: (v or None) for k, v in row.items()} for row in _sample_rows()]
+
+def make_link(vacancy_id: int, search_context: int = 129633424, base_url: str = BASE_URL) -> str:
+    """Builds a job link with an SID in the same shape as the live site's."""
+    query = (f"pageclass=Jobs&pageaction=viewvacbyjoblist&usersearchcontext={search_context}"
+             f"&ownertype=fair&joblist_view_vac={vacancy_id}&searchsort=closing&owner=5070000"
+             f"&searchpage=1&reqsig=1745456172-{vacancy_id:040x}")
+    sid = base64.b64encode(query.encode('ascii')).decode('ascii').rstrip('=')
+    return f"{base_url}?SID={sid}"
+
+def closing_date_text(day_offset: int) -> str:
+    """Formats a closing date like the site does, e.g. '11:55 pm on Friday 2nd May 2025'."""
+    day = date(2025, 5, 1) + timedelta(days=day_offset)
+    suffix = 'th' if 11 <= day.day <= 13 else {1: 'st', 2: 'nd', 3: 'rd'}.get(day.day % 10, 'th')
+    return f"11:55 pm on {WEEKDAYS[day.weekday()]} {day.day}{suffix} {day.strftime('%B %Y')}"
+
+def synthesize_jobs(count: int, seed: int = 0, base_url: str = BASE_URL) -> list[dict]:
+    """Returns `count` job dicts cycled from matched_jobs.csv, each with a unique vacancy."""
+    rng = random.Random(seed)
+    samples = load_sample_jobs()
+    jobs = []
+    for i in range(count):
+        job = dict(samples[i % len(samples)])
+        vacancy_id = 1_900_000 + i
+        job['Scrape Date'] = '2025-04-25'
+        job['Reference Number'] = str(400_000 + i)
+        job['Link'] = make_link(vacancy_id, base_url=base_url)
+        job['Location'] = rng.choice(LOCATIONS)
+        job['Closing Date'] = closing_date_text(rng.randint(0, 60))
+        jobs.append(job)
+    return jobs
+
+def _escape(value) -> str:
+    return html.escape(value) if value else ''
+
+def render_job_details(job: dict) -> str:
+    """Renders a job details page whose markup matches DETAIL_FIELD_XPATHS."""
+    values = {placeholder: _escape(job.get(field)) for placeholder, field in DETAIL_PLACEHOLDERS.items()}
+    return load_template('job_details.html').substitute(values)
+
+def render_results_page(jobs: list[dict], page: int, total_pages: int, page_url=None) -> str:
+    """Renders one search results page listing `jobs`, with a paging menu like the live site."""
+    page_url = page_url or (lambda n: f"{BASE_URL}?SID=page{n}")
+    item_template = load_template('search_result_item.html')
+    items = '\n'.join(
+        item_template.substitute(
+            link=_escape(job['Link']), title=_escape(job['Job Title']),
+            department=_escape(job.get('Department')), location=_escape(job.get('Location')),
+            salary=_escape(job.get('Salary')), closing_date=_escape(job.get('Closing Date')),
+        )
+        for job in jobs
+    )
+    links = []
+    if page > 1:
+        links.append(f'<a href="{_escape(page_url(page - 1))}" title="Go to previous search results page">previous</a>')
+    for n in range(max(1, page - 4), min(total_pages, page + 4) + 1):
+        links.append(f'<span class="current">{n}</span>' if n == page else f'<a href="{_escape(page_url(n))}">{n}</a>')
+    if page < total_pages:
+        links.append(f'<a href="{_escape(page_url(page + 1))}" title="{NEXT_PAGE_TITLE}">next</a>')
+    return load_template('search_results.html').substitute(
+        total_jobs=len(jobs) * total_pages, job_items=items, paging_links='\n'.join(links)
+    )
+
+def render_results_pages(jobs: list[dict], per_page: int = JOBS_PER_PAGE, page_url=None) -> list[str]:
+    """Splits `jobs` into results pages and renders each one."""
+    total_pages = max(1, -(-len(jobs) // per_page))
+    return [
+        render_results_page(jobs[i * per_page:(i + 1) * per_page], i + 1, total_pages, page_url)
+        for i in range(total_pages)
+    ]
@@ -0,0 +1,206 @@
+"""Local mock of the Civil Service Jobs site for offline, deterministic end-to-end runs.
+
+Serves the landing page (with the `submitSearch` button), paginated search results
+(`search-results-paging-menu` with "Go to next search results page" links) and job details
+pages, using the same markup as the fixture templates. Latency, error injection and corpus
+size are configurable.
+
+Run it standalone and point the scraper at it:
+
+    python -m tests.fixtures.mock_server --port 8000 --jobs 500 --latency-ms 200
+    TARGET_URL=http://127.0.0.1:8000/csr/index.cgi python main.py
+"""
+import argparse
+import base64
+import binascii
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from tests.fixtures.corpus import synthesize_jobs, render_job_details, render_results_page, JOBS_PER_PAGE
+
+SITE_PATH = '/csr/index.cgi'
+STATS_PATH = '/__stats'
+
+LANDING_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Civil Service Jobs - GOV.UK</title></head>
+<body>
+<form action="{action}" method="get">
+  <input type="hidden" name="SID" value="{sid}">
+  <label for="keyword">What</label><input id="keyword" name="keyword" type="text">
+  <button id="submitSearch" type="submit">Search for jobs</button>
+</form>
+</body>
+</html>"""
+
+@dataclass
+class MockSiteConfig:
+    total_jobs: int = 250
+    jobs_per_page: int = JOBS_PER_PAGE
+    latency_ms: float = 0.0 # Mean added latency per response
+    latency_jitter_ms: float = 0.0 # Uniform +/- jitter around the mean
+    error_rate: float = 0.0 # Fraction of results/details responses answered with HTTP 500
+    seed: int = 0
+
+def encode_sid(query: str) -> str:
+    return base64.b64encode(query.encode('ascii')).decode('ascii').rstrip('=')
+
+def decode_sid(sid: str) -> dict:
+    """Decodes a base64 SID into its query parameters ({} if it is not one of ours)."""
+    try:
+        padded = sid + '=' * (-len(sid) % 4)
+        return {k: v[0] for k, v in parse_qs(base64.b64decode(padded).decode('ascii')).items()}
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return {}
+
+class MockCivilServiceJobsServer:
+    """Threaded HTTP server for the mock site. Use as a context manager or call start()/stop()."""
+
+    def __init__(self, config: MockSiteConfig | None = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockSiteConfig()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'landing': 0, 'results': 0, 'details': 0, 'errors_injected': 0, 'not_found': 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+        self.jobs = synthesize_jobs(self.config.total_jobs, seed=self.config.seed, base_url=self.url)
+        self._first_vacancy_id = 1_900_000 # Matches synthesize_jobs
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{SITE_PATH}"
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, -(-self.config.total_jobs // self.config.jobs_per_page))
+
+    def results_page_url(self, page: int) -> str:
+        return f"{self.url}?SID={encode_sid(f'pageaction=searchresults&searchpage={page}')}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-csj-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _delay(self):
+        mean, jitter = self.config.latency_ms, self.config.latency_jitter_ms
+        if mean or jitter:
+            with self._rng_lock:
+                delay_ms = max(0.0, mean + self._rng.uniform(-jitter, jitter))
+            time.sleep(delay_ms / 1000)
+
+    def _inject_error(self) -> bool:
+        if not self.config.error_rate:
+            return False
+        with self._rng_lock:
+            return self._rng.random() < self.config.error_rate
+
+    def route(self, path: str, query: dict) -> tuple[int, str, str]:
+        """Returns (status, content type, body) for a request."""
+        if path == STATS_PATH:
+            with self._stats_lock:
+                return 200, 'application/json', json.dumps(self.stats)
+        if path != SITE_PATH:
+            self._count('not_found')
+            return 404, 'text/plain', 'Not found'
+
+        sid = query.get('SID', [None])[0]
+        if not sid:
+            self._count('landing')
+            return 200, 'text/html', LANDING_PAGE.format(action=SITE_PATH, sid='search')
+
+        params = {'pageaction': 'searchresults', 'searchpage': '1'} if sid == 'search' else decode_sid(sid)
+        self._delay()
+        if params.get('pageaction') in ('searchresults', 'viewvacbyjoblist') and self._inject_error():
+            self._count('errors_injected')
+            return 500, 'text/plain', 'Internal Server Error (injected)'
+
+        if params.get('pageaction') == 'searchresults':
+            page = int(params.get('searchpage', '1'))
+            if not 1 <= page <= self.total_pages:
+                self._count('not_found')
+                return 404, 'text/plain', 'No such results page'
+            per_page = self.config.jobs_per_page
+            jobs = self.jobs[(page - 1) * per_page:page * per_page]
+            self._count('results')
+            return 200, 'text/html', render_results_page(jobs, page, self.total_pages, self.results_page_url)
+
+        if params.get('pageaction') == 'viewvacbyjoblist':
+            index = int(params.get('joblist_view_vac', '0')) - self._first_vacancy_id
+            if not 0 <= index < len(self.jobs):
+                self._count('not_found')
+                return 404, 'text/plain', 'No such vacancy'
+            self._count('details')
+            return 200, 'text/html', render_job_details(self.jobs[index])
+
+        self._count('not_found')
+        return 404, 'text/plain', 'Unknown SID'
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                status, content_type, body = server.route(parsed.path, parse_qs(parsed.query))
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass # Keep benchmark output clean
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Civil Service Jobs site.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--jobs', type=int, default=250, help="Total number of vacancies")
+    parser.add_argument('--per-page', type=int, default=JOBS_PER_PAGE)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockSiteConfig(args.jobs, args.per_page, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    server = MockCivilServiceJobsServer(config, args.host, args.port)
+    print(f"Mock Civil Service Jobs site: {server.url} ({config.total_jobs} jobs, {server.total_pages} pages)")
+    print(f"Request counters: http://{args.host}:{args.port}{STATS_PATH}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+import csv
+import gzip
+import json
+import re
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from main import main, parse_args
+from src.data.csv_writer import save_to_csv, update_csv
+from src.data.job_record import JobRecord, CSV_FIELDNAMES
+from src.data.sqlite_store import SqliteJobStore
+from src.data.cosmos_export import run_export, exceptions
+from src.data.cosmos_layout import split_job_document, assemble_job_document
+from src.data.cosmos_writer import write_job_to_cosmos
+from src.scraping.job_details_scraper import parse_job_details_html
+from src.data.parquet_writer import save_to_parquet, pa
+from src.data.ndjson_stream import NdjsonSegmentWriter, read_manifest, open_segment
+from src.data.sinks import NdjsonStreamSink
+from tests.fixtures.corpus import synthesize_jobs, render_job_details
+from tests.fixtures.benchmark import bench_sizes, run_benchmark
+
+def test_save_to_csv_round_trip(tmp_path):
+    jobs = synthesize_jobs(5)
+    path = tmp_path / 'out' / 'jobs.csv'
+    save_to_csv(jobs, str(path))
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['Link'] for r in rows] == [j['Link'] for j in jobs]
+
+def test_update_csv_keeps_earlier_runs_and_replaces_rescraped_jobs(tmp_path):
+    jobs = synthesize_jobs(4)
+    path = str(tmp_path / 'jobs.csv')
+    assert update_csv(jobs[:3], path)
+    refreshed = dict(jobs[1], Salary='£60,000')
+    assert update_csv([JobRecord.from_dict(refreshed), JobRecord.from_dict(jobs[3])], path)
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['Link'] for r in rows] == [jobs[0]['Link'], jobs[2]['Link'], jobs[1]['Link'], jobs[3]['Link']]
+    assert rows[2]['Salary'] == '£60,000'
+
+@pytest.mark.parametrize('size', bench_sizes())
+def test_benchmark_csv_write(size, tmp_path):
+    jobs = synthesize_jobs(size)
+    path = str(tmp_path / 'jobs.csv')
+    run_benchmark('csv_write', size, lambda: save_to_csv(jobs, path))
+
+@pytest.mark.skipif(pa is None, reason="pyarrow not installed")
+@pytest.mark.parametrize('size', bench_sizes())
+def test_benchmark_parquet_write(size, tmp_path):
+    jobs = synthesize_jobs(size)
+    path = str(tmp_path / 'jobs.parquet')
+    run_benchmark('parquet_write', size, lambda: save_to_parquet(jobs, path))
+
+@pytest.mark.skipif(pa is None, reason="pyarrow not installed")
+def test_parquet_normalized_columns(tmp_path):
+    import pyarrow.parquet as pq
+    jobs = synthesize_jobs(3)
+    jobs[0].update({'Salary': '£48,000 - £55,000', 'Job Grade': 'Grade 7', 'Location': 'Leeds, London'})
+    path = str(tmp_path / 'jobs.parquet')
+    save_to_parquet(jobs, path, normalized=True)
+
+    table = pq.read_table(path)
+    assert str(table.schema.field('salary_min').type) == 'int64'
+    row = table.slice(0, 1).to_pylist()[0]
+    assert (row['salary_min'], row['salary_max'], row['grade_code']) == (48000, 55000, 'G7')
+    assert row['locations'] == ['Leeds', 'London'] and row['Salary'] == '£48,000 - £55,000'
+
+def _read_stream(directory, prefix='jobs') -> list[dict]:
+    documents = []
+    for segment in read_manifest(str(directory), prefix)['segments']:
+        with open_segment(str(directory / segment['file'])) as f:
+            documents.extend(json.loads(line) for line in f)
+    return documents
+
+def test_ndjson_stream_rotates_and_publishes_segments(tmp_path):
+    jobs = synthesize_jobs(200)
+    sink = NdjsonStreamSink(str(tmp_path / 'stream'), rotate_mb=0.02, rotate_seconds=0)
+    for job in jobs:
+        sink.write(JobRecord.from_dict(job))
+    sink.close()
+
+    segments = read_manifest(str(tmp_path / 'stream'))['segments']
+    assert len(segments) > 1 and sum(s['records'] for s in segments) == 200
+    assert [s['sequence'] for s in segments] == list(range(1, len(segments) + 1))
+    assert not [p for p in (tmp_path / 'stream').iterdir() if p.suffix in ('.part', '.tmp')]
+    documents = _read_stream(tmp_path / 'stream')
+    assert [d['Link'] for d in documents] == [j['Link'] for j in jobs]
+    assert documents[0]['job_key'] and documents[0]['Job Summary'] == jobs[0]['Job Summary']
+
+    writer = NdjsonSegmentWriter(str(tmp_path / 'stream'), rotate_seconds=0) # The next run continues the sequence
+    writer.write({'Link': 'x'})
+    writer.close()
+    assert read_manifest(str(tmp_path / 'stream'))['segments'][-1]['sequence'] == len(segments) + 1
+
+def test_ndjson_stream_recovers_unfinished_segment(tmp_path):
+    crashed = NdjsonSegmentWriter(str(tmp_path), rotate_seconds=0)
+    for i in range(10):
+        crashed.write({'n': i})
+    crashed._stream.flush() # Data on disk, but no gzip trailer and no manifest entry: the process died here
+    crashed._raw.flush()
+    assert read_manifest(str(tmp_path))['segments'] == []
+
+    writer = NdjsonSegmentWriter(str(tmp_path), rotate_seconds=0)
+    writer.close()
+    assert [d['n'] for d in _read_stream(tmp_path)] == list(range(10))
+    assert not list(tmp_path.glob('*.part'))
+
+@pytest.mark.parametrize('size', bench_sizes())
+def test_benchmark_ndjson_stream(size, tmp_path):
+    records = [JobRecord.from_dict(job) for job in synthesize_jobs(size)]
+
+    def stream():
+        sink = NdjsonStreamSink(str(tmp_path / 'stream'), rotate_mb=8, rotate_seconds=0)
+        for record in records:
+            sink.write(record)
+        sink.close()
+
+    run_benchmark('ndjson_stream', size, stream)
+
+def _parsed_jobs(count: int) -> list[dict]:
+    """Details dicts as the crawl produces them: fresh string objects for every job."""
+    jobs = synthesize_jobs(min(count, 400))
+    pages = [(render_job_details(job), job) for job in jobs]
+    return [
+        parse_job_details_html(html, job['Link'], job['Job Title'], job['Department'])
+        for html, job in (pages[i % len(pages)] for i in range(count))
+    ]
+
+def test_job_record_round_trips_every_shape():
+    details = _parsed_jobs(2)
+    first, second = JobRecord.from_dict(details[0]), JobRecord.from_dict(details[1])
+    assert first.to_dict() == details[0]
+    assert list(first.to_dict()) == CSV_FIELDNAMES
+    assert first['Job Description'] == details[0]['Job Description'] # Stored compressed
+    assert isinstance(first.job_description, bytes)
+    assert first.get('missing', 'default') == 'default'
+    assert first.to_row() == list(details[0].values())
+    assert first.to_cosmos()['id'] == details[0]['Link']
+    assert JobRecord(reference_number='123').to_cosmos()['id'] == '123'
+    assert JobRecord(job_title='No identity').to_cosmos() is None
+
+    assert first.scrape_date is second.scrape_date # Interned
+
+    cosmos_item = dict(first.to_cosmos(), _rid='x', _ts=1)
+    from_cosmos = JobRecord.from_dict(cosmos_item)
+    assert from_cosmos.extra == {'id': details[0]['Link']} and from_cosmos.to_dict()['Link'] == details[0]['Link']
+
+def test_save_to_csv_accepts_job_records(tmp_path):
+    details = _parsed_jobs(3)
+    save_to_csv(details, str(tmp_path / 'dicts.csv'))
+    save_to_csv([JobRecord.from_dict(d) for d in details], str(tmp_path / 'records.csv'))
+    assert (tmp_path / 'dicts.csv').read_text(encoding='utf-8') == (tmp_path / 'records.csv').read_text(encoding='utf-8')
+
+def test_save_to_csv_header_covers_keys_of_every_row(tmp_path):
+    rows = [{'job_key': 'a', 'title': 'First'}, {'job_key': 'b', 'title': 'Second', 'grade': 'EO'}]
+    path = tmp_path / 'mixed.csv'
+    assert save_to_csv(rows, str(path))
+    with open(path, newline='', encoding='utf-8') as f:
+        written = list(csv.DictReader(f))
+    assert list(written[0].keys()) == ['job_key', 'title', 'grade']
+    assert written[0]['grade'] == '' and written[1]['grade'] == 'EO'
+
+def test_job_records_are_several_times_smaller_than_dicts():
+    _parsed_jobs(1) # Load the fixture caches outside the measurement
+
+    def retained(convert):
+        tracemalloc.start()
+        kept = [convert(d) for d in _parsed_jobs(1000)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(kept) == 1000
+        return size
+
+    assert retained(lambda d: d) > 2.5 * retained(JobRecord.from_dict) # About 3-4x in practice
+
+@pytest.fixture
+def job_store(tmp_path):
+    store = SqliteJobStore(str(tmp_path / 'jobs.sqlite3'))
+    yield store
+    store.close()
+
+def test_sqlite_store_filters_and_full_text(job_store):
+    jobs = synthesize_jobs(300)
+    jobs[0].update({'Job Grade': 'Grade 7', 'Location': 'Leeds, London', 'Salary': '£48,000 - £55,000',
+                    'Job Title': 'Lead Data Engineer', 'Closing Date': '11:55 pm on Friday 2nd May 2025'})
+    assert job_store.upsert_many(jobs) == 300
+    assert job_store.upsert_many(jobs[:5]) == 5 and job_store.count() == 300 # Same vacancies: updated
+
+    found = job_store.search('data engin', grade='G7', location='leeds', min_salary=50000,
+                             closing_after=datetime(2025, 5, 1), closing_before=datetime(2025, 5, 31))
+    assert [job['Link'] for job in found] == [jobs[0]['Link']]
+    assert found[0]['salary_min'] == 48000 and found[0]['closing_at'] == '2025-05-02T23:55:00'
+
+    seo = job_store.search(grade='Senior Executive Officer', limit=1000)
+    assert len(seo) == sum('Senior Executive Officer' in (j['Job Grade'] or '') for j in jobs)
+    assert all('Senior Executive Officer' in job['Job Grade'] for job in seo)
+    assert all(job['salary_max'] >= 60000 for job in job_store.search(min_salary=60000, limit=1000))
+    with pytest.raises(ValueError):
+        job_store.search(grade='Grade 99')
+
+    jobs[0]['Job Title'] = 'Policy Adviser' # The FTS index follows updates
+    job_store.upsert(jobs[0])
+    assert not job_store.search('lead data engineer', grade='G7', location='Leeds')
+
+def test_query_command_rejects_unknown_grades(capsys):
+    assert parse_args(['query', '--grade', 'grade 7']).grade == 'G7'
+    with pytest.raises(SystemExit):
+        parse_args(['query', '--grade', 'Band Z'])
+    assert 'Unknown grade: Band Z' in capsys.readouterr().err
+
+def test_store_commands_exit_non_zero_on_bad_config(tmp_path, monkeypatch, capsys):
+    for name in ('CV_FILE_PATH', 'AZURE_LANGUAGE_ENDPOINT', 'AZURE_LANGUAGE_KEY'):
+        monkeypatch.setenv(name, 'x')
+    monkeypatch.setenv('SQLITE_STORE_PATH', str(tmp_path / 'jobs.sqlite3'))
+    assert main(['query', 'engineer']) == 0
+    assert '0 job(s).' in capsys.readouterr().out
+    monkeypatch.setenv('LOGIN_WAIT_TIME', 'soon') # Not an integer
+    assert main(['query', 'engineer']) == 1
+    assert main(['import', str(tmp_path / 'jobs.csv')]) == 1
+
+@pytest.mark.parametrize('size', [n for n in bench_sizes() if n <= 10000])
+def test_benchmark_store_query(size, job_store):
+    job_store.upsert_many(synthesize_jobs(size))
+
+    def queries():
+        for _ in range(10):
+            job_store.search('data', grade='Grade 7', min_salary=50000)
+            job_store.search(grade='SEO', location='Leeds', min_salary=45000)
+            job_store.search('policy adviser', closing_after=datetime(2025, 5, 1), closing_before=datetime(2025, 5, 31))
+
+    run_benchmark('store_query', size, queries)
+
+class _FeedPages:
+    """by_page() result of the fake container: pages of one feed range, with continuation tokens."""
+
+    def __init__(self, container, documents, page_size, token):
+        self.container, self.documents, self.page_size = container, documents, page_size
+        self.continuation_token = token
+
+    def __iter__(self):
+        start = int(self.continuation_token or 0)
+        for offset in range(start, len(self.documents), self.page_size):
+            if self.container.fail_at == offset:
+                self.container.fail_at = None # One transient failure
+                raise exceptions.CosmosHttpResponseError(status_code=503, message='Service unavailable')
+            self.continuation_token = str(offset + self.page_size)
+            yield iter(self.documents[offset:offset + self.page_size])
+
+class _FakeContainer:
+    """
+    Enough of ContainerProxy for run_export and the split layout writer: feed ranges (by partition
+    key), projection queries with @since, paging and transactional batches.
+    """
+
+    def __init__(self, documents, ranges=3):
+        self.id = 'jobs'
+        self.documents = documents
+        self.ranges = ranges
+        self.fail_at = None
+        self.queries = []
+
+    def execute_item_batch(self, operations, partition_key):
+        for operation, (document,) in operations:
+            assert operation == 'upsert' and document['Job Title'] == partition_key
+            self.documents = [doc for doc in self.documents if doc['id'] != document['id']]
+            self.documents.append(dict(document, _ts=1_700_000_000 + len(self.documents) // 2))
+
+    def read_feed_ranges(self):
+        return [{'range': i} for i in range(self.ranges)]
+
+    def query_items(self, query, parameters=None, feed_range=None, max_item_count=None):
+        self.queries.append(query)
+        since = {p['name']: p['value'] for p in parameters or []}.get('@since', 0)
+        fields = re.findall(r'c\["([^"]+)"\]', query)
+        documents = [
+            {name: doc[name] for name in fields if name in doc}
+            for doc in self.documents
+            if sum(map(ord, doc['Job Title'] or '')) % self.ranges == feed_range['range'] and doc['_ts'] >= since
+        ]
+        container = self
+
+        class _Paged:
+            def by_page(self, token=None):
+                return _FeedPages(container, documents, max_item_count, token)
+        return _Paged()
+
+@pytest.mark.skipif(pa is None, reason="pyarrow not installed")
+def test_cosmos_export_pages_and_watermark(tmp_path, monkeypatch):
+    import pyarrow.parquet as pq
+    monkeypatch.setattr('src.data.cosmos_export.time.sleep', lambda seconds: None)
+    monkeypatch.setattr('src.data.cosmos_export.time.time', lambda: 1_700_000_500) # Export start
+    documents = [dict(job, id=job['Link'], _ts=1_700_000_000 + i, _etag='x') for i, job in enumerate(synthesize_jobs(250))]
+    documents[3]['_ts'] = 1_700_000_600 # Written while the export ran
+    container = _FakeContainer(documents)
+    container.fail_at = 40 # Resumed from the continuation token, without duplicates
+    state = str(tmp_path / 'state.json')
+
+    assert run_export(container, str(tmp_path / 'full.parquet'), state_path=state, page_size=20, workers=3) == 250
+    table = pq.read_table(str(tmp_path / 'full.parquet'))
+    assert table.num_rows == 250 and '_etag' not in table.column_names
+    assert sorted(table.column('id').to_pylist()) == sorted(doc['id'] for doc in documents)
+    assert json.loads(open(state).read())['jobs']['watermark'] == 1_700_000_440 # Start time less the skew margin
+
+    documents[7]['_ts'] = 1_700_000_450 # Changed during the export, below the highest _ts it read
+    assert run_export(container, str(tmp_path / 'changes.ndjson.gz'), state_path=state, page_size=20) == 2
+    with gzip.open(tmp_path / 'changes.ndjson.gz', 'rt', encoding='utf-8') as f:
+        changed = [json.loads(line) for line in f]
+    assert {doc['id'] for doc in changed} == {documents[3]['id'], documents[7]['id']}
+    assert 'WHERE c._ts >= @since' in container.queries[-1]
+
+def test_split_layout_round_trip_and_export(tmp_path):
+    details = _parsed_jobs(1)[0]
+    summary, body = split_job_document(details)
+    assert summary['id'] == body['job_id'] and body['id'] == f"{summary['id']}.body"
+    assert 'Job Description' not in summary and 'Link' not in summary and summary['Salary'] == details['Salary']
+    assert len(json.dumps(summary)) < len(json.dumps(details)) / 4
+    assert len(json.dumps(body)) < len(json.dumps(details)) # Compressed
+    assert {k: v for k, v in assemble_job_document(summary, body).items() if k != 'id'} == details
+
+    container = _FakeContainer([], ranges=2)
+    jobs = synthesize_jobs(30)
+    for job in jobs:
+        write_job_to_cosmos(container, dict(job), layout='split')
+    assert len(container.documents) == 60
+    output = tmp_path / 'jobs.ndjson'
+    assert run_export(container, str(output), page_size=7, layout='split') == 30
+    exported = {doc['Reference Number']: doc for doc in map(json.loads, output.read_text(encoding='utf-8').splitlines())}
+    assert exported[jobs[3]['Reference Number']]['Job Description'] == jobs[3]['Job Description']
+    assert exported[jobs[3]['Reference Number']]['Link'] == jobs[3]['Link']
@@ -0,0 +1,101 @@
+import pytest
+
+from main import main
+from src.matching.matcher import compare_key_phrases, match_jobs, match_cv
+from src.matching.semantic_index import SemanticIndex, text_features
+from tests.fixtures.corpus import synthesize_jobs, make_link
+from tests.fixtures.benchmark import bench_sizes, run_benchmark
+
+def job_phrases(job: dict) -> list[str]:
+    """Stand-in for Azure key phrases: consecutive word pairs from the job text."""
+    words = ' '.join(filter(None, [job.get('Job Summary'), job.get('Technical Skills')])).lower().split()
+    return [' '.join(words[i:i + 2]) for i in range(0, min(len(words), 200) - 1, 2)]
+
+def test_compare_key_phrases_counts_normalized_overlap():
+    is_match, score, shared = compare_key_phrases(['Data  Analysis', 'Python'], ['python', 'data analysis', 'SQL'], 2)
+    assert is_match and score == 2
+    assert shared == ['data analysis', 'python']
+
+def test_compare_key_phrases_below_threshold():
+    is_match, score, _ = compare_key_phrases(['Python'], ['SQL'], 1)
+    assert not is_match and score == 0
+
+@pytest.mark.parametrize('size', bench_sizes())
+def test_benchmark_matching(size):
+    jobs = synthesize_jobs(size)
+    jobs_phrases = {job['Link']: job_phrases(job) for job in jobs}
+    cv_phrases = job_phrases(jobs[0])[:40]
+
+    def match():
+        assert match_jobs(cv_phrases, jobs_phrases, threshold=5)
+
+    run_benchmark('matching', size, match)
+
+ANALYST_JOB = {
+    'Link': make_link(9990001),
+    'Job Title': 'Senior Data Analyst',
+    'Job Summary': 'You will lead analytics for the transport statistics team and build dashboards for ministers.',
+    'Technical Skills': 'Python developer experience, SQL, statistical modelling, Power BI dashboards.',
+}
+CV_TEXT = 'Data analyst and Python programmer. I analyse transport statistics, build Power BI dashboards and SQL models.'
+
+def test_text_features_fold_synonyms_and_stems():
+    assert text_features('data analyst, Python developers') == text_features('Data analytics; python developer')
+    assert not text_features('the and of with')
+
+def test_semantic_index_finds_reworded_jobs(tmp_path):
+    index = SemanticIndex(str(tmp_path / 'index.sqlite3'))
+    assert index.add_jobs(synthesize_jobs(300) + [ANALYST_JOB]) == 301
+    results = index.search(CV_TEXT, limit=5)
+    assert results[0][0] == '9990001' and results[0][2] == 'Senior Data Analyst'
+    assert all(a[1] >= b[1] for a, b in zip(results, results[1:]))
+    index.close()
+
+    index = SemanticIndex(str(tmp_path / 'index.sqlite3')) # Persisted: reopened as it was
+    assert index.count() == 301 and index.search(CV_TEXT, limit=5) == results
+    index.add('9990001', 'Prison officer: custody, safeguarding and security of prisoners.', title='Prison Officer')
+    assert index.count() == 301 # Re-indexed, not added
+    assert '9990001' not in [key for key, _, _ in index.search(CV_TEXT, limit=5)]
+    assert index.search('prison officer custody')[0][0] == '9990001'
+    index.close()
+
+def test_match_cv_backends(tmp_path):
+    config = {'MATCH_BACKEND': 'exact', 'MATCH_THRESHOLD': 2, 'SEMANTIC_INDEX_PATH': str(tmp_path / 'index.sqlite3'),
+              'SEMANTIC_CANDIDATES': 200, 'SEMANTIC_MIN_SIMILARITY': 0.1}
+    assert match_cv(config, CV_TEXT, ['python', 'sql'], {'a': ['SQL', 'Python'], 'b': ['sql']}) == [('a', 2)]
+    with pytest.raises(ValueError):
+        match_cv(config, CV_TEXT)
+
+    index = SemanticIndex(config['SEMANTIC_INDEX_PATH'])
+    index.add_jobs(synthesize_jobs(50) + [ANALYST_JOB])
+    index.close()
+    config['MATCH_BACKEND'] = 'semantic'
+    matches = match_cv(config, CV_TEXT, limit=3)
+    assert matches[0][0] == '9990001' and all(score >= 0.1 for _, score in matches)
+
+@pytest.mark.parametrize('size', [n for n in bench_sizes() if n <= 10000])
+def test_benchmark_semantic_match(size, tmp_path):
+    jobs = synthesize_jobs(size)
+    index = SemanticIndex(str(tmp_path / 'index.sqlite3'))
+    index.add_jobs(jobs)
+    queries = [' '.join(filter(None, [job['Job Summary'], job['Technical Skills']]))[:1500] for job in jobs[:10]]
+
+    def match():
+        for query in queries:
+            assert index.search(query, limit=10)
+
+    run_benchmark('semantic_match', size, match)
+    index.close()
+
+def test_match_command_rejects_bad_config_and_missing_cv(tmp_path, monkeypatch):
+    for name in ('CV_FILE_PATH', 'AZURE_LANGUAGE_ENDPOINT', 'AZURE_LANGUAGE_KEY'):
+        monkeypatch.setenv(name, 'x')
+    monkeypatch.setenv('SEMANTIC_INDEX_PATH', str(tmp_path / 'index.sqlite3'))
+    monkeypatch.setenv('MATCH_BACKEND', 'exact')
+    assert main(['match', str(tmp_path / 'cv.docx')]) == 1
+    monkeypatch.setenv('MATCH_BACKEND', 'semantic')
+    assert main(['match', str(tmp_path / 'cv.docx')]) == 1 # No such file
+    (tmp_path / 'cv.txt').write_text('Python developer')
+    assert main(['match', str(tmp_path / 'cv.txt')]) == 1 # Not a .docx
+    monkeypatch.setenv('MATCH_BACKEND', 'fuzzy') # Rejected by load_config
+    assert main(['match', str(tmp_path / 'cv.docx')]) == 1
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import docx
+import pytest
+
+from src.parsing.cv_parser import read_cv_text
+from src.parsing.normalize import parse_closing_date, parse_salary
+from src.parsing.batch_normalize import normalize_columns
+from src.data.job_record import JobRecord
+from tests.fixtures.corpus import load_sample_jobs, synthesize_jobs
+from tests.fixtures.benchmark import bench_sizes, run_benchmark, requires_benchmarks
+
+@pytest.fixture
+def cv_path(tmp_path):
+    """A .docx CV built from job description text (about 400 paragraphs)."""
+    document = docx.Document()
+    for job in load_sample_jobs():
+        document.add_paragraph(job['Job Summary'] or '')
+    path = tmp_path / 'cv.docx'
+    document.save(str(path))
+    return str(path)
+
+def test_read_cv_text(cv_path):
+    text = read_cv_text(cv_path)
+    assert load_sample_jobs()[0]['Job Summary'] in text
+
+def test_read_cv_text_rejects_other_formats(tmp_path):
+    path = tmp_path / 'cv.txt'
+    path.write_text('not a docx')
+    with pytest.raises(ValueError):
+        read_cv_text(str(path))
+
+@requires_benchmarks
+def test_benchmark_cv_parse(cv_path):
+    run_benchmark('cv_parse', 1, lambda: read_cv_text(cv_path), repeat=5)
+
+@pytest.mark.parametrize('text, expected', [
+    ('11:55 pm on Friday 2nd May 2025', datetime(2025, 5, 2, 23, 55)),
+    ('Closing date: 11:55 pm on Friday 2nd May 2025', datetime(2025, 5, 2, 23, 55)),
+    ('Closes : 12:00 am on Monday 1st September 2025', datetime(2025, 9, 1, 0, 0)),
+    ('9 am on Tue 3 Jun 2025', datetime(2025, 6, 3, 9, 0)),
+    ('Midday on Friday 2nd May 2025', datetime(2025, 5, 2, 12, 0)),
+    ('2 May 2025', datetime(2025, 5, 2, 23, 59)),
+    ('2025-05-02T12:00', datetime(2025, 5, 2, 12, 0)),
+    ('31st February 2025', None),
+    ('Not specified', None),
+    (None, None),
+])
+def test_parse_closing_date(text, expected):
+    assert parse_closing_date(text) == expected
+
+@pytest.mark.parametrize('text, expected', [
+    ('£41,463 - £52,040', (41463, 52040)),
+    ('£76,000', (76000, 76000)),
+    ('Up to £1.5m', (1500000, 1500000)),
+    ('£31,000 to £37k (London) £28,000 national', (31000, 37000)),
+    ('£550 per day', (550, 550)),
+    ('Competitive', (None, None)),
+])
+def test_parse_salary(text, expected):
+    assert parse_salary(text) == expected
+
+def test_normalize_columns():
+    jobs = [
+        {'Salary': '£37,000 - £45,000', 'Job Grade': 'Higher Executive Officer Senior Executive Officer',
+         'Closing Date': '12:55 pm on Friday 2nd May 2025', 'Location': 'Birmingham, Bristol, Cardiff'},
+        JobRecord(salary='£45k', job_grade='Grade 7', closing_date='2025-06-30'),
+        {'Salary': 'Competitive'},
+    ]
+    columns = normalize_columns(jobs)
+    assert columns['salary_min'] == [37000, 45000, None] and columns['salary_max'] == [45000, 45000, None]
+    assert columns['grade_code'] == ['HEO', 'G7', None]
+    assert columns['grade_codes'] == [['HEO', 'SEO'], ['G7'], []]
+    assert columns['closing_at'] == [datetime(2025, 5, 2, 12, 55), datetime(2025, 6, 30, 23, 59), None]
+    assert columns['locations'] == [['Birmingham', 'Bristol', 'Cardiff'], [], []]
+
+@pytest.mark.parametrize('size', bench_sizes())
+def test_benchmark_normalize(size):
+    jobs = synthesize_jobs(size)
+    run_benchmark('normalize', size, lambda: normalize_columns(jobs))
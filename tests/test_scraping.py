@@ -0,0 +1,602 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.scraping.job_details_scraper import fetch_job_details_html, parse_job_details_html, DETAIL_FIELD_XPATHS
+from src.scraping.job_list_scraper import parse_results_page_html
+from src.data.sinks import CsvSink
+from src.scraping import browser_session
+from src.scraping.browser_session import BrowserSession
+from src.scraping import crawl_pipeline
+from src.scraping.crawl_pipeline import SessionPool, build_crawl_pipeline, fetch_job_html, run_worker
+from src.scraping.daemon import CrawlDaemon, crawl_failure
+from src.scraping import page_profiler
+from src.scraping.page_profiler import PageProfiler, build_page_profile, capture_page
+from src.scraping.recrawl_scheduler import RecrawlScheduler, new_scheduler
+from src.scraping.work_queue import WorkQueue
+from src.utils.dedup import JobDeduplicator, new_deduplicator
+from src.utils.helpers import job_key, vacancy_id_from_link
+from tests.fixtures.corpus import synthesize_jobs, render_job_details, render_results_pages, make_link, JOBS_PER_PAGE
+from tests.fixtures.benchmark import bench_sizes, run_benchmark
+from tests.fixtures.mock_server import MockCivilServiceJobsServer, MockSiteConfig
+from src.utils.pipeline import Pipeline, Stage
+
+def test_parse_job_details_html_reads_every_field():
+    job = synthesize_jobs(1)[0]
+    details = parse_job_details_html(render_job_details(job), job['Link'], job['Job Title'], job['Department'])
+
+    assert details is not None
+    for field in DETAIL_FIELD_XPATHS:
+        expected = job.get(field)
+        if field == 'Closing Date':
+            expected = f"Closing date: {expected}"
+        assert details[field] == (' '.join(expected.split()) if expected else None), field
+
+def test_parse_job_details_html_rejects_non_details_page():
+    assert parse_job_details_html('<html><body><p>Session expired</p></body></html>', 'u', 't', 'd') is None
+
+def test_parse_job_details_html_department_fallback():
+    job = synthesize_jobs(1)[0]
+    details = parse_job_details_html(render_job_details(job), job['Link'], job['Job Title'], 'Not specified')
+    assert details['Department'] == job['Department']
+
+class _RenderingDriver:
+    """A details page whose main panel is empty on the first wait check and rendered on the second."""
+    def __init__(self):
+        self.checks = 0
+        self.page_source = '<html></html>'
+
+    def get(self, url):
+        pass
+
+    def find_elements(self, by, value):
+        self.checks += 1
+        return [type('Panel', (), {'text': 'Job summary' if self.checks >= 2 else ' '})()]
+
+def test_fetch_job_details_html_waits_for_the_rendered_panel():
+    driver = _RenderingDriver()
+    assert fetch_job_details_html(driver, make_link(1)) == '<html></html>' and driver.checks == 2
+
+def test_parse_results_page_html_jobs_and_paging():
+    jobs = synthesize_jobs(JOBS_PER_PAGE * 3)
+    pages = render_results_pages(jobs)
+
+    first = parse_results_page_html(pages[0])
+    assert [j['link'] for j in first['jobs']] == [j['Link'] for j in jobs[:JOBS_PER_PAGE]]
+    assert first['jobs'][0]['title'] == jobs[0]['Job Title']
+    assert first['jobs'][0]['department'] == jobs[0]['Department']
+    assert first['jobs'][0]['closing_date'] == jobs[0]['Closing Date'] # 'Closes :' label stripped
+    assert first['paging']['next_link'].endswith('page2')
+    assert first['paging']['total_pages'] == 3
+
+    last = parse_results_page_html(pages[-1])
+    assert last['paging']['next_link'] is None
+    assert last['paging']['total_pages'] == 3 # The current page is a <span>, not a link
+
+@pytest.mark.parametrize('size', bench_sizes())
+def test_benchmark_list_extraction(size):
+    pages = render_results_pages(synthesize_jobs(size))
+
+    def extract():
+        found = sum(len(parse_results_page_html(page)['jobs']) for page in pages)
+        assert found == size
+
+    run_benchmark('list_extraction', size, extract)
+
+@pytest.mark.parametrize('size', bench_sizes())
+def test_benchmark_detail_extraction(size):
+    # Rendering 100k pages up front would dominate memory; parse a pool of unique pages cyclically
+    jobs = synthesize_jobs(min(size, 1000))
+    pages = [(render_job_details(job), job) for job in jobs]
+
+    def extract():
+        for i in range(size):
+            html, job = pages[i % len(pages)]
+            assert parse_job_details_html(html, job['Link'], job['Job Title'], job['Department'])
+
+    run_benchmark('detail_extraction', size, extract)
+
+def _fetch(url: str) -> str:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read().decode('utf-8')
+
+def test_mock_server_serves_a_crawlable_site():
+    config = MockSiteConfig(total_jobs=60, jobs_per_page=25)
+    with MockCivilServiceJobsServer(config) as server:
+        assert 'id="submitSearch"' in _fetch(server.url)
+
+        url, links = f"{server.url}?SID=search", []
+        while url:
+            page = parse_results_page_html(_fetch(url), base_url=url)
+            links.extend(job['link'] for job in page['jobs'])
+            url = page['paging']['next_link']
+        assert len(links) == 60
+
+        job = server.jobs[42]
+        details = parse_job_details_html(_fetch(links[42]), links[42], job['Job Title'], job['Department'])
+        assert details['Reference Number'] == job['Reference Number']
+        assert server.stats['results'] == 3 and server.stats['details'] == 1
+
+def test_mock_server_error_injection():
+    with MockCivilServiceJobsServer(MockSiteConfig(total_jobs=10, error_rate=1.0)) as server:
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _fetch(server.results_page_url(1))
+        assert excinfo.value.code == 500
+        assert server.stats['errors_injected'] == 1
+
+def _http_crawl_pipeline(server, records, fetch_workers=4):
+    """The crawl pipeline's stage layout, with urllib standing in for the browser."""
+    def list_source(emit, ctx):
+        url = server.results_page_url(1)
+        while url:
+            page = parse_results_page_html(_fetch(url), base_url=url)
+            for job_info in page['jobs']:
+                emit(job_info)
+            url = page['paging']['next_link']
+
+    def fetch(job_info, emit, ctx):
+        emit((job_info, _fetch(job_info['link'])))
+
+    def parse(fetched, emit, ctx):
+        job_info, html = fetched
+        emit(parse_job_details_html(html, job_info['link'], job_info['title'], job_info['department']))
+
+    return Pipeline(
+        [Stage('list', source=list_source),
+         Stage('fetch', handler=fetch, workers=fetch_workers, queue_size=10),
+         Stage('parse', handler=parse, workers=2, queue_size=10)],
+        [Stage('sink', handler=lambda record, emit, ctx: records.append(record))],
+    )
+
+@pytest.mark.parametrize('size', [n for n in bench_sizes() if n <= 10000])
+def test_benchmark_pipeline_throughput_against_mock_site(size):
+    # 5 ms simulated server time per page: 8 fetch workers should overlap most of it
+    config = MockSiteConfig(total_jobs=size, latency_ms=5)
+    with MockCivilServiceJobsServer(config) as server:
+        def crawl():
+            records = []
+            _http_crawl_pipeline(server, records, fetch_workers=8).run()
+            assert len(records) == size
+            assert len({r['Reference Number'] for r in records}) == size
+
+        run_benchmark('pipeline_crawl_mock_site', size, crawl, repeat=1)
+
+def test_vacancy_id_from_link_is_stable_across_searches():
+    job = synthesize_jobs(1)[0]
+    other_search = make_link(1_900_000, search_context=555)
+    assert vacancy_id_from_link(job['Link']) == '1900000'
+    assert vacancy_id_from_link(other_search) == '1900000'
+    assert job_key({'link': other_search}) == job_key(job)
+    assert vacancy_id_from_link('https://example.com/no-sid') is None
+
+def test_work_queue_leases_retries_and_expiry(tmp_path):
+    wq = WorkQueue(str(tmp_path / 'queue.sqlite3'), lease_seconds=60, max_attempts=2)
+    crawl_id = wq.begin_crawl()
+    assert wq.enqueue('a', {'link': 'a'}, crawl_id)
+    assert not wq.enqueue('a', {'link': 'a'}, crawl_id) # Same vacancy, same crawl
+    assert wq.enqueue('b', {'link': 'b'}, crawl_id)
+
+    first = wq.lease('w1', limit=1)
+    second = wq.lease('w2', limit=5)
+    assert [t.key for t in first] == ['a'] and [t.key for t in second] == ['b']
+    assert wq.lease('w3') == []
+
+    wq.fail('a', 'w1', 'fetch failed')
+    retry = wq.lease('w3')
+    assert [(t.key, t.attempts) for t in retry] == [('a', 2)]
+    assert not wq.complete('a', 'w1', {}) # w1 no longer holds the lease
+    wq.fail('a', 'w3', 'fetch failed') # Last attempt
+    assert wq.counts()['failed'] == 1
+
+    assert wq.complete('b', 'w2', {'Link': 'b'})
+    wq.set_enumeration_complete(True)
+    assert wq.enumeration_complete()
+    assert not wq.has_open_tasks()
+    assert [r['Link'] for r in wq.iter_results()] == ['b']
+
+def test_work_queue_reoffers_expired_leases(tmp_path):
+    wq = WorkQueue(str(tmp_path / 'queue.sqlite3'), lease_seconds=0, max_attempts=2)
+    wq.enqueue('a', {'link': 'a'}, wq.begin_crawl())
+    assert [t.attempts for t in wq.lease('crashed-worker')] == [1]
+    time.sleep(0.01)
+    assert [t.attempts for t in wq.lease('w2')] == [2] # Lease expired: offered again
+    time.sleep(0.01)
+    assert wq.lease('w3') == [] # Out of attempts
+    assert wq.counts() == {'failed': 1}
+    assert not wq.has_open_tasks()
+
+def test_work_queue_new_crawl_requeues_finished_tasks(tmp_path):
+    wq = WorkQueue(str(tmp_path / 'queue.sqlite3'))
+    first_crawl = wq.begin_crawl()
+    wq.enqueue('a', {'link': 'a'}, first_crawl)
+    task, = wq.lease('w1')
+    assert wq.complete(task.key, 'w1', {'Link': 'a', 'crawl': 1})
+    assert not wq.enumeration_complete()
+
+    second_crawl = str(int(first_crawl) + 1)
+    assert wq.enqueue('a', {'link': 'a'}, second_crawl)
+    assert not wq.enqueue('a', {'link': 'a'}, second_crawl)
+    assert wq.counts() == {'pending': 1}
+
+def test_work_queue_results_are_per_crawl(tmp_path):
+    wq = WorkQueue(str(tmp_path / 'queue.sqlite3'))
+    first = wq.begin_crawl()
+    for key in ('a', 'b'):
+        wq.enqueue(key, {'link': key}, first)
+        wq.lease('w1')
+        wq.complete(key, 'w1', {'Link': key})
+    time.sleep(0.01) # Crawl ids are millisecond timestamps
+    second = wq.begin_crawl()
+    wq.enqueue('b', {'link': 'b'}, second) # 'a' has closed and is no longer listed
+    wq.lease('w1')
+    wq.complete('b', 'w1', {'Link': 'b', 'Salary': 'new'})
+
+    assert wq.current_crawl_id() == second
+    assert list(wq.iter_results()) == [{'Link': 'b', 'Salary': 'new'}]
+    assert list(wq.iter_results(first)) == [{'Link': 'a'}]
+
+def test_work_queue_leases_by_priority(tmp_path):
+    wq = WorkQueue(str(tmp_path / 'queue.sqlite3'))
+    crawl_id = wq.begin_crawl()
+    for key, priority in [('later', 300.0), ('soonest', 10.0), ('unknown', 1e9), ('soon', 60.0)]:
+        wq.enqueue(key, {'link': key}, crawl_id, priority)
+    assert [t.key for t in wq.lease('w1', limit=4)] == ['soonest', 'soon', 'later', 'unknown']
+
+def test_recrawl_scheduler_skips_refreshes_and_prioritizes(tmp_path):
+    path = str(tmp_path / 'schedule.sqlite3')
+    now = datetime(2025, 5, 1, 12, 0)
+    job = lambda vacancy, closing: {'link': make_link(vacancy), 'closing_date': closing}
+
+    scheduler = RecrawlScheduler(path, min_refresh_hours=6, max_refresh_hours=168, refresh_fraction=0.25)
+    assert scheduler.plan(job(1, '11:55 pm on Wednesday 30th April 2025'), now) is None # Closed
+    soon = scheduler.plan(job(2, '11:55 pm on Friday 2nd May 2025'), now)
+    later = scheduler.plan(job(3, '11:55 pm on Saturday 31st May 2025'), now)
+    undated = scheduler.plan(job(4, None), now)
+    assert soon < later < undated
+
+    scraped_at = now.timestamp()
+    for vacancy, closing in [(2, '11:55 pm on Friday 2nd May 2025'), (3, '11:55 pm on Saturday 31st May 2025'), (4, None)]:
+        scheduler.record({'Link': make_link(vacancy), 'Closing Date': f"Closing date: {closing}" if closing else None}, scraped_at)
+    scheduler.save(now)
+
+    reloaded = RecrawlScheduler(path, min_refresh_hours=6, max_refresh_hours=168, refresh_fraction=0.25)
+    in_8_hours = now + timedelta(hours=8)
+    in_8_days = now + timedelta(days=8)
+    assert reloaded.plan(job(2, '11:55 pm on Friday 2nd May 2025'), in_8_hours) is not None # Closes in ~28h: refreshed every 7h
+    assert reloaded.plan(job(3, '11:55 pm on Saturday 31st May 2025'), in_8_hours) is None # Closes in a month: weekly
+    assert reloaded.plan(job(3, '11:55 pm on Saturday 31st May 2025'), in_8_days) is not None
+    assert reloaded.plan(job(4, None), in_8_hours) is None
+
+    # Rows are read on demand: a scrape recorded by another process is seen straight away,
+    # and a page without a closing date keeps the one recorded before
+    reloaded.record({'Link': make_link(5), 'Closing Date': '11:55 pm on Saturday 31st May 2025'}, scraped_at)
+    reloaded.record({'Link': make_link(5)}, scraped_at)
+    assert scheduler.plan(job(5, None), in_8_days) is not None and scheduler.plan(job(5, None), in_8_hours) is None
+    assert scheduler.plan(job(5, None), datetime(2025, 6, 1)) is None # Closed, by the recorded date
+
+def test_dedup_filter_answers_seen_before_and_scheduler_decides_refresh(tmp_path):
+    config = {'DEDUP_FILTER_PATH': str(tmp_path / 'seen.bloom'), 'DEDUP_CAPACITY': 1000, 'DEDUP_ERROR_RATE': 0.01,
+              'RECRAWL_SCHEDULE_PATH': str(tmp_path / 'schedule.sqlite3'), 'RECRAWL_MIN_HOURS': 6,
+              'RECRAWL_MAX_HOURS': 168, 'RECRAWL_FRACTION': 0.25}
+    closing = (datetime.now() + timedelta(days=10)).isoformat(timespec='minutes')
+    scraped, new = ({'link': make_link(vacancy), 'closing_date': closing} for vacancy in (1, 2))
+    dedup, scheduler = new_deduplicator(config), new_scheduler(config)
+    dedup.remember(scraped)
+    scheduler.record(scraped)
+    dedup.save()
+    scheduler.save()
+
+    dedup, scheduler = new_deduplicator(config), new_scheduler(config) # The next run
+    assert dedup.seen_before(scraped) and not dedup.seen_before(new)
+    assert crawl_pipeline._plan_fetch(scraped, dedup, scheduler) is None # Seen, and not due yet
+    assert crawl_pipeline._plan_fetch(new, dedup, scheduler) > 0
+    assert crawl_pipeline._plan_fetch(new, dedup, scheduler) is None # Repeat within the run
+    assert crawl_pipeline._plan_fetch(dict(scraped), new_deduplicator(config), None) is None # Filter only: skipped
+
+def test_sharded_crawl_against_mock_site_merges_without_duplicates(tmp_path):
+    config = MockSiteConfig(total_jobs=120, error_rate=0.05, seed=3)
+    wq = WorkQueue(str(tmp_path / 'queue.sqlite3'), max_attempts=5)
+    with MockCivilServiceJobsServer(config) as server:
+        crawl_id = wq.begin_crawl()
+        for page in range(1, server.total_pages + 1):
+            html = None
+            while html is None: # The coordinator retries results pages hit by injected errors
+                try:
+                    html = _fetch(server.results_page_url(page))
+                except urllib.error.HTTPError:
+                    pass
+            for job_info in parse_results_page_html(html)['jobs']:
+                wq.enqueue(job_key(job_info), job_info, crawl_id)
+        wq.set_enumeration_complete(True)
+
+        def worker(worker_id):
+            while wq.has_open_tasks():
+                for task in wq.lease(worker_id, limit=4):
+                    try:
+                        html = _fetch(task.payload['link'])
+                    except urllib.error.HTTPError:
+                        wq.fail(task.key, worker_id, 'fetch failed')
+                        continue
+                    details = parse_job_details_html(html, task.payload['link'], task.payload['title'], task.payload['department'])
+                    wq.complete(task.key, worker_id, details)
+
+        threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    results = list(wq.iter_results(batch_size=50))
+    assert len(results) == 120
+    assert len({job_key(r) for r in results}) == 120
+
+def test_workers_renew_leases_of_queued_tasks(tmp_path, monkeypatch):
+    jobs = synthesize_jobs(6)
+    links = [job['Link'] for job in jobs]
+    wq = WorkQueue(str(tmp_path / 'queue.sqlite3'), lease_seconds=1)
+    crawl_id = wq.begin_crawl()
+    for job in jobs:
+        wq.enqueue(job_key({'link': job['Link']}), {'link': job['Link'], 'title': job['Job Title']}, crawl_id)
+    wq.set_enumeration_complete(True)
+    fetched = []
+
+    def slow_fetch(session, link):
+        time.sleep(0.4) # Six tasks take well over one lease
+        fetched.append(link)
+        return render_job_details(jobs[links.index(link)])
+
+    monkeypatch.setattr(crawl_pipeline, '_start_session', lambda config, needs_search: _FakeSession(needs_search))
+    monkeypatch.setattr(crawl_pipeline, 'fetch_job_html', slow_fetch)
+    config = {'PIPELINE_QUEUE_SIZE': 50, 'FETCH_WORKERS': 1, 'FETCH_DELAY_SECONDS': 0, 'PARSE_WORKERS': 1, 'WORK_POLL_SECONDS': 0.1}
+    sinks = {worker_id: CsvSink(str(tmp_path / f"jobs.{worker_id}.csv")) for worker_id in ('w1', 'w2')}
+    threads = [threading.Thread(target=run_worker, args=(config, wq, [sink], worker_id))
+               for worker_id, sink in sinks.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(fetched) == sorted(links) # No task expired in a queue and was fetched twice
+    assert sum(len(sink.records) for sink in sinks.values()) == 6
+    assert wq.counts() == {'done': 6}
+
+def _cdp(method: str, **params) -> dict:
+    """A performance log entry as returned by driver.get_log('performance')."""
+    return {'level': 'INFO', 'timestamp': 0, 'message': json.dumps({'message': {'method': method, 'params': params}, 'webview': 'x'})}
+
+def _details_page_log(url: str, server_ms: float) -> list[dict]:
+    return [
+        _cdp('Network.loadingFinished', requestId='old', encodedDataLength=999), # Tail of the previous page
+        _cdp('Network.requestWillBeSent', requestId='1', type='Document', timestamp=100.0, request={'url': url}),
+        _cdp('Network.responseReceived', requestId='1', type='Document', timestamp=100.3,
+             response={'url': url, 'status': 200, 'timing': {'sendStart': 2.0, 'receiveHeadersEnd': 2.0 + server_ms}}),
+        _cdp('Network.requestWillBeSent', requestId='2', type='Stylesheet', timestamp=100.31, request={'url': url.rsplit('/', 1)[0] + '/site.css'}),
+        _cdp('Network.requestWillBeSent', requestId='3', type='Script', timestamp=100.32, request={'url': 'https://www.googletagmanager.com/gtm.js'}),
+        _cdp('Network.responseReceived', requestId='2', response={'status': 200, 'fromDiskCache': True}),
+        _cdp('Network.loadingFinished', requestId='1', encodedDataLength=48_000),
+        _cdp('Network.loadingFinished', requestId='2', encodedDataLength=0),
+        _cdp('Network.loadingFinished', requestId='3', encodedDataLength=90_000),
+        _cdp('Page.domContentEventFired', timestamp=100.5),
+        _cdp('Page.loadEventFired', timestamp=101.25),
+    ]
+
+def test_page_profile_from_performance_log():
+    url = make_link(1_900_000, base_url='http://127.0.0.1:8000/csr/index.cgi') # A mock server details link
+    profile = build_page_profile(_details_page_log(url, 250), 'details')
+    assert (profile.url, profile.status, profile.ttfb) == (url, 200, 0.25)
+    assert (profile.dom_content_loaded, profile.load) == (0.5, 1.25)
+    assert (profile.requests, profile.third_party_requests, profile.cached_requests) == (3, 1, 1)
+    assert (profile.bytes, profile.third_party_bytes) == (138_000, 90_000)
+    assert build_page_profile([_cdp('Page.loadEventFired', timestamp=1.0)], 'details') is None
+
+    profiler = PageProfiler(keep_slowest=2)
+    for i, server_ms in enumerate([100, 400, 250]):
+        profiler.record(build_page_profile(_details_page_log(f"{url}&n={i}", server_ms), 'details'))
+    summary = profiler.summary()
+    assert summary['details']['pages'] == 3 and summary['details']['ttfb_p50_seconds'] == 0.25
+    assert summary['details']['mean_bytes'] == 138_000 and summary['details']['third_party_bytes_share'] == 0.652
+    assert [page['ttfb'] for page in summary['slowest_pages']] == [0.4, 0.25]
+
+class _LoadingDriver:
+    """A details page whose load event fires on the third readyState check."""
+    def __init__(self, log):
+        self.log, self.checks = log, 0
+
+    def execute_script(self, script):
+        assert script == "return document.readyState"
+        self.checks += 1
+        return 'complete' if self.checks >= 3 else 'interactive'
+
+    def get_log(self, name):
+        return self.log if self.checks >= 3 else self.log[:-1]
+
+def test_capture_page_waits_for_the_load_event(monkeypatch):
+    monkeypatch.setattr(page_profiler, '_profiling', True)
+    monkeypatch.setattr(page_profiler, 'PROFILER', PageProfiler())
+    driver = _LoadingDriver(_details_page_log(make_link(1_900_000), 250))
+    profile = capture_page(driver, 'details')
+    assert driver.checks == 3 and profile.load == 1.25
+    assert page_profiler.PROFILER.summary()['details']['pages'] == 1
+
+class _FakeDriver:
+    """Just enough of a WebDriver for BrowserSession's health and memory checks."""
+    def __init__(self, heap_mb=100):
+        self.alive, self.heap_mb = True, heap_mb
+        self.current_url = None
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise browser_session.WebDriverException("renderer crashed")
+        return 1 if script == "return 1;" else self.heap_mb * 1024 * 1024
+
+    def quit(self):
+        self.alive = False
+
+def test_browser_session_recycles_by_page_count_memory_and_crash(monkeypatch):
+    drivers = []
+
+    def launch(**kwargs):
+        drivers.append(_FakeDriver())
+        return drivers[-1]
+
+    monkeypatch.setattr(browser_session, 'initialize_driver', launch)
+    session = BrowserSession('http://example.invalid', max_pages=3, max_memory_mb=1500, needs_search=False)
+    assert session.start() and len(drivers) == 1
+    for _ in range(3):
+        assert session.before_navigation()
+    assert len(drivers) == 1 and session.pages_since_start == 3
+    assert session.before_navigation() # Page limit: a fresh browser
+    assert len(drivers) == 2 and not drivers[0].alive and session.pages_since_start == 1
+
+    drivers[-1].heap_mb = 2000 # Memory limit
+    assert session.before_navigation() and len(drivers) == 3 and session.restarts == 2
+
+    def broken_launch(**kwargs):
+        raise RuntimeError("chromedriver missing")
+
+    drivers[-1].alive = False # Crashed, and no new browser can be launched
+    monkeypatch.setattr(browser_session, 'initialize_driver', broken_launch)
+    assert not session.before_navigation() and session.driver is None
+    assert fetch_job_html(session, 'http://example.invalid/job') is None
+
+class _FakeSession:
+    def __init__(self, needs_search, expired=False):
+        self.needs_search, self.alive, self.expired = needs_search, True, expired
+        self.rewinds = 0
+
+    def is_alive(self):
+        return self.alive
+
+    def rewind(self):
+        self.rewinds += 1
+        return not self.expired
+
+    def quit(self):
+        self.alive = False
+
+def test_session_pool_keeps_browsers_warm_between_crawls():
+    started = []
+
+    def start(config, needs_search):
+        started.append(_FakeSession(needs_search))
+        return started[-1]
+
+    pool = SessionPool({}, start=start)
+    list_session, fetch_session = pool.acquire(True), pool.acquire(False)
+    pool.release(list_session)
+    pool.release(fetch_session)
+    assert pool.acquire(True) is list_session and list_session.rewinds == 1 # Warm: no new browser
+    assert pool.acquire(False) is fetch_session and fetch_session.rewinds == 0
+    assert len(started) == 2
+
+    list_session.expired = True # Search could not be re-run: replaced by a new browser
+    pool.release(list_session)
+    fetch_session.alive = False # Dead browsers are not kept
+    pool.release(fetch_session)
+    assert pool.acquire(True) is not list_session and not list_session.alive
+    assert pool.idle_sessions() == 0 and len(started) == 3
+
+def test_crawl_pipeline_fetches_soonest_closing_first_on_pooled_sessions(tmp_path, monkeypatch):
+    jobs = synthesize_jobs(8)
+    days = [5, 2, 7, 1, 6, 3, 8, 4]
+    links = [job['Link'] for job in jobs]
+    listed = threading.Event()
+    fetched = []
+
+    def job_links(session, stop_event):
+        assert session.needs_search
+        for job, day in zip(jobs + jobs[:1], days + days[:1]): # The last link is a duplicate
+            yield {'link': job['Link'], 'title': job['Job Title'], 'department': job['Department'],
+                   'closing_date': (datetime.now() + timedelta(days=day)).isoformat(timespec='minutes')}
+        listed.set()
+
+    def fetch(session, link):
+        assert not session.needs_search
+        listed.wait(5) # A slow first page load: the whole listing queues up meanwhile
+        fetched.append(link)
+        return render_job_details(jobs[links.index(link)])
+
+    monkeypatch.setattr(crawl_pipeline, 'iter_job_links', job_links)
+    monkeypatch.setattr(crawl_pipeline, 'fetch_job_html', fetch)
+    started = []
+
+    def start(config, needs_search):
+        started.append(_FakeSession(needs_search))
+        return started[-1]
+
+    config = {'PIPELINE_QUEUE_SIZE': 4, 'FETCH_WORKERS': 1, 'FETCH_DELAY_SECONDS': 0, 'PARSE_WORKERS': 2}
+    pool = SessionPool(config, start=start)
+    sink = CsvSink(str(tmp_path / 'jobs.csv'))
+    scheduler = RecrawlScheduler(str(tmp_path / 'schedule.sqlite3'))
+    build_crawl_pipeline(config, [sink], dedup=JobDeduplicator(), scheduler=scheduler, session_pool=pool).run()
+
+    assert sorted(record.link for record in sink.records) == sorted(links)
+    by_closing = [link for _, link in sorted(zip(days, links))]
+    assert fetched[1:] == [link for link in by_closing if link != fetched[0]]
+    assert len(started) == 2 and pool.idle_sessions() == 2
+
+    build_crawl_pipeline(config, [sink], dedup=JobDeduplicator(), session_pool=pool).run()
+    assert len(sink.records) == 16 and len(started) == 2 # Second crawl on the warm browsers
+    assert sorted((session.needs_search, session.rewinds) for session in started) == [(False, 0), (True, 1)]
+
+def test_daemon_runs_scheduled_crawls_and_reports_status(tmp_path, monkeypatch):
+    config = {'DAEMON_INTERVAL_MINUTES': 0, 'DAEMON_HEALTH_PORT': 0,
+              'RUN_REPORT_FILE': str(tmp_path / 'report.json'), 'METRICS_TEXTFILE': None,
+              'DEDUP_FILTER_PATH': '', 'DEDUP_CAPACITY': 1000, 'DEDUP_ERROR_RATE': 0.01, 'RECRAWL_SCHEDULE_PATH': '',
+              'PIPELINE_QUEUE_SIZE': 10, 'FETCH_WORKERS': 1, 'FETCH_DELAY_SECONDS': 0, 'PARSE_WORKERS': 1}
+    jobs = synthesize_jobs(3)
+    links = [job['Link'] for job in jobs]
+    seen_status, search_broken = [], threading.Event()
+
+    def start(config, needs_search):
+        if needs_search and search_broken.is_set():
+            raise RuntimeError("Search button not found")
+        return _FakeSession(needs_search, expired=True) # Every crawl re-runs the search
+
+    def job_links(session, stop_event):
+        seen_status.append(json.loads(_fetch(f"{base}/status")))
+        for job in jobs:
+            yield {'link': job['Link'], 'title': job['Job Title'], 'department': job['Department']}
+
+    monkeypatch.setattr(crawl_pipeline, '_start_session', start)
+    monkeypatch.setattr(crawl_pipeline, 'iter_job_links', job_links)
+    monkeypatch.setattr(crawl_pipeline, 'fetch_job_html', lambda session, link: render_job_details(jobs[links.index(link)]))
+    daemon = CrawlDaemon(config, lambda: [CsvSink(str(tmp_path / 'jobs.csv'))])
+    daemon.start_health_server(0)
+    base = f"http://127.0.0.1:{daemon.health_server.server_address[1]}"
+    try:
+        assert daemon.run_once() == 3
+        search_broken.set() # The pipeline logs the failed list stage; the daemon must still notice
+        for _ in range(3):
+            assert daemon.run_once() == 0
+        status = daemon.status()
+        assert (status['crawls'], status['failed_crawls'], status['consecutive_failures']) == (4, 3, 3)
+        assert status['last_crawl']['error'] == "The list stage failed (browser or search)."
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _fetch(f"{base}/health")
+        assert excinfo.value.code == 503
+
+        search_broken.clear()
+        assert daemon.run_once() == 3 and daemon.status()['last_crawl']['error'] is None
+        assert json.loads(_fetch(f"{base}/health")) == {'status': 'ok'}
+    finally:
+        daemon.health_server.shutdown()
+        daemon.health_server.server_close()
+
+    assert [(status['state'], status['crawls']) for status in seen_status] == [('crawling', 0), ('crawling', 4)]
+    assert json.loads((tmp_path / 'report.json').read_text())['daemon_crawl'] == 5
+
+def test_crawl_failure_from_pipeline_counters():
+    assert crawl_failure({'jobs_listed': 40, 'pipeline_parse_items': 39, 'pipeline_parse_errors': 1}) is None
+    assert crawl_failure({}) == "No job links were listed."
+    assert crawl_failure({'jobs_listed': 40, 'pipeline_parse_items': 40, 'pipeline_sink_cosmos_errors': 40}) == \
+        "Every item failed in stage(s): sink_cosmos."
+    # Fetch failures are handled in the stage (page not loaded), so only the job counters show them
+    assert crawl_failure({'jobs_listed': 40, 'jobs_failed': 40, 'pipeline_fetch_items': 40}) == \
+        "No job was scraped: 40 failed to fetch or parse."
+    assert crawl_failure({'jobs_listed': 40, 'jobs_failed': 3, 'jobs_scraped': 37, 'pipeline_fetch_items': 40}) is None
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.dedup import BloomFilter, JobDeduplicator
+from src.utils.pipeline import Pipeline, Stage
+from tests.fixtures.corpus import make_link
+
+def test_pipeline_fans_out_every_item_to_every_sink():
+    first, second = [], []
+    lock = threading.Lock()
+
+    def record(target):
+        def handler(item, emit, context):
+            with lock:
+                target.append(item)
+        return handler
+
+    pipeline = Pipeline(
+        [Stage('numbers', source=lambda emit, ctx: [emit(i) for i in range(100)]),
+         Stage('square', handler=lambda item, emit, ctx: emit(item * item), workers=4, queue_size=5)],
+        [Stage('first', handler=record(first), queue_size=5),
+         Stage('second', handler=record(second), workers=2, queue_size=5)],
+    )
+    pipeline.run()
+
+    expected = sorted(i * i for i in range(100))
+    assert sorted(first) == expected
+    assert sorted(second) == expected
+
+def test_pipeline_applies_backpressure():
+    produced = []
+
+    def source(emit, ctx):
+        for i in range(20):
+            produced.append(i)
+            emit(i)
+
+    def slow_sink(item, emit, ctx):
+        # The source can be at most queue_size (+1 in flight) items ahead of the sink
+        assert len(produced) - item <= 4
+        time.sleep(0.005)
+
+    Pipeline([Stage('source', source=source)], [Stage('sink', handler=slow_sink, queue_size=2)]).run()
+    assert len(produced) == 20
+
+def test_pipeline_stop_drains_queued_items():
+    stop_event = threading.Event()
+    handled = []
+
+    def source(emit, ctx):
+        for i in range(1000):
+            if stop_event.is_set():
+                return
+            emit(i)
+            if i == 9:
+                stop_event.set()
+
+    pipeline = Pipeline([Stage('source', source=source)],
+                        [Stage('sink', handler=lambda item, emit, ctx: handled.append(item))],
+                        stop_event=stop_event)
+    pipeline.run()
+    assert handled == list(range(10))
+
+def test_pipeline_keeps_going_after_a_failed_item_and_runs_teardown():
+    handled, closed = [], []
+
+    def handler(item, emit, ctx):
+        if item == 3:
+            raise ValueError("bad item")
+        emit(item)
+
+    Pipeline(
+        [Stage('source', source=lambda emit, ctx: [emit(i) for i in range(6)]),
+         Stage('work', handler=handler, setup=lambda: 'ctx', teardown=closed.append)],
+        [Stage('sink', handler=lambda item, emit, ctx: handled.append(item))],
+    ).run()
+    assert handled == [0, 1, 2, 4, 5]
+    assert closed == ['ctx']
+
+def test_pipeline_priority_stage_takes_lowest_first():
+    release, order = threading.Event(), []
+
+    def source(emit, ctx):
+        for n in [5, 3, 9, 1, 7]:
+            emit(n)
+        release.set()
+
+    def handler(item, emit, ctx):
+        order.append(item)
+
+    # The worker's setup holds it back until every item is queued
+    Pipeline([Stage('source', source=source),
+              Stage('work', handler=handler, queue_size=10, priority=lambda n: n, setup=release.wait)]).run()
+    assert order == [1, 3, 5, 7, 9]
+
+def test_bloom_filter_round_trip_and_error_rate(tmp_path):
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        bloom.add(f"vacancy-{i}")
+    assert all(f"vacancy-{i}" in bloom for i in range(5000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+    path = str(tmp_path / 'seen.bloom')
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+    assert loaded.count == bloom.count and 'vacancy-42' in loaded and loaded.bits == bloom.bits
+
+    (tmp_path / 'broken.bloom').write_bytes(b'not a filter')
+    with pytest.raises(ValueError):
+        BloomFilter.load(str(tmp_path / 'broken.bloom'))
+
+def test_job_deduplicator_in_run_and_across_runs(tmp_path):
+    path = str(tmp_path / 'seen.bloom')
+    first, second = make_link(1_900_001, search_context=1), make_link(1_900_001, search_context=2)
+
+    run_one = JobDeduplicator(path)
+    assert run_one.claim({'link': first})
+    assert not run_one.claim({'link': second}) # Same vacancy under another search's link
+    assert run_one.claim({'link': make_link(1_900_002)})
+    run_one.remember({'Link': first}) # Only 1_900_001 was scraped successfully
+    run_one.save()
+
+    run_two = JobDeduplicator(path)
+    assert not run_two.claim({'link': second})
+    assert run_two.claim({'link': make_link(1_900_002)}) # Failed last time: fetched again
+
+    per_run_only = JobDeduplicator(None)
+    assert per_run_only.claim({'link': first}) and not per_run_only.claim({'link': first})